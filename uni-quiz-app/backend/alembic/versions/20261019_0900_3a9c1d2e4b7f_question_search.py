@@ -0,0 +1,55 @@
+"""Question full-text search and tag indexes
+
+Revision ID: 3a9c1d2e4b7f
+Revises: ff2c7fedebc5
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "3a9c1d2e4b7f"
+down_revision: Union[str, None] = "ff2c7fedebc5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "questions",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', coalesce(question_text, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(explanation, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_questions_search_vector",
+        "questions",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_questions_tags",
+        "questions",
+        ["tags"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"tags": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_questions_tags", table_name="questions")
+    op.drop_index("ix_questions_search_vector", table_name="questions")
+    op.drop_column("questions", "search_vector")
@@ -0,0 +1,45 @@
+"""Keyset pagination indexes for instructor lists
+
+Revision ID: 8b41f0c27d15
+Revises: 3a9c1d2e4b7f
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b41f0c27d15"
+down_revision: Union[str, None] = "3a9c1d2e4b7f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_questions_instructor_created",
+        "questions",
+        ["instructor_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_quizzes_instructor_created",
+        "quizzes",
+        ["instructor_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_classes_instructor_created",
+        "classes",
+        ["instructor_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_classes_instructor_created", table_name="classes")
+    op.drop_index("ix_quizzes_instructor_created", table_name="quizzes")
+    op.drop_index("ix_questions_instructor_created", table_name="questions")
@@ -0,0 +1,52 @@
+"""Near-duplicate question index (MinHash signatures and LSH buckets)
+
+Revision ID: c2d8e5a1f934
+Revises: 8b41f0c27d15
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c2d8e5a1f934"
+down_revision: Union[str, None] = "8b41f0c27d15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing questions are indexed lazily, on an instructor's first duplicate lookup
+    op.add_column("questions", sa.Column("minhash", postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.create_index(
+        "ix_questions_minhash_missing",
+        "questions",
+        ["instructor_id"],
+        unique=False,
+        postgresql_where=sa.text("minhash IS NULL AND is_active"),
+    )
+    op.create_table(
+        "question_lsh_buckets",
+        sa.Column("instructor_id", sa.UUID(), nullable=False),
+        sa.Column("bucket", sa.BigInteger(), nullable=False),
+        sa.Column("question_id", sa.UUID(), nullable=False),
+        sa.ForeignKeyConstraint(["instructor_id"], ["instructors.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("instructor_id", "bucket", "question_id"),
+    )
+    op.create_index(
+        op.f("ix_question_lsh_buckets_question_id"),
+        "question_lsh_buckets",
+        ["question_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_question_lsh_buckets_question_id"), table_name="question_lsh_buckets")
+    op.drop_table("question_lsh_buckets")
+    op.drop_index("ix_questions_minhash_missing", table_name="questions")
+    op.drop_column("questions", "minhash")
@@ -0,0 +1,75 @@
+"""Broadcasts and persistent Telegram send queue
+
+Revision ID: 5e7a9b3c1d28
+Revises: c2d8e5a1f934
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e7a9b3c1d28"
+down_revision: Union[str, None] = "c2d8e5a1f934"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "broadcasts",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("instructor_id", sa.UUID(), nullable=False),
+        sa.Column("class_id", sa.UUID(), nullable=False),
+        sa.Column("quiz_id", sa.UUID(), nullable=True),
+        sa.Column("kind", sa.String(length=30), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("sent", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["class_id"], ["classes.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["instructor_id"], ["instructors.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_broadcasts_class_created", "broadcasts", ["class_id", "created_at"], unique=False)
+    op.create_index(op.f("ix_broadcasts_instructor_id"), "broadcasts", ["instructor_id"], unique=False)
+    op.create_index(op.f("ix_broadcasts_quiz_id"), "broadcasts", ["quiz_id"], unique=False)
+
+    op.create_table(
+        "broadcast_messages",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("broadcast_id", sa.UUID(), nullable=False),
+        sa.Column("student_id", sa.UUID(), nullable=True),
+        sa.Column("chat_id", sa.BigInteger(), nullable=False),
+        sa.Column("status", sa.String(length=10), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("error", sa.String(length=255), nullable=True),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["broadcast_id"], ["broadcasts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["student_id"], ["students.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("broadcast_id", "chat_id", name="uq_broadcast_chat"),
+    )
+    op.create_index(
+        "ix_broadcast_messages_due",
+        "broadcast_messages",
+        ["next_attempt_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_broadcast_messages_due", table_name="broadcast_messages")
+    op.drop_table("broadcast_messages")
+    op.drop_index(op.f("ix_broadcasts_quiz_id"), table_name="broadcasts")
+    op.drop_index(op.f("ix_broadcasts_instructor_id"), table_name="broadcasts")
+    op.drop_index("ix_broadcasts_class_created", table_name="broadcasts")
+    op.drop_table("broadcasts")
@@ -0,0 +1,55 @@
+"""Indexes for the quiz reminder scheduler
+
+Revision ID: 9f3b6d2e8a41
+Revises: 5e7a9b3c1d28
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9f3b6d2e8a41"
+down_revision: Union[str, None] = "5e7a9b3c1d28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_quizzes_published_start",
+        "quizzes",
+        ["start_time"],
+        unique=False,
+        postgresql_where=sa.text("is_published"),
+    )
+    op.create_index(
+        "ix_quizzes_published_end",
+        "quizzes",
+        ["end_time"],
+        unique=False,
+        postgresql_where=sa.text("is_published"),
+    )
+    op.create_index(
+        "ux_broadcasts_quiz_reminder",
+        "broadcasts",
+        ["quiz_id", "kind"],
+        unique=True,
+        postgresql_where=sa.text("kind IN ('reminder_opens', 'reminder_closes')"),
+    )
+    op.create_index(
+        "ix_quiz_attempts_quiz_student",
+        "quiz_attempts",
+        ["quiz_id", "student_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_quiz_attempts_quiz_student", table_name="quiz_attempts")
+    op.drop_index("ux_broadcasts_quiz_reminder", table_name="broadcasts")
+    op.drop_index("ix_quizzes_published_end", table_name="quizzes")
+    op.drop_index("ix_quizzes_published_start", table_name="quizzes")
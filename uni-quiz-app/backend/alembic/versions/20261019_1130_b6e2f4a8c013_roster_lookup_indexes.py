@@ -0,0 +1,38 @@
+"""Student lookup indexes for roster imports
+
+Revision ID: b6e2f4a8c013
+Revises: 9f3b6d2e8a41
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e2f4a8c013"
+down_revision: Union[str, None] = "9f3b6d2e8a41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_students_student_id",
+        "students",
+        ["student_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_students_username_lower",
+        "students",
+        [sa.text("lower(telegram_username)")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_students_username_lower", table_name="students")
+    op.drop_index("ix_students_student_id", table_name="students")
@@ -0,0 +1,31 @@
+"""Index for the expired attempt sweeper
+
+Revision ID: d4a7c9e1f265
+Revises: b6e2f4a8c013
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a7c9e1f265"
+down_revision: Union[str, None] = "b6e2f4a8c013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_quiz_attempts_open_started",
+        "quiz_attempts",
+        ["is_completed", "started_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_quiz_attempts_open_started", table_name="quiz_attempts")
@@ -0,0 +1,71 @@
+"""Incrementally maintained quiz statistics
+
+Revision ID: e8c3a5b7d902
+Revises: d4a7c9e1f265
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8c3a5b7d902"
+down_revision: Union[str, None] = "d4a7c9e1f265"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quiz_stats",
+        sa.Column("quiz_id", sa.UUID(), nullable=False),
+        sa.Column("attempts_started", sa.Integer(), nullable=False),
+        sa.Column("attempts_completed", sa.Integer(), nullable=False),
+        sa.Column("passed_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("score_sq_sum", sa.Numeric(precision=18, scale=4), nullable=False),
+        sa.Column("time_spent_sum", sa.BigInteger(), nullable=False),
+        sa.Column("histogram", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("quiz_id"),
+    )
+
+    # Backfill from the existing attempts (10 buckets of 10 points)
+    op.execute(
+        """
+        INSERT INTO quiz_stats (
+            quiz_id, attempts_started, attempts_completed, passed_count,
+            score_sum, score_sq_sum, time_spent_sum, histogram, updated_at
+        )
+        SELECT
+            a.quiz_id,
+            count(*),
+            count(*) FILTER (WHERE a.is_completed),
+            count(*) FILTER (WHERE a.is_completed AND coalesce(a.score, 0) >= coalesce(q.passing_score, 60)),
+            coalesce(sum(coalesce(a.score, 0)) FILTER (WHERE a.is_completed), 0),
+            coalesce(sum(coalesce(a.score, 0) ^ 2) FILTER (WHERE a.is_completed), 0),
+            coalesce(sum(coalesce(a.time_spent_seconds, 0)) FILTER (WHERE a.is_completed), 0),
+            ARRAY(
+                SELECT count(b.id) FILTER (WHERE b.is_completed)
+                FROM generate_series(0, 9) AS bucket
+                LEFT JOIN quiz_attempts b
+                    ON b.quiz_id = a.quiz_id
+                    AND least(floor(coalesce(b.score, 0) / 10), 9) = bucket
+                GROUP BY bucket
+                ORDER BY bucket
+            ),
+            now()
+        FROM quiz_attempts a
+        JOIN quizzes q ON q.id = a.quiz_id
+        GROUP BY a.quiz_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("quiz_stats")
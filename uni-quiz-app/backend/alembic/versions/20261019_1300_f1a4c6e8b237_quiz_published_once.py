@@ -0,0 +1,54 @@
+"""Announce each quiz at most once
+
+Revision ID: f1a4c6e8b237
+Revises: e8c3a5b7d902
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1a4c6e8b237"
+down_revision: Union[str, None] = "e8c3a5b7d902"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Republishing used to announce a quiz again: keep the first
+    # announcement, the later ones become plain announcements
+    op.execute(
+        """
+        UPDATE broadcasts SET kind = 'announcement'
+        WHERE kind = 'quiz_published'
+          AND EXISTS (
+              SELECT 1 FROM broadcasts AS earlier
+              WHERE earlier.quiz_id = broadcasts.quiz_id
+                AND earlier.kind = 'quiz_published'
+                AND (earlier.created_at, earlier.id) < (broadcasts.created_at, broadcasts.id)
+          )
+        """
+    )
+    op.drop_index("ux_broadcasts_quiz_reminder", table_name="broadcasts")
+    op.create_index(
+        "ux_broadcasts_quiz_kind",
+        "broadcasts",
+        ["quiz_id", "kind"],
+        unique=True,
+        postgresql_where=sa.text("kind IN ('quiz_published', 'reminder_opens', 'reminder_closes')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_broadcasts_quiz_kind", table_name="broadcasts")
+    op.create_index(
+        "ux_broadcasts_quiz_reminder",
+        "broadcasts",
+        ["quiz_id", "kind"],
+        unique=True,
+        postgresql_where=sa.text("kind IN ('reminder_opens', 'reminder_closes')"),
+    )
@@ -0,0 +1,40 @@
+"""Partial index of open attempts for the sweeper
+
+Revision ID: a7d2e9f4c516
+Revises: f1a4c6e8b237
+Create Date: 2026-10-19 13:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d2e9f4c516"
+down_revision: Union[str, None] = "f1a4c6e8b237"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Completed attempts are most of the table and never interest the sweeper
+    op.drop_index("ix_quiz_attempts_open_started", table_name="quiz_attempts")
+    op.create_index(
+        "ix_quiz_attempts_open_started",
+        "quiz_attempts",
+        ["started_at"],
+        unique=False,
+        postgresql_where=sa.text("NOT is_completed"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_quiz_attempts_open_started", table_name="quiz_attempts")
+    op.create_index(
+        "ix_quiz_attempts_open_started",
+        "quiz_attempts",
+        ["is_completed", "started_at"],
+        unique=False,
+    )
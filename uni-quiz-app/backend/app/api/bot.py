@@ -1,11 +1,13 @@
 """
 Bot API routes - Telegram webhook and enrollment handling.
 """
+import hmac
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
 
+from app.bot.webhook import BotQueueFullError, feed_update
 from app.database import get_db
 from app.services.enrollment_service import EnrollmentService
 from app.config import settings
@@ -22,59 +24,32 @@ class EnrollRequest(BaseModel):
     class_code: str
 
 
-class WebhookUpdate(BaseModel):
-    """Telegram webhook update (simplified)."""
-    update_id: int
-    message: Optional[dict] = None
-
-
 @router.post("/webhook")
-async def telegram_webhook(
-    request: Request,
-    db: Session = Depends(get_db)
-):
+async def telegram_webhook(request: Request):
     """
-    Handle Telegram webhook updates.
+    Receive Telegram webhook updates (BOT_MODE=webhook).
     
-    This endpoint receives updates from Telegram when users interact with the bot.
-    Main use case: handling /start command with deep link payload.
+    Updates are queued for the in-process bot application and acknowledged
+    at once; handlers reply asynchronously. Repeated deliveries of the same
+    update_id are dropped. Answers 503 while the queue is full, so Telegram
+    retries later. Requests without the configured secret token are
+    rejected; with no secret configured, every request is.
     """
-    try:
-        update = await request.json()
-    except Exception:
-        return {"ok": True}
-    
-    message = update.get("message")
-    if not message:
-        return {"ok": True}
+    if not settings.TELEGRAM_WEBHOOK_SECRET or not hmac.compare_digest(
+        request.headers.get("x-telegram-bot-api-secret-token", ""),
+        settings.TELEGRAM_WEBHOOK_SECRET
+    ):
+        raise HTTPException(status_code=403, detail="Invalid webhook secret")
     
-    text = message.get("text", "")
-    from_user = message.get("from", {})
+    try:
+        data = await request.json()
+    except ValueError:
+        return {"ok": True}  # Not an update; nothing to retry
     
-    # Handle /start command with potential deep link
-    if text.startswith("/start"):
-        parts = text.split(" ", 1)
-        class_code = parts[1] if len(parts) > 1 else None
-        
-        service = EnrollmentService(db)
-        
-        # Get or create student
-        student = service.get_or_create_student(
-            telegram_id=from_user.get("id"),
-            username=from_user.get("username"),
-            first_name=from_user.get("first_name"),
-            last_name=from_user.get("last_name")
-        )
-        
-        # Enroll if class code provided
-        if class_code and class_code.startswith("class_"):
-            enrollment, message_text = service.enroll_student_by_code(
-                student.id, class_code
-            )
-            # Note: Actual message sending handled by separate bot process
-            return {"ok": True, "action": "enroll", "message": message_text}
-        
-        return {"ok": True, "action": "start"}
+    try:
+        feed_update(data)
+    except (RuntimeError, BotQueueFullError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
     return {"ok": True}
 
@@ -1,37 +1,57 @@
 """
 Instructor API routes - Classes, Questions, Quizzes, Results.
 """
+import asyncio
+import os
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-import aiofiles
-import os
 from datetime import datetime
 
-from app.database import get_db
+from app.database import SessionLocal, get_db, run_in_session
 from app.api.deps import get_current_instructor
 from app.models import Instructor, Class, Question, Quiz, QuizQuestionPool, Enrollment
 from app.schemas.instructor import (
     InstructorResponse, InstructorUpdate,
     ClassCreate, ClassUpdate, ClassResponse, ClassListResponse,
-    InviteLinkResponse, EnrolledStudentResponse
+    InviteLinkResponse, EnrolledStudentResponse, RosterImportResponse
 )
 from app.schemas.question import (
-    QuestionCreate, QuestionUpdate, QuestionResponse, QuestionListResponse, BulkQuestionImport
+    QuestionCreate, QuestionUpdate, QuestionResponse, QuestionListResponse, BulkQuestionImport,
+    QuestionSearchHit, QuestionSearchResponse, DuplicateCheckRequest, DuplicateCheckResponse,
+    DuplicateFlag, DuplicateMatch, DuplicateCluster, DuplicateClusterResponse
 )
 from app.schemas.quiz import (
     QuizCreate, QuizUpdate, QuizResponse, QuizListResponse,
-    AddQuestionsToQuiz, QuizPublish
+    AddQuestionsToQuiz, QuizPublish, QuizStatsResponse, DashboardStatsResponse, ItemAnalysisResponse
 )
-from app.services.enrollment_service import EnrollmentService
+from app.services.enrollment_service import EnrollmentService, forget_class_code
+from app.services.roster_service import RosterService
 from app.services.quiz_service import QuizService
-from app.utils.excel import create_quiz_results_excel
+from app.services.stats_service import StatsService
+from app.services.item_analysis import ItemAnalysisService
+from app.services.live_monitor import broker as live_broker
+from app.services.question_service import QuestionService
+from app.services.duplicate_service import DuplicateService
+from app.services.broadcast_service import BroadcastService
+from app.schemas.broadcast import BroadcastCreate, BroadcastResponse, BroadcastListResponse
+from app.bot.broadcast import wake_broadcast_sender
+from app.utils.excel import create_quiz_results_excel, stream_question_bank_excel
+from app.utils.export import iter_ndjson
+from app.utils.pagination import COUNT_MODE_PATTERN, count_rows, paginate
+from app.utils.conditional import conditional_response
+from app.utils.sse import SSE_HEADERS, sse_event
 from app.config import settings
 
 
-from app.utils.file import save_upload_file
+from app.schemas.upload import PresignUploadRequest, PresignUploadResponse, CompleteUploadRequest
+from app.utils.file import save_upload_file, presign_upload, finalize_direct_upload, stream_to_tmp
+from app.utils.documents import document_type, count_pages_async
+from app.utils.roster import iter_roster, roster_type
 
 router = APIRouter()
 
@@ -42,7 +62,35 @@ async def upload_file(
     current_user: Instructor = Depends(get_current_instructor)
 ):
     """Upload a file (image) and get value URL."""
-    url = save_upload_file(file, sub_dir="images")
+    url = await save_upload_file(file, sub_dir="images")
+    return {"url": url}
+
+
+@router.post("/uploads/presign", response_model=PresignUploadResponse)
+async def presign_direct_upload(
+    data: PresignUploadRequest,
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """
+    Prepare a direct upload to storage.
+    
+    If a file with the same SHA-256 is already stored, `exists` is true and
+    no upload is needed. Otherwise POST the returned form, then call
+    /uploads/complete with the key.
+    """
+    try:
+        return await presign_upload(data.filename, data.content_type, data.size, data.sha256)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/uploads/complete")
+async def complete_direct_upload(
+    data: CompleteUploadRequest,
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """Verify a direct upload, build its derivatives and get its URL."""
+    url = await finalize_direct_upload(data.key)
     return {"url": url}
 
 
@@ -80,16 +128,26 @@ async def list_classes(
     db: Session = Depends(get_db),
     current_user: Instructor = Depends(get_current_instructor),
     skip: int = 0,
-    limit: int = 50
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern=COUNT_MODE_PATTERN)
 ):
-    """List all classes for current instructor."""
-    classes = db.query(Class).filter(
-        Class.instructor_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    """
+    List all classes for current instructor, newest first.
     
-    total = db.query(Class).filter(
+    Pass `cursor` (the previous page's `next_cursor`) for keyset paging;
+    `count=estimate` returns a planner-estimated total, `count=none` skips it.
+    """
+    query = db.query(Class).filter(
         Class.instructor_id == current_user.id
-    ).count()
+    )
+    
+    try:
+        classes, next_cursor = paginate(query, Class, limit, cursor=cursor, skip=skip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    total, is_estimate = count_rows(db, query, count)
     
     # Add student count
     result = []
@@ -107,7 +165,12 @@ async def list_classes(
         }
         result.append(ClassResponse(**class_dict))
     
-    return ClassListResponse(classes=result, total=total)
+    return ClassListResponse(
+        classes=result,
+        total=total,
+        total_is_estimate=is_estimate,
+        next_cursor=next_cursor
+    )
 
 
 @router.post("/classes", response_model=ClassResponse, status_code=status.HTTP_201_CREATED)
@@ -198,6 +261,7 @@ async def update_class(
     
     db.commit()
     db.refresh(target_class)
+    forget_class_code(target_class.class_code)
     
     return ClassResponse(
         id=target_class.id,
@@ -227,6 +291,7 @@ async def delete_class(
     if not target_class:
         raise HTTPException(status_code=404, detail="Class not found")
     
+    forget_class_code(target_class.class_code)
     db.delete(target_class)
     db.commit()
 
@@ -288,6 +353,100 @@ async def list_class_students(
     ]
 
 
+
+@router.post("/classes/{class_id}/roster", response_model=RosterImportResponse)
+async def import_class_roster(
+    class_id: UUID,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """
+    Enroll students in bulk from a roster (CSV or XLSX).
+    
+    The header row names the columns: telegram_id, username and/or
+    student_id (university ID), optionally first_name and last_name. Rows
+    with a Telegram ID create the student if needed; rows with only a
+    username or university ID must match an already registered student and
+    are reported as unresolved otherwise.
+    """
+    target_class = db.query(Class).filter(
+        Class.id == class_id,
+        Class.instructor_id == current_user.id
+    ).first()
+    
+    if not target_class:
+        raise HTTPException(status_code=404, detail="Class not found")
+    
+    kind = roster_type(file.filename or "")
+    if not kind:
+        raise HTTPException(status_code=400, detail="Invalid file type. Allowed: CSV, XLSX")
+    
+    try:
+        tmp_path, _ = await stream_to_tmp(file, settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024)
+    finally:
+        await file.close()
+    
+    try:
+        # Parsing and the batched upserts block; keep them off the event loop
+        summary = await run_in_threadpool(
+            RosterService(db).import_roster,
+            class_id,
+            iter_roster(tmp_path, kind, settings.ROSTER_MAX_ROWS)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        os.remove(tmp_path)
+    
+    return RosterImportResponse.model_validate(summary)
+
+# ==================== Broadcasts ====================
+
+@router.post("/classes/{class_id}/broadcasts", response_model=BroadcastResponse, status_code=status.HTTP_201_CREATED)
+async def create_class_broadcast(
+    class_id: UUID,
+    data: BroadcastCreate,
+    db: Session = Depends(get_db),
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """Send a Telegram message to every active student of a class."""
+    target_class = db.query(Class).filter(
+        Class.id == class_id,
+        Class.instructor_id == current_user.id
+    ).first()
+    
+    if not target_class:
+        raise HTTPException(status_code=404, detail="Class not found")
+    
+    broadcast = BroadcastService(db).create_broadcast(
+        instructor_id=current_user.id,
+        class_id=class_id,
+        text=data.text
+    )
+    wake_broadcast_sender()
+    
+    return BroadcastResponse.model_validate(broadcast)
+
+
+@router.get("/broadcasts", response_model=BroadcastListResponse)
+async def list_broadcasts(
+    class_id: Optional[UUID] = None,
+    quiz_id: Optional[UUID] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """List broadcasts with their delivery stats, newest first."""
+    broadcasts = BroadcastService(db).list_broadcasts(
+        current_user.id, class_id=class_id, quiz_id=quiz_id, limit=limit
+    )
+    
+    return BroadcastListResponse(
+        broadcasts=[BroadcastResponse.model_validate(b) for b in broadcasts]
+    )
+
+
 # ==================== Questions ====================
 
 @router.get("/questions", response_model=QuestionListResponse)
@@ -297,32 +456,46 @@ async def list_questions(
     class_id: Optional[str] = None,
     difficulty: Optional[str] = None,
     question_type: Optional[str] = None,
+    tag: Optional[str] = None,
     skip: int = 0,
-    limit: int = 50
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern=COUNT_MODE_PATTERN)
 ):
-    """List questions with optional filters."""
-    query = db.query(Question).filter(
-        Question.instructor_id == current_user.id,
-        Question.is_active == True
-    )
+    """
+    List questions with optional filters, newest first.
     
+    Pass `cursor` (the previous page's `next_cursor`) for keyset paging;
+    `count=estimate` returns a planner-estimated total, `count=none` skips it.
+    """
+    class_uuid = None
     if class_id and class_id.strip():
         try:
-            query = query.filter(Question.class_id == UUID(class_id))
+            class_uuid = UUID(class_id)
         except ValueError:
             pass # Ignore invalid UUID
-            
-    if difficulty and difficulty.strip():
-        query = query.filter(Question.difficulty == difficulty)
-    if question_type:
-        query = query.filter(Question.question_type == question_type)
     
-    total = query.count()
-    questions = query.offset(skip).limit(limit).all()
+    service = QuestionService(db)
+    query = service.filter_questions(
+        instructor_id=current_user.id,
+        class_id=class_uuid,
+        tag=tag,
+        difficulty=difficulty.strip() if difficulty else None,
+        question_type=question_type
+    )
+    
+    try:
+        questions, next_cursor = paginate(query, Question, limit, cursor=cursor, skip=skip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    total, is_estimate = count_rows(db, query, count)
     
     return QuestionListResponse(
         questions=[QuestionResponse.model_validate(q) for q in questions],
-        total=total
+        total=total,
+        total_is_estimate=is_estimate,
+        next_cursor=next_cursor
     )
 
 
@@ -357,12 +530,150 @@ async def create_question(
     )
     
     db.add(question)
+    DuplicateService(db).index_questions([question])
     db.commit()
     db.refresh(question)
     
     return QuestionResponse.model_validate(question)
 
 
+@router.get("/questions/search", response_model=QuestionSearchResponse)
+async def search_questions(
+    db: Session = Depends(get_db),
+    current_user: Instructor = Depends(get_current_instructor),
+    q: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    class_id: Optional[UUID] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Full-text search over question text and explanations, with tag facets."""
+    service = QuestionService(db)
+    hits, facets, total = service.search_questions(
+        instructor_id=current_user.id,
+        text=q,
+        tags=tags,
+        class_id=class_id,
+        limit=limit
+    )
+    
+    return QuestionSearchResponse(
+        questions=[
+            QuestionSearchHit(**QuestionResponse.model_validate(question).model_dump(), rank=rank)
+            for question, rank in hits
+        ],
+        facets=facets,
+        total=total
+    )
+
+
+@router.get("/questions/duplicates", response_model=DuplicateClusterResponse)
+async def list_duplicate_questions(
+    threshold: Optional[float] = Query(None, ge=0.3, le=1.0),
+    db: Session = Depends(get_db),
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """List clusters of near-identical questions in the bank, largest first."""
+    # Signature comparisons are CPU-bound; keep them off the event loop
+    clusters = await run_in_threadpool(DuplicateService(db).clusters, current_user.id, threshold)
+    
+    return DuplicateClusterResponse(
+        clusters=[
+            DuplicateCluster(
+                similarity=round(score, 3),
+                questions=[QuestionResponse.model_validate(q) for q in questions]
+            )
+            for questions, score in clusters
+        ],
+        total=len(clusters)
+    )
+
+
+@router.post("/questions/duplicates/check", response_model=DuplicateCheckResponse)
+async def check_duplicate_questions(
+    data: DuplicateCheckRequest,
+    db: Session = Depends(get_db),
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """
+    Flag near-duplicates among questions about to be imported.
+    
+    Each question is checked against the bank and the questions before it
+    in the same batch.
+    """
+    matches = await run_in_threadpool(
+        DuplicateService(db).find_matches,
+        current_user.id,
+        [(q.question_text, q.options) for q in data.questions],
+        data.threshold
+    )
+    
+    return DuplicateCheckResponse(flagged=_duplicate_flags(matches))
+
+
+def _duplicate_flags(matches) -> List[DuplicateFlag]:
+    return [
+        DuplicateFlag(
+            index=index,
+            matches=[
+                DuplicateMatch(question_id=m.question_id, index=m.index, similarity=round(m.similarity, 3))
+                for m in found
+            ]
+        )
+        for index, found in enumerate(matches)
+        if found
+    ]
+
+
+@router.get("/questions/export")
+async def export_question_bank(
+    format: str = Query("xlsx", pattern="^(xlsx|ndjson)$"),
+    class_id: Optional[UUID] = None,
+    tag: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    question_type: Optional[str] = None,
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """
+    Export the question bank as a streamed Excel or NDJSON file.
+
+    Rows are read from a server-side cursor while the response is being
+    sent. The generator owns its own session because the request-scoped
+    one is closed before the body is streamed.
+    """
+    instructor_id = current_user.id
+
+    def question_rows():
+        db = SessionLocal()
+        try:
+            service = QuestionService(db)
+            query = service.filter_questions(
+                instructor_id=instructor_id,
+                class_id=class_id,
+                tag=tag,
+                difficulty=difficulty,
+                question_type=question_type
+            )
+            yield from service.iter_export_rows(query)
+        finally:
+            db.close()
+
+    filename = f"question_bank_{datetime.utcnow().strftime('%Y%m%d')}.{format}"
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+
+    if format == "ndjson":
+        return StreamingResponse(
+            iter_ndjson(question_rows()),
+            media_type="application/x-ndjson",
+            headers=headers
+        )
+
+    return StreamingResponse(
+        stream_question_bank_excel(question_rows()),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers=headers
+    )
+
+
 @router.get("/questions/{question_id}", response_model=QuestionResponse)
 async def get_question(
     question_id: UUID,
@@ -405,6 +716,9 @@ async def update_question(
     for field, value in update_data.items():
         setattr(question, field, value)
     
+    if update_data.keys() & {"question_text", "options", "is_active"}:
+        DuplicateService(db).index_questions([question])
+    
     question.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(question)
@@ -428,6 +742,7 @@ async def delete_question(
         raise HTTPException(status_code=404, detail="Question not found")
     
     question.is_active = False
+    DuplicateService(db).remove_questions([question.id])
     db.commit()
 
 
@@ -437,10 +752,28 @@ async def bulk_import_questions(
     db: Session = Depends(get_db),
     current_user: Instructor = Depends(get_current_instructor)
 ):
-    """Bulk import questions."""
-    imported = 0
+    """
+    Bulk import questions.
+    
+    Near-duplicates of existing questions (or of earlier questions in the
+    batch) are reported in `duplicates`; with `skip_duplicates` they are
+    left out of the import.
+    """
+    service = DuplicateService(db)
+    matches = await run_in_threadpool(
+        service.find_matches,
+        current_user.id,
+        [(q.question_text, q.options) for q in data.questions]
+    )
+    
+    questions = []
+    skipped = 0
     
-    for q_data in data.questions:
+    for q_data, found in zip(data.questions, matches):
+        if found and data.skip_duplicates:
+            skipped += 1
+            continue
+        
         question = Question(
             instructor_id=current_user.id,
             class_id=data.class_id or q_data.class_id,
@@ -454,12 +787,19 @@ async def bulk_import_questions(
             tags=q_data.tags
         )
         db.add(question)
-        imported += 1
+        questions.append(question)
     
+    service.index_questions(questions)
     db.commit()
     
-    return {"imported": imported, "message": f"Successfully imported {imported} questions"}
-
+    imported = len(questions)
+    
+    return {
+        "imported": imported,
+        "skipped": skipped,
+        "duplicates": [flag.model_dump(mode="json") for flag in _duplicate_flags(matches)],
+        "message": f"Successfully imported {imported} questions"
+    }
 
 
 @router.post("/questions/upload-image")
@@ -476,23 +816,15 @@ async def upload_question_image(
             detail=f"Invalid file type. Allowed: {', '.join(allowed_types)}"
         )
     
-    # Generate unique filename
-    ext = file.filename.split('.')[-1] if file.filename else 'jpg'
-    filename = f"{current_user.id}_{datetime.utcnow().timestamp()}.{ext}"
-    filepath = os.path.join(settings.UPLOAD_DIR, filename)
-    
-    # Save file
-    async with aiofiles.open(filepath, 'wb') as f:
-        content = await file.read()
-        await f.write(content)
+    url = await save_upload_file(file, sub_dir="images")
     
-    return {"url": f"/uploads/{filename}"}
+    return {"url": url}
 
 
 # ==================== AI Generation ====================
 
 from app.schemas.question_ai import QuestionGenerateRequest, AIQuestionResponse
-from app.services.ai_service import ai_service
+from app.services.ai_service import ai_service, AIServiceBusyError, AIServiceTimeoutError
 
 @router.post("/ai/generate-text", response_model=List[AIQuestionResponse])
 async def generate_questions_from_text(
@@ -501,10 +833,119 @@ async def generate_questions_from_text(
 ):
     """Generate questions from text using AI."""
     try:
-        return await ai_service.generate_questions_from_text(data.text, data.count)
+        return await ai_service.generate_questions_from_text(
+            data.text, data.count, instructor_id=current_user.id
+        )
+    except AIServiceBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except AIServiceTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/ai/generate-text/stream")
+async def stream_questions_from_text(
+    data: QuestionGenerateRequest,
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """
+    Generate questions from a long text, streamed as Server-Sent Events.
+    
+    Events: `question` (one generated question), `progress`
+    ({chunks_done, chunks_total}), then `done` ({count}) or `error` ({detail}).
+    """
+    try:
+        ai_service.ensure_available(current_user.id)
+    except AIServiceBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def event_stream():
+        count = 0
+        try:
+            async for event, payload in ai_service.stream_questions_from_text(
+                data.text, data.count, instructor_id=current_user.id
+            ):
+                if event == "question":
+                    try:
+                        payload = AIQuestionResponse(**payload).model_dump()
+                    except ValueError:
+                        continue  # Malformed model output
+                    count += 1
+                yield sse_event(event, payload)
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+            return
+        
+        yield sse_event("done", {"count": count})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/ai/generate-document")
+async def stream_questions_from_document(
+    file: UploadFile = File(...),
+    count: int = Form(5, ge=1, le=30),
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """
+    Generate questions from a PDF or DOCX file, streamed as Server-Sent Events.
+    
+    Same events as /ai/generate-text/stream. Scanned PDF pages are sent to
+    the model as images.
+    """
+    kind = document_type(file.filename or "")
+    if not kind:
+        raise HTTPException(status_code=400, detail="Invalid file type. Allowed: PDF, DOCX")
+    
+    try:
+        ai_service.ensure_available(current_user.id)
+    except AIServiceBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    # Spooled to disk in chunks; pages are read back from the file as needed
+    try:
+        tmp_path, digest = await stream_to_tmp(file, settings.AI_DOCUMENT_MAX_MB * 1024 * 1024)
+    finally:
+        await file.close()
+    
+    try:
+        page_count = await count_pages_async(tmp_path, kind)
+    except ValueError as e:
+        os.remove(tmp_path)
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def event_stream():
+        count_sent = 0
+        try:
+            async for event, payload in ai_service.stream_questions_from_document(
+                tmp_path, kind, digest, page_count, count, instructor_id=current_user.id
+            ):
+                if event == "question":
+                    try:
+                        payload = AIQuestionResponse(**payload).model_dump()
+                    except ValueError:
+                        continue  # Malformed model output
+                    count_sent += 1
+                yield sse_event(event, payload)
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+            return
+        
+        yield sse_event("done", {"count": count_sent})
+    
+    # Removed once the response ends, even if the client left before the body started
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+        background=BackgroundTask(os.remove, tmp_path)
+    )
+
+
 @router.post("/ai/generate-image", response_model=List[AIQuestionResponse])
 async def generate_questions_from_image(
     file: UploadFile = File(...),
@@ -519,29 +960,61 @@ async def generate_questions_from_image(
         )
     
     try:
-        return await ai_service.generate_questions_from_image(file)
+        tmp_path, digest = await stream_to_tmp(file, settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024)
+    finally:
+        await file.close()
+    
+    try:
+        return await ai_service.generate_questions_from_image(tmp_path, digest, instructor_id=current_user.id)
+    except AIServiceBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except AIServiceTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        os.remove(tmp_path)
 
 
 # ==================== Quizzes ====================
 
 @router.get("/quizzes", response_model=QuizListResponse)
 async def list_quizzes(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Instructor = Depends(get_current_instructor),
     class_id: Optional[UUID] = None,
     skip: int = 0,
-    limit: int = 50
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern=COUNT_MODE_PATTERN)
 ):
-    """List all quizzes."""
+    """
+    List all quizzes, newest first.
+    
+    Pass `cursor` (the previous page's `next_cursor`) for keyset paging;
+    `count=estimate` returns a planner-estimated total, `count=none` skips it.
+    Supports If-None-Match.
+    """
+    version = QuizService(db).quiz_list_version(current_user.id, class_id)
+    not_modified = conditional_response(
+        request, response, version, current_user.id, class_id, skip, limit, cursor, count
+    )
+    if not_modified:
+        return not_modified
+    
     query = db.query(Quiz).filter(Quiz.instructor_id == current_user.id)
     
     if class_id:
         query = query.filter(Quiz.class_id == class_id)
     
-    total = query.count()
-    quizzes = query.offset(skip).limit(limit).all()
+    try:
+        quizzes, next_cursor = paginate(query, Quiz, limit, cursor=cursor, skip=skip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    total, is_estimate = count_rows(db, query, count)
     
     result = []
     for q in quizzes:
@@ -567,7 +1040,12 @@ async def list_quizzes(
         }
         result.append(QuizResponse(**quiz_dict))
     
-    return QuizListResponse(quizzes=result, total=total)
+    return QuizListResponse(
+        quizzes=result,
+        total=total,
+        total_is_estimate=is_estimate,
+        next_cursor=next_cursor
+    )
 
 
 @router.post("/quizzes", response_model=QuizResponse, status_code=status.HTTP_201_CREATED)
@@ -617,10 +1095,17 @@ async def create_quiz(
 @router.get("/quizzes/{quiz_id}", response_model=QuizResponse)
 async def get_quiz(
     quiz_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Instructor = Depends(get_current_instructor)
 ):
-    """Get quiz details."""
+    """Get quiz details. Supports If-None-Match."""
+    version = QuizService(db).quiz_version(quiz_id, current_user.id)
+    not_modified = conditional_response(request, response, version, quiz_id)
+    if not_modified:
+        return not_modified
+    
     quiz = db.query(Quiz).filter(
         Quiz.id == quiz_id,
         Quiz.instructor_id == current_user.id
@@ -668,10 +1153,15 @@ async def update_quiz(
         raise HTTPException(status_code=404, detail="Quiz not found")
     
     update_data = data.model_dump(exclude_unset=True)
+    passing_score_changed = update_data.get("passing_score", quiz.passing_score) != quiz.passing_score
     for field, value in update_data.items():
         setattr(quiz, field, value)
     
     quiz.updated_at = datetime.utcnow()
+    if passing_score_changed:
+        # Which attempts passed changed; recount them
+        db.flush()
+        StatsService(db).rebuild(quiz.id)
     db.commit()
     db.refresh(quiz)
     
@@ -739,10 +1229,17 @@ async def publish_quiz(
             detail=f"Cannot publish: Need at least {quiz.question_count} questions in pool, have {quiz.pool_size}"
         )
     
+    newly_published = data.is_published and not quiz.is_published
+    
     quiz.is_published = data.is_published
     db.commit()
     db.refresh(quiz)
     
+    # Announced only the first time it is published
+    if newly_published and data.notify_students:
+        if BroadcastService(db).announce_quiz_published(quiz):
+            wake_broadcast_sender()
+    
     return QuizResponse(
         id=quiz.id,
         class_id=quiz.class_id,
@@ -828,6 +1325,115 @@ async def get_quiz_results(
     }
 
 
+@router.get("/quizzes/{quiz_id}/stats", response_model=QuizStatsResponse)
+async def get_quiz_stats(
+    quiz_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """Get a quiz's statistics (kept up to date on every submit, no attempt scan)."""
+    quiz = db.query(Quiz.title).filter(
+        Quiz.id == quiz_id,
+        Quiz.instructor_id == current_user.id
+    ).first()
+    
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    stats = StatsService(db).get_stats(quiz_id)
+    return QuizStatsResponse(title=quiz.title, **stats)
+
+
+@router.get("/quizzes/{quiz_id}/live")
+async def stream_quiz_live(
+    quiz_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """
+    Watch a running exam, streamed as Server-Sent Events.
+    
+    Events: `stats` (as /quizzes/{id}/stats: started, in progress,
+    submitted, average score, ...) on connect and whenever attempts are
+    started or submitted, at most once per LIVE_MONITOR_INTERVAL_SECONDS.
+    Comment lines keep idle connections open.
+    """
+    quiz = db.query(Quiz.title).filter(
+        Quiz.id == quiz_id,
+        Quiz.instructor_id == current_user.id
+    ).first()
+    
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    title = quiz.title
+    # The stream may stay open for the whole exam; don't hold a connection
+    db.close()
+    
+    def read_stats(session: Session) -> dict:
+        stats = StatsService(session).get_stats(quiz_id)
+        return QuizStatsResponse(title=title, **stats).model_dump(mode="json")
+    
+    async def event_stream():
+        with live_broker.subscribe(quiz_id) as changed:
+            yield sse_event("stats", await run_in_session(read_stats))
+            while True:
+                try:
+                    await asyncio.wait_for(changed.wait(), settings.LIVE_MONITOR_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                # Changes arriving meanwhile are covered by the same read
+                await asyncio.sleep(settings.LIVE_MONITOR_INTERVAL_SECONDS)
+                changed.clear()
+                yield sse_event("stats", await run_in_session(read_stats))
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/quizzes/{quiz_id}/item-analysis", response_model=ItemAnalysisResponse)
+async def get_quiz_item_analysis(
+    quiz_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """
+    Get per-question statistics: difficulty (p-value), discrimination
+    (point-biserial) and option selection rates, overall and in the upper
+    and lower 27% of attempts.
+    """
+    quiz = db.query(Quiz.id).filter(
+        Quiz.id == quiz_id,
+        Quiz.instructor_id == current_user.id
+    ).first()
+    
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    analysis = await run_in_threadpool(ItemAnalysisService(db).analyze, quiz_id)
+    return ItemAnalysisResponse(**analysis)
+
+
+@router.get("/dashboard/stats", response_model=DashboardStatsResponse)
+async def get_dashboard_stats(
+    limit: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: Instructor = Depends(get_current_instructor)
+):
+    """Get statistics of the instructor's most recent quizzes."""
+    quizzes = db.query(Quiz.id, Quiz.title).filter(
+        Quiz.instructor_id == current_user.id
+    ).order_by(Quiz.created_at.desc(), Quiz.id.desc()).limit(limit).all()
+    
+    stats = StatsService(db).get_many([quiz.id for quiz in quizzes])
+    
+    return DashboardStatsResponse(quizzes=[
+        QuizStatsResponse(title=quiz.title, **quiz_stats)
+        for quiz, quiz_stats in zip(quizzes, stats)
+    ])
+
+
 @router.get("/quizzes/{quiz_id}/export")
 async def export_quiz_results(
     quiz_id: UUID,
@@ -846,11 +1452,15 @@ async def export_quiz_results(
     service = QuizService(db)
     results = service.get_quiz_results(quiz_id)
     
+    item_analysis = await run_in_threadpool(ItemAnalysisService(db).analyze, quiz_id)
+    
     # Create Excel file
     excel_buffer = create_quiz_results_excel(
         quiz_title=quiz.title,
         class_name=quiz.class_.name if quiz.class_ else "Unknown",
-        results=results
+        results=results,
+        stats=StatsService(db).get_stats(quiz_id),
+        item_analysis=item_analysis
     )
     
     filename = f"quiz_results_{quiz.title.replace(' ', '_')}_{datetime.utcnow().strftime('%Y%m%d')}.xlsx"
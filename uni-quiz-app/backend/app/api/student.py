@@ -4,7 +4,7 @@ Student API routes - Quiz taking, results, profile.
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -19,6 +19,8 @@ from app.schemas.question import QuestionForStudent, QuestionOption
 from app.schemas.quiz import QuizForStudent
 from app.services.quiz_service import QuizService
 from app.services.enrollment_service import EnrollmentService
+from app.utils.image import student_image_url, placeholder_url
+from app.utils.conditional import conditional_response
 
 router = APIRouter()
 
@@ -84,10 +86,12 @@ async def list_enrolled_classes(
 @router.get("/classes/{class_id}/quizzes", response_model=List[QuizForStudent])
 async def list_class_quizzes(
     class_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Student = Depends(get_current_student)
 ):
-    """List available quizzes for a class."""
+    """List available quizzes for a class. Supports If-None-Match."""
     # Check enrollment
     enrollment = db.query(Enrollment).filter(
         Enrollment.student_id == current_user.id,
@@ -98,6 +102,12 @@ async def list_class_quizzes(
     if not enrollment:
         raise HTTPException(status_code=403, detail="Not enrolled in this class")
     
+    now = datetime.utcnow()
+    version = QuizService(db).class_quizzes_version(class_id, current_user.id, now)
+    not_modified = conditional_response(request, response, version, class_id, current_user.id)
+    if not_modified:
+        return not_modified
+    
     # Get published quizzes
     quizzes = db.query(Quiz).filter(
         Quiz.class_id == class_id,
@@ -105,7 +115,6 @@ async def list_class_quizzes(
     ).all()
     
     result = []
-    now = datetime.utcnow()
     
     for quiz in quizzes:
         # Count attempts
@@ -175,7 +184,9 @@ async def start_quiz(
                 question_text=question.question_text,
                 question_type=question.question_type,
                 options=options,
-                image_url=question.image_url,
+                image_url=student_image_url(question.image_url),
+                image_fallback_url=student_image_url(question.image_url, fmt="jpg"),
+                image_placeholder=placeholder_url(question.image_url),
                 points=question.points
             ))
     
@@ -231,7 +242,9 @@ async def get_attempt(
                 "question_text": question.question_text,
                 "question_type": question.question_type,
                 "options": [o.model_dump() for o in options] if options else None,
-                "image_url": question.image_url,
+                "image_url": student_image_url(question.image_url),
+                "image_fallback_url": student_image_url(question.image_url, fmt="jpg"),
+                "image_placeholder": placeholder_url(question.image_url),
                 "points": question.points,
                 "current_answer": answer.selected_answer if answer else None
             })
@@ -357,7 +370,7 @@ async def submit_quiz(
                 points=question.points,
                 points_earned=answer.points_earned if answer else 0,
                 explanation=question.explanation if quiz.show_explanations else None,
-                image_url=question.image_url
+                image_url=student_image_url(question.image_url)
             ))
         
         result.questions = questions
@@ -368,10 +381,12 @@ async def submit_quiz(
 @router.get("/attempts/{attempt_id}/results", response_model=QuizResultResponse)
 async def get_attempt_results(
     attempt_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Student = Depends(get_current_student)
 ):
-    """Get results for a completed attempt."""
+    """Get results for a completed attempt. Supports If-None-Match."""
     attempt = db.query(QuizAttempt).filter(
         QuizAttempt.id == attempt_id,
         QuizAttempt.student_id == current_user.id
@@ -388,6 +403,11 @@ async def get_attempt_results(
     if not quiz.show_results:
         raise HTTPException(status_code=403, detail="Results not available for this quiz")
     
+    version = QuizService(db).attempt_results_version(attempt)
+    not_modified = conditional_response(request, response, version, attempt_id)
+    if not_modified:
+        return not_modified
+    
     # Build result
     result = QuizResultResponse(
         attempt_id=attempt.id,
@@ -431,7 +451,7 @@ async def get_attempt_results(
             points=question.points,
             points_earned=answer.points_earned if answer else 0,
             explanation=question.explanation if quiz.show_explanations else None,
-            image_url=question.image_url
+            image_url=student_image_url(question.image_url)
         ))
     
     result.questions = questions
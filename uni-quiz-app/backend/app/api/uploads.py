@@ -0,0 +1,54 @@
+"""
+Upload API routes - Direct uploads and object storage redirects.
+"""
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import RedirectResponse
+
+from app.config import settings
+from app.utils.file import receive_direct_upload
+from app.utils.storage import get_storage, verify_local_upload
+
+router = APIRouter()
+
+# Mounted at /uploads instead of the static files app when STORAGE_BACKEND=s3
+redirect_router = APIRouter()
+
+
+@router.post("/direct", status_code=204)
+async def direct_upload(
+    key: str = Form(...),
+    expires: int = Form(...),
+    max_bytes: int = Form(...),
+    signature: str = Form(...),
+    file: UploadFile = File(...)
+):
+    """
+    Receive a presigned upload for the local storage backend.
+    
+    Authorized by the form's signature rather than a bearer token, so the
+    client can send the form exactly as it would to an object store.
+    """
+    if get_storage().name != "local":
+        raise HTTPException(status_code=404, detail="Not found")
+    
+    if not verify_local_upload(key, expires, max_bytes, signature):
+        await file.close()
+        raise HTTPException(status_code=403, detail="Invalid or expired upload signature")
+    
+    await receive_direct_upload(file, key, max_bytes)
+
+
+@redirect_router.get("/{key:path}")
+async def redirect_to_storage(key: str):
+    """Redirect an /uploads URL to the object store."""
+    # Never expose in-progress uploads or other dotfiles
+    if any(part.startswith(".") for part in key.split("/")):
+        raise HTTPException(status_code=404, detail="Not found")
+    
+    # Presigned URLs expire, so the redirect may only be cached for a while
+    max_age = 31536000 if settings.S3_PUBLIC_URL else settings.STORAGE_PRESIGN_EXPIRE_SECONDS // 2
+    return RedirectResponse(
+        get_storage().download_url(key),
+        status_code=307,
+        headers={"Cache-Control": f"public, max-age={max_age}"}
+    )
@@ -1,7 +1,9 @@
 """
 Telegram Bot - Main bot instance and configuration.
 """
+import asyncio
 import logging
+from typing import Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
 from telegram.ext import Application, CommandHandler, ContextTypes
 
@@ -25,18 +27,30 @@ def get_webapp_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
-def create_bot_application() -> Application:
+def create_bot_application(update_queue: Optional[asyncio.Queue] = None) -> Application:
     """
     Create and configure the Telegram bot application.
     
+    Args:
+        update_queue: Queue to read updates from (e.g. a bounded one fed
+            by the webhook); a new unbounded queue by default
+    
     Returns:
         Configured Application instance ready to run
     """
     if not settings.TELEGRAM_BOT_TOKEN:
         raise ValueError("TELEGRAM_BOT_TOKEN not configured")
     
-    # Create application
-    application = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).build()
+    # Create application; updates from different users are handled concurrently
+    builder = (
+        Application.builder()
+        .token(settings.TELEGRAM_BOT_TOKEN)
+        .base_url(settings.TELEGRAM_API_URL)
+        .concurrent_updates(settings.BOT_CONCURRENT_UPDATES)
+    )
+    if update_queue is not None:
+        builder = builder.update_queue(update_queue)
+    application = builder.build()
     
     # Import handlers here to avoid circular imports
     from app.bot.handlers import (
@@ -58,20 +72,16 @@ def create_bot_application() -> Application:
 
 
 def run_bot():
-    """Run the bot using polling (for development)."""
+    """
+    Run the bot using polling (for development).
+    
+    In production set BOT_MODE=webhook instead: the API process then runs
+    the bot itself (see app.bot.webhook).
+    """
+    if settings.BOT_MODE == "webhook":
+        raise ValueError("BOT_MODE is 'webhook': the bot runs inside the API process")
+    
     application = create_bot_application()
     
     logger.info("Starting bot with polling...")
     application.run_polling(allowed_updates=Update.ALL_TYPES)
-
-
-async def setup_webhook(webhook_url: str):
-    """Set up webhook for production."""
-    application = create_bot_application()
-    
-    await application.bot.set_webhook(
-        url=f"{webhook_url}/api/bot/webhook",
-        allowed_updates=Update.ALL_TYPES
-    )
-    
-    logger.info(f"Webhook set to: {webhook_url}/api/bot/webhook")
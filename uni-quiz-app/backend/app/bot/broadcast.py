@@ -0,0 +1,242 @@
+"""
+Telegram Bot - Rate-limited sender for queued broadcasts.
+
+Drains the persistent queue of app.services.broadcast_service while staying
+inside Telegram's limits:
+
+- global: a token bucket of BROADCAST_RATE_PER_SECOND messages (Telegram
+  allows about 30/s per bot)
+- per chat: at least BROADCAST_CHAT_INTERVAL_SECONDS between two messages
+  to the same chat
+- 429 (RetryAfter): sending pauses for the time Telegram asks for; the
+  rest of the batch is deferred without counting as an attempt
+
+Other failures are retried with exponential backoff, up to
+BROADCAST_MAX_ATTEMPTS; blocked bots and unknown chats fail at once.
+
+The sender runs inside the API process (see app.main). With several API
+workers each runs its own sender: rows are never shared between them, but
+the rate limits are per process, so divide BROADCAST_RATE_PER_SECOND by
+the number of workers.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+from telegram.request import HTTPXRequest
+
+from app.bot.db import run_in_session
+from app.bot.handlers import get_webapp_keyboard
+from app.config import settings
+from app.services.broadcast_service import BroadcastService, QueuedMessage, SendResult
+
+logger = logging.getLogger(__name__)
+
+RETRY_MAX_DELAY = 600
+
+
+class RateLimiter:
+    """Async token bucket that can be paused (after a 429)."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        # A small burst keeps any 1s window close to `rate`
+        self.capacity = burst if burst is not None else max(1.0, rate / 4)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds`."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def paused_for(self) -> float:
+        """Seconds left in the current pause (0 when not paused)."""
+        return max(0.0, self._paused_until - time.monotonic())
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a token.
+
+        Returns:
+            False, without waiting, while paused: the caller should defer
+        """
+        async with self._lock:
+            while True:
+                if self.paused_for():
+                    return False
+
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BroadcastSender:
+    """Background task sending queued broadcast messages."""
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+        self.limiter = RateLimiter(settings.BROADCAST_RATE_PER_SECOND)
+        self._chat_ready_at: Dict[int, float] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="broadcast-sender")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self) -> None:
+        """Look for due messages now instead of at the next poll."""
+        self._wake.set()
+
+    async def _run(self) -> None:
+        # Telegram may be unreachable at startup; keep trying instead of failing the API
+        while True:
+            try:
+                await self.bot.initialize()
+                break
+            except TelegramError as e:
+                logger.error(f"Broadcast sender cannot reach Telegram, retrying: {e}")
+                await asyncio.sleep(settings.BROADCAST_POLL_SECONDS)
+
+        while True:
+            try:
+                sent = await self.process_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Broadcast batch failed")
+                sent = 0
+
+            if sent:
+                continue  # More may be due right away
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.BROADCAST_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def process_batch(self) -> int:
+        """
+        Claim, send and record one batch.
+
+        Returns:
+            Number of messages claimed
+        """
+        pause = self.limiter.paused_for()
+        if pause:
+            await asyncio.sleep(pause)
+
+        messages: List[QueuedMessage] = await run_in_session(
+            lambda db: BroadcastService(db).claim_due(
+                settings.BROADCAST_BATCH_SIZE, settings.BROADCAST_LEASE_SECONDS
+            )
+        )
+        if not messages:
+            return 0
+
+        results = await asyncio.gather(*(self._send(message) for message in messages))
+        await run_in_session(lambda db: BroadcastService(db).record_results(results))
+
+        self._forget_idle_chats()
+        return len(messages)
+
+    async def _send(self, message: QueuedMessage) -> SendResult:
+        # Per-chat spacing: wait (or defer, if it is far off) for the chat
+        wait = self._chat_ready_at.get(message.chat_id, 0.0) - time.monotonic()
+        if wait > settings.BROADCAST_CHAT_INTERVAL_SECONDS:
+            return SendResult(message.id, message.broadcast_id, "deferred", delay=wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._chat_ready_at[message.chat_id] = time.monotonic() + settings.BROADCAST_CHAT_INTERVAL_SECONDS
+
+        if not await self.limiter.acquire():
+            # A 429 arrived while this one waited for its token
+            return SendResult(message.id, message.broadcast_id, "deferred", delay=self.limiter.paused_for())
+
+        try:
+            await self.bot.send_message(
+                chat_id=message.chat_id,
+                text=message.text,
+                reply_markup=get_webapp_keyboard()
+            )
+            return SendResult(message.id, message.broadcast_id, "sent")
+
+        except RetryAfter as e:
+            retry_after = float(e.retry_after)
+            logger.warning(f"Telegram flood limit hit, pausing broadcasts for {retry_after}s")
+            self.limiter.pause(retry_after)
+            return SendResult(message.id, message.broadcast_id, "deferred", delay=retry_after, error=str(e))
+
+        except (Forbidden, BadRequest) as e:
+            # Bot blocked, chat not found, ...: retrying will not help
+            return SendResult(message.id, message.broadcast_id, "failed", error=str(e))
+
+        except TelegramError as e:
+            if message.attempts >= settings.BROADCAST_MAX_ATTEMPTS:
+                return SendResult(message.id, message.broadcast_id, "failed", error=str(e))
+            delay = min(RETRY_MAX_DELAY, settings.BROADCAST_RETRY_BASE_SECONDS * 2 ** (message.attempts - 1))
+            delay *= random.uniform(0.8, 1.2)
+            return SendResult(message.id, message.broadcast_id, "retry", delay=delay, error=str(e))
+
+    def _forget_idle_chats(self) -> None:
+        now = time.monotonic()
+        if len(self._chat_ready_at) > 10000:
+            self._chat_ready_at = {
+                chat_id: ready_at for chat_id, ready_at in self._chat_ready_at.items() if ready_at > now
+            }
+
+
+_sender: Optional[BroadcastSender] = None
+
+
+async def start_broadcast_sender() -> None:
+    """Start the sender in the running event loop."""
+    global _sender
+
+    bot = Bot(
+        settings.TELEGRAM_BOT_TOKEN,
+        base_url=settings.TELEGRAM_API_URL,
+        request=HTTPXRequest(connection_pool_size=max(8, int(settings.BROADCAST_RATE_PER_SECOND)))
+    )
+
+    _sender = BroadcastSender(bot)
+    _sender.start()
+    logger.info("Broadcast sender started")
+
+
+async def stop_broadcast_sender() -> None:
+    """Stop the sender; leased messages become due again after their lease."""
+    global _sender
+
+    if _sender is None:
+        return
+
+    sender, _sender = _sender, None
+    await sender.stop()
+    await sender.bot.shutdown()
+
+
+def wake_broadcast_sender() -> None:
+    """Nudge the sender after queueing a broadcast (no-op if not running here)."""
+    if _sender is not None:
+        _sender.wake()
@@ -0,0 +1,42 @@
+"""
+Telegram Bot - Database access off the event loop.
+
+The ORM is synchronous. Handlers must not block the bot's event loop with
+it, or every update waits for the one before it. Database work therefore
+runs on a small dedicated pool, and each call gets its own session:
+
+    result = await run_in_session(register_student, user.id, ...)
+
+Functions run this way receive the session as their first argument. They
+should return plain values, not ORM objects, because the session is closed
+by the time the result reaches the handler.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.config import settings
+from app.database import call_with_session
+
+T = TypeVar("T")
+
+# Bounded below the engine's connection pool so the API keeps connections
+_executor = ThreadPoolExecutor(max_workers=settings.BOT_DB_WORKERS, thread_name_prefix="bot-db")
+
+
+async def run_in_session(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run func(db, *args, **kwargs) on the bot's database pool.
+
+    Args:
+        func: Blocking function taking a Session as its first argument
+        *args: Further positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(call_with_session, func, *args, **kwargs)
+    return await loop.run_in_executor(_executor, call)
@@ -2,11 +2,13 @@
 Telegram Bot - Command handlers.
 """
 import logging
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
 from telegram.ext import ContextTypes
 
+from app.bot.db import run_in_session
 from app.config import settings
-from app.database import SessionLocal
 from app.services.enrollment_service import EnrollmentService
 
 logger = logging.getLogger(__name__)
@@ -26,6 +28,37 @@ def get_webapp_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
+def register_student(
+    db: Session,
+    telegram_id: int,
+    username: Optional[str],
+    first_name: Optional[str],
+    last_name: Optional[str],
+    class_code: Optional[str] = None
+) -> Tuple[Optional[bool], str]:
+    """
+    Get or create a student and enroll them via a class code (blocking).
+    
+    Returns:
+        Tuple of (enrolled, message); enrolled is None when no class code
+        was given
+    """
+    service = EnrollmentService(db)
+    
+    student = service.get_or_create_student(
+        telegram_id=telegram_id,
+        username=username,
+        first_name=first_name,
+        last_name=last_name
+    )
+    
+    if not class_code:
+        return None, ""
+    
+    enrollment, message = service.enroll_student_by_code(student.id, class_code)
+    return enrollment is not None, message
+
+
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Handle /start command with optional deep link payload.
@@ -37,59 +70,48 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     user = update.effective_user
     args = context.args  # Deep link payload
     
-    # Create database session
-    db = SessionLocal()
-    try:
-        service = EnrollmentService(db)
-        
-        # Get or create student
-        student = service.get_or_create_student(
-            telegram_id=user.id,
-            username=user.username,
-            first_name=user.first_name,
-            last_name=user.last_name
-        )
-        
-        # Check for deep link (class enrollment)
-        if args and len(args) > 0:
-            class_code = args[0]
-            
-            if class_code.startswith("class_"):
-                enrollment, message = service.enroll_student_by_code(
-                    student.id, class_code
-                )
-                
-                if enrollment:
-                    await update.message.reply_text(
-                        f"✅ {message}\n\n"
-                        f"Welcome, {user.first_name}! 🎓\n"
-                        f"Open the Quiz App to see available quizzes.",
-                        reply_markup=get_webapp_keyboard()
-                    )
-                else:
-                    await update.message.reply_text(
-                        f"❌ {message}\n\n"
-                        f"Please contact your instructor for a valid link.",
-                        reply_markup=get_webapp_keyboard()
-                    )
-                return
-        
-        # Normal /start without deep link
-        await update.message.reply_text(
-            f"👋 Welcome to University Quiz Bot, {user.first_name}!\n\n"
-            f"🎓 This bot helps you take quizzes for your university classes.\n\n"
-            f"📌 How to get started:\n"
-            f"1. Get an invite link from your instructor\n"
-            f"2. Click the link to enroll in the class\n"
-            f"3. Open the Quiz App to take quizzes\n\n"
-            f"💡 Commands:\n"
-            f"/help - Show help message\n"
-            f"/quiz - Open quiz app",
-            reply_markup=get_webapp_keyboard()
-        )
-        
-    finally:
-        db.close()
+    class_code = args[0] if args and args[0].startswith("class_") else None
+    
+    # Database work runs on the bot's DB pool, not on the event loop
+    enrolled, message = await run_in_session(
+        register_student,
+        user.id,
+        user.username,
+        user.first_name,
+        user.last_name,
+        class_code
+    )
+    
+    # Deep link (class enrollment)
+    if enrolled is not None:
+        if enrolled:
+            await update.message.reply_text(
+                f"✅ {message}\n\n"
+                f"Welcome, {user.first_name}! 🎓\n"
+                f"Open the Quiz App to see available quizzes.",
+                reply_markup=get_webapp_keyboard()
+            )
+        else:
+            await update.message.reply_text(
+                f"❌ {message}\n\n"
+                f"Please contact your instructor for a valid link.",
+                reply_markup=get_webapp_keyboard()
+            )
+        return
+    
+    # Normal /start without deep link
+    await update.message.reply_text(
+        f"👋 Welcome to University Quiz Bot, {user.first_name}!\n\n"
+        f"🎓 This bot helps you take quizzes for your university classes.\n\n"
+        f"📌 How to get started:\n"
+        f"1. Get an invite link from your instructor\n"
+        f"2. Click the link to enroll in the class\n"
+        f"3. Open the Quiz App to take quizzes\n\n"
+        f"💡 Commands:\n"
+        f"/help - Show help message\n"
+        f"/quiz - Open quiz app",
+        reply_markup=get_webapp_keyboard()
+    )
 
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
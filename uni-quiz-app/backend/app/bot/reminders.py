@@ -0,0 +1,60 @@
+"""
+Telegram Bot - Scheduler for quiz deadline reminders.
+
+Every REMINDER_TICK_SECONDS one query finds the reminders that fell due
+(see app.services.reminder_service); they are queued as broadcasts and the
+broadcast sender is woken to deliver them. All state lives in the database,
+so reminders missed while the API was down go out on the first tick after
+a restart, as long as the quiz has not opened or closed yet.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from app.bot.broadcast import wake_broadcast_sender
+from app.bot.db import run_in_session
+from app.config import settings
+from app.services.reminder_service import ReminderService
+
+logger = logging.getLogger(__name__)
+
+_task: Optional[asyncio.Task] = None
+
+
+async def _run() -> None:
+    while True:
+        try:
+            queued = await run_in_session(
+                lambda db: ReminderService(db).enqueue_due(datetime.utcnow())
+            )
+            if queued:
+                logger.info(f"Queued {queued} quiz reminders")
+                wake_broadcast_sender()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Reminder tick failed")
+
+        await asyncio.sleep(settings.REMINDER_TICK_SECONDS)
+
+
+def start_reminder_scheduler() -> None:
+    """Start the scheduler in the running event loop."""
+    global _task
+    _task = asyncio.create_task(_run(), name="reminder-scheduler")
+
+
+async def stop_reminder_scheduler() -> None:
+    """Stop the scheduler."""
+    global _task
+
+    if _task is None:
+        return
+
+    task, _task = _task, None
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
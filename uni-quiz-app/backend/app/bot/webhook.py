@@ -0,0 +1,153 @@
+"""
+Telegram Bot - In-process webhook mode.
+
+With BOT_MODE=webhook the bot runs inside the API process instead of a
+separate polling process (run_bot.py):
+
+    Telegram --POST--> /api/bot/webhook --put--> Application.update_queue
+                                                     |
+                                     handlers, up to BOT_CONCURRENT_UPDATES at once
+
+The endpoint only validates and enqueues, so Telegram is answered at once.
+Telegram redelivers updates it did not get a 2xx for in time, so recently
+seen update_ids are remembered and repeats are dropped. When the queue is
+full the endpoint answers 503 and Telegram retries later.
+
+Each API worker process runs its own application; update_id deduplication
+is per process.
+
+Webhook mode requires TELEGRAM_WEBHOOK_SECRET: Telegram sends it with every
+update and the endpoint rejects requests without it. The secret is not
+generated on the fly, since every worker must register the same one.
+"""
+import asyncio
+import logging
+import re
+from collections import OrderedDict
+from typing import Optional
+
+from telegram import Update
+from telegram.ext import Application
+
+from app.bot.bot import create_bot_application
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Update ids remembered for deduplication
+RECENT_UPDATES = 10000
+
+WEBHOOK_PATH = "/api/bot/webhook"
+
+# Characters and length Telegram accepts for a webhook secret_token
+WEBHOOK_SECRET_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,256}")
+
+
+class BotQueueFullError(Exception):
+    """The update queue is full; the update should be retried later."""
+
+
+class _RecentIds:
+    """Bounded set of recently seen ids, oldest evicted first."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._ids: OrderedDict = OrderedDict()
+
+    def __contains__(self, value: int) -> bool:
+        return value in self._ids
+
+    def add(self, value: int) -> None:
+        self._ids[value] = None
+        if len(self._ids) > self.size:
+            self._ids.popitem(last=False)
+
+
+_application: Optional[Application] = None
+_recent = _RecentIds(RECENT_UPDATES)
+
+
+def get_application() -> Optional[Application]:
+    """The running webhook application, or None outside webhook mode."""
+    return _application
+
+
+async def start_webhook_bot() -> None:
+    """Start the bot application and register the webhook with Telegram."""
+    global _application
+
+    if not settings.TELEGRAM_WEBHOOK_URL:
+        raise ValueError("TELEGRAM_WEBHOOK_URL not configured")
+    if not settings.TELEGRAM_WEBHOOK_SECRET:
+        raise ValueError("TELEGRAM_WEBHOOK_SECRET not configured")
+    if not WEBHOOK_SECRET_PATTERN.fullmatch(settings.TELEGRAM_WEBHOOK_SECRET):
+        raise ValueError(
+            "TELEGRAM_WEBHOOK_SECRET must be 1-256 characters of A-Z, a-z, 0-9, _ and -"
+        )
+
+    application = create_bot_application(
+        update_queue=asyncio.Queue(maxsize=settings.BOT_UPDATE_QUEUE_SIZE)
+    )
+    await application.initialize()
+    await application.start()
+
+    await application.bot.set_webhook(
+        url=f"{settings.TELEGRAM_WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+        secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+        allowed_updates=Update.ALL_TYPES,
+        max_connections=settings.BOT_CONCURRENT_UPDATES
+    )
+    _application = application
+    logger.info(f"Bot running in webhook mode: {settings.TELEGRAM_WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}")
+
+
+async def stop_webhook_bot() -> None:
+    """
+    Stop the bot application.
+
+    The webhook stays registered: Telegram holds updates until the API is
+    back, instead of dropping them.
+    """
+    global _application
+
+    if _application is None:
+        return
+
+    application, _application = _application, None
+    await application.stop()
+    await application.shutdown()
+
+
+def feed_update(data: dict) -> bool:
+    """
+    Queue an update received on the webhook.
+
+    Args:
+        data: Update JSON as sent by Telegram
+
+    Returns:
+        False if the update was already received, True if it was queued
+
+    Raises:
+        RuntimeError: If the bot is not running in webhook mode
+        BotQueueFullError: If the update queue is full
+    """
+    application = _application
+    if application is None:
+        raise RuntimeError("Bot is not running in webhook mode")
+
+    update = Update.de_json(data, application.bot)
+    if update is None:
+        return False
+
+    if update.update_id in _recent:
+        return False
+
+    try:
+        application.update_queue.put_nowait(update)
+    except asyncio.QueueFull:
+        raise BotQueueFullError("Bot update queue is full")
+
+    # Remembered only once queued, so a rejected update is accepted on retry
+    _recent.add(update.update_id)
+    return True
@@ -27,6 +27,53 @@ class Settings(BaseSettings):
     TELEGRAM_BOT_TOKEN: str = ""
     TELEGRAM_BOT_USERNAME: str = ""
     TELEGRAM_WEBAPP_URL: str = ""
+    # Updates processed at once, and threads for the bot's database work
+    # (keep BOT_DB_WORKERS below the engine's connection pool size)
+    BOT_CONCURRENT_UPDATES: int = 64
+    BOT_DB_WORKERS: int = 8
+    # "polling" (separate run_bot.py process, development) or "webhook"
+    # (the API process runs the bot; needs a public TELEGRAM_WEBHOOK_URL and
+    # a TELEGRAM_WEBHOOK_SECRET)
+    BOT_MODE: str = "polling"
+    TELEGRAM_WEBHOOK_URL: str = ""
+    TELEGRAM_WEBHOOK_SECRET: str = ""
+    BOT_UPDATE_QUEUE_SIZE: int = 1000
+    # Deep-link class codes are cached per process for this long; a
+    # deactivated class may accept joins on other workers until it expires
+    CLASS_CODE_CACHE_SECONDS: int = 60
+    # Bot API endpoint (override to use a local Bot API or a fake server in tests)
+    TELEGRAM_API_URL: str = "https://api.telegram.org/bot"
+    
+    # Broadcasts (quiz announcements, reminders): sent by a background task in
+    # the API process; rates are per process
+    BROADCAST_WORKER: bool = True
+    BROADCAST_RATE_PER_SECOND: float = 25
+    BROADCAST_CHAT_INTERVAL_SECONDS: float = 1.0
+    BROADCAST_BATCH_SIZE: int = 50
+    BROADCAST_LEASE_SECONDS: int = 120
+    BROADCAST_MAX_ATTEMPTS: int = 5
+    BROADCAST_RETRY_BASE_SECONDS: float = 5
+    BROADCAST_POLL_SECONDS: float = 5
+    
+    # Quiz deadline reminders (queued as broadcasts, once per quiz and kind)
+    REMINDER_SCHEDULER: bool = True
+    REMINDER_TICK_SECONDS: int = 60
+    REMINDER_OPENS_BEFORE_MINUTES: int = 60
+    REMINDER_CLOSES_BEFORE_MINUTES: int = 30
+    
+    # Timed attempts left open (student closed the app) are graded in the
+    # background once their deadline plus the grace period has passed
+    ATTEMPT_SWEEPER: bool = True
+    ATTEMPT_SWEEP_SECONDS: int = 30
+    ATTEMPT_SWEEP_BATCH_SIZE: int = 200
+    ATTEMPT_GRACE_SECONDS: int = 30
+    
+    # Live exam monitoring (SSE): "memory" (single worker) or "postgres"
+    # (LISTEN/NOTIFY, any number of workers). Each stream reads the quiz's
+    # stats at most once per interval, however many students submit
+    LIVE_MONITOR_BACKEND: str = "memory"
+    LIVE_MONITOR_INTERVAL_SECONDS: float = 1.0
+    LIVE_MONITOR_HEARTBEAT_SECONDS: int = 15
     
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
@@ -35,15 +82,77 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
     
+    # Response compression: bodies smaller than this (bytes) are sent as-is
+    COMPRESSION_MIN_SIZE: int = 1024
+    
     # File Upload
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE_MB: int = 10
+    # Class roster imports (CSV / XLSX)
+    ROSTER_MAX_ROWS: int = 5000
+    
+    # Image derivatives (comma-separated widths in px)
+    IMAGE_DERIVATIVE_WIDTHS: str = "320,640,1080"
+    STUDENT_IMAGE_WIDTH: int = 640
+    IMAGE_WORKERS: int = 2
+    
+    # Uploads serving: "" (serve from Python), "x-accel-redirect" (nginx) or "x-sendfile"
+    UPLOADS_OFFLOAD: str = ""
+    UPLOADS_ACCEL_PREFIX: str = "/protected-uploads/"
+    
+    @property
+    def image_derivative_widths(self) -> List[int]:
+        return sorted(int(w) for w in self.IMAGE_DERIVATIVE_WIDTHS.split(",") if w.strip())
+    
+    # Object storage: "local" (UPLOAD_DIR) or "s3" (any S3-compatible store, e.g. MinIO)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_PRESIGN_EXPIRE_SECONDS: int = 900
+    S3_BUCKET: str = ""
+    S3_ENDPOINT_URL: str = ""
+    S3_REGION: str = ""
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_PUBLIC_URL: str = ""
     
     # Redis (optional)
     REDIS_URL: str = ""
 
     # AI Service
     GEMINI_API_KEY: str = ""
+    GEMINI_MODEL: str = "gemini-flash-latest"
+    GEMINI_API_ENDPOINT: str = ""  # e.g. http://localhost:8765 for a local fake server
+    AI_MAX_CONCURRENCY: int = 4
+    AI_MAX_CONCURRENCY_PER_INSTRUCTOR: int = 2
+    # Per model request; a generation (queueing, retries and backoff
+    # included) gives up after AI_TOTAL_TIMEOUT_SECONDS
+    AI_TIMEOUT_SECONDS: int = 90
+    AI_TOTAL_TIMEOUT_SECONDS: int = 240
+    AI_MAX_RETRIES: int = 2
+    
+    # Long documents are split into overlapping chunks, generated concurrently
+    AI_CHUNK_CHARS: int = 6000
+    AI_CHUNK_OVERLAP_CHARS: int = 500
+    AI_MAX_CHUNKS: int = 12
+    AI_CHUNK_CONCURRENCY: int = 3
+    
+    # PDF/DOCX ingestion: scanned pages are rendered and sent as images
+    AI_DOCUMENT_MAX_MB: int = 50
+    AI_PAGE_IMAGE_DPI: int = 150
+    AI_MAX_PAGE_IMAGES: int = 10  # Per chunk
+    DOCUMENT_WORKERS: int = 2
+    
+    # Images are shrunk before vision calls; tall scans are cut into tiles
+    AI_IMAGE_MAX_SIDE: int = 1536
+    AI_IMAGE_TILE_RATIO: float = 2.5
+    AI_IMAGE_MAX_TILES: int = 6
+    
+    # Near-duplicate questions: minimum estimated similarity (0-1) to flag
+    QUESTION_DUPLICATE_THRESHOLD: float = 0.7
+    
+    # Cache of generated questions by input hash ("" disables it)
+    AI_CACHE_DIR: str = "./uploads/.ai-cache"
+    AI_CACHE_TTL_HOURS: int = 168
+    AI_CACHE_MAX_MB: int = 100
     
     class Config:
         env_file = ".env"
@@ -1,6 +1,9 @@
 """
 Database connection and session management.
 """
+import asyncio
+from typing import Any, Callable, TypeVar
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -21,6 +24,8 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base class for models
 Base = declarative_base()
 
+T = TypeVar("T")
+
 
 def get_db():
     """
@@ -32,3 +37,27 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def call_with_session(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call func(db, *args, **kwargs) with a new session, closed afterwards."""
+    db = SessionLocal()
+    try:
+        return func(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def run_in_session(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run func(db, *args, **kwargs) in a worker thread, with its own session.
+
+    For async code outside a request (background tasks, long-lived streams)
+    that must not block the event loop or hold a request's session. Uses
+    the loop's default executor, not the bot's database pool
+    (app.bot.db), so API work never competes with bot updates.
+
+    Returns:
+        Whatever func returns
+    """
+    return await asyncio.to_thread(call_with_session, func, *args, **kwargs)
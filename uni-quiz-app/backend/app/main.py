@@ -1,13 +1,44 @@
 """
 University Quiz App - Main Application
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import os
 
 from app.config import settings
-from app.api import auth, instructor, student, bot
+from app.api import auth, instructor, student, bot, uploads
+from app.utils.static import create_upload_app
+from app.utils.compression import CompressionMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the Telegram bot (webhook mode), broadcast sender, reminders, attempt sweeper and live monitor in-process."""
+    from app.bot.broadcast import start_broadcast_sender, stop_broadcast_sender
+    from app.bot.reminders import start_reminder_scheduler, stop_reminder_scheduler
+    from app.bot.webhook import start_webhook_bot, stop_webhook_bot
+    from app.services.attempt_sweeper import start_attempt_sweeper, stop_attempt_sweeper
+    from app.services.live_monitor import start_live_monitor, stop_live_monitor
+    
+    await start_live_monitor()
+    if settings.BOT_MODE == "webhook":
+        await start_webhook_bot()
+    if settings.BROADCAST_WORKER and settings.TELEGRAM_BOT_TOKEN:
+        await start_broadcast_sender()
+        if settings.REMINDER_SCHEDULER:
+            start_reminder_scheduler()
+    if settings.ATTEMPT_SWEEPER:
+        start_attempt_sweeper()
+    try:
+        yield
+    finally:
+        await stop_attempt_sweeper()
+        await stop_reminder_scheduler()
+        await stop_broadcast_sender()
+        await stop_webhook_bot()
+        await stop_live_monitor()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -16,6 +47,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs" if settings.DEBUG else None,
     redoc_url="/api/redoc" if settings.DEBUG else None,
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -27,15 +59,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for uploads
-if os.path.exists(settings.UPLOAD_DIR):
-    app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+# Compress responses (brotli or gzip, as the client accepts)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Uploads: redirect to the object store, or serve local files (immutable caching
+# for content-addressed files)
+if settings.STORAGE_BACKEND == "s3":
+    app.include_router(uploads.redirect_router, prefix="/uploads", tags=["Uploads"])
+elif os.path.exists(settings.UPLOAD_DIR):
+    app.mount("/uploads", create_upload_app(), name="uploads")
 
 # Include API routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(instructor.router, prefix="/api/instructor", tags=["Instructor"])
 app.include_router(student.router, prefix="/api/student", tags=["Student"])
 app.include_router(bot.router, prefix="/api/bot", tags=["Bot"])
+app.include_router(uploads.router, prefix="/api/uploads", tags=["Uploads"])
 
 
 @app.get("/")
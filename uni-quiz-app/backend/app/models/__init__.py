@@ -5,9 +5,11 @@ from app.models.instructor import Instructor
 from app.models.student import Student
 from app.models.class_ import Class
 from app.models.enrollment import Enrollment
-from app.models.question import Question
+from app.models.question import Question, QuestionLSHBucket
 from app.models.quiz import Quiz, QuizQuestionPool
 from app.models.attempt import QuizAttempt, StudentAnswer
+from app.models.broadcast import Broadcast, BroadcastMessage
+from app.models.stats import QuizStats
 
 __all__ = [
     "Instructor",
@@ -15,8 +17,12 @@ __all__ = [
     "Class",
     "Enrollment",
     "Question",
+    "QuestionLSHBucket",
     "Quiz",
     "QuizQuestionPool",
     "QuizAttempt",
     "StudentAnswer",
+    "Broadcast",
+    "BroadcastMessage",
+    "QuizStats",
 ]
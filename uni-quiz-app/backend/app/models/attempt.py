@@ -4,7 +4,7 @@ QuizAttempt and StudentAnswer models for tracking quiz attempts.
 import uuid
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Integer, Numeric
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Integer, Numeric, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -15,6 +15,13 @@ class QuizAttempt(Base):
     
     __tablename__ = "quiz_attempts"
     
+    __table_args__ = (
+        # "Has this student attempted this quiz" (anti-joins for reminders)
+        Index("ix_quiz_attempts_quiz_student", "quiz_id", "student_id"),
+        # Expired-attempt sweeper: open attempts, oldest first
+        Index("ix_quiz_attempts_open_started", "started_at", postgresql_where="NOT is_completed"),
+    )
+    
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     quiz_id = Column(UUID(as_uuid=True), ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False, index=True)
     student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), nullable=False, index=True)
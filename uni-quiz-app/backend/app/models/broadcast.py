@@ -0,0 +1,95 @@
+"""
+Broadcast and BroadcastMessage models for Telegram announcements.
+"""
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, BigInteger, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class Broadcast(Base):
+    """A message fanned out to the students of a class, with delivery stats."""
+
+    __tablename__ = "broadcasts"
+
+    __table_args__ = (
+        Index("ix_broadcasts_class_created", "class_id", "created_at"),
+        # Each quiz is announced and reminded of at most once
+        Index(
+            "ux_broadcasts_quiz_kind",
+            "quiz_id",
+            "kind",
+            unique=True,
+            postgresql_where="kind IN ('quiz_published', 'reminder_opens', 'reminder_closes')",
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    instructor_id = Column(UUID(as_uuid=True), ForeignKey("instructors.id", ondelete="CASCADE"), nullable=False, index=True)
+    class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id", ondelete="CASCADE"), nullable=False)
+    quiz_id = Column(UUID(as_uuid=True), ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=True, index=True)
+
+    kind = Column(String(30), nullable=False, default="announcement")
+    # Kinds: 'announcement', 'quiz_published', 'reminder_opens', 'reminder_closes'
+    text = Column(Text, nullable=False)
+
+    # Delivery stats, updated by the sender as messages finish
+    total = Column(Integer, nullable=False, default=0)
+    sent = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    messages = relationship("BroadcastMessage", back_populates="broadcast", cascade="all, delete-orphan", passive_deletes=True)
+
+    @property
+    def pending(self) -> int:
+        """Messages not yet delivered or given up on."""
+        return max(0, self.total - self.sent - self.failed)
+
+    def __repr__(self):
+        return f"<Broadcast {self.id} {self.kind} {self.sent}/{self.total}>"
+
+
+class BroadcastMessage(Base):
+    """
+    One queued Telegram message of a broadcast.
+
+    The table is the persistent send queue: the sender claims due rows by
+    pushing next_attempt_at forward (a lease), so rows of a crashed sender
+    become due again and sending resumes after a restart.
+    """
+
+    __tablename__ = "broadcast_messages"
+
+    __table_args__ = (
+        UniqueConstraint("broadcast_id", "chat_id", name="uq_broadcast_chat"),
+        # The sender's claim query: due pending messages, oldest first
+        Index(
+            "ix_broadcast_messages_due",
+            "next_attempt_at",
+            postgresql_where="status = 'pending'",
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    broadcast_id = Column(UUID(as_uuid=True), ForeignKey("broadcasts.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), nullable=True)
+    chat_id = Column(BigInteger, nullable=False)
+
+    status = Column(String(10), nullable=False, default="pending")
+    # Statuses: 'pending', 'sent', 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    error = Column(String(255), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    broadcast = relationship("Broadcast", back_populates="messages")
+
+    def __repr__(self):
+        return f"<BroadcastMessage {self.id} chat={self.chat_id} {self.status}>"
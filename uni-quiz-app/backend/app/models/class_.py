@@ -4,7 +4,7 @@ Class model for instructor courses/classes.
 import uuid
 import secrets
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -20,6 +20,11 @@ class Class(Base):
     
     __tablename__ = "classes"
     
+    __table_args__ = (
+        # Keyset pagination of an instructor's classes, newest first
+        Index("ix_classes_instructor_created", "instructor_id", "created_at", "id"),
+    )
+    
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     instructor_id = Column(UUID(as_uuid=True), ForeignKey("instructors.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(255), nullable=False)
@@ -3,17 +3,39 @@ Question model for the question bank.
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Integer
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Integer, BigInteger, Computed, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR, ARRAY
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
 
+# Text search configuration for the question bank. 'simple' does no stemming,
+# which keeps mixed-language banks (e.g. Persian + English) searchable.
+SEARCH_CONFIG = "simple"
+
 
 class Question(Base):
     """Question model for the question bank."""
     
     __tablename__ = "questions"
     
+    __table_args__ = (
+        # Keyset pagination of an instructor's bank, newest first
+        Index("ix_questions_instructor_created", "instructor_id", "created_at", "id"),
+        Index("ix_questions_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_questions_tags",
+            "tags",
+            postgresql_using="gin",
+            postgresql_ops={"tags": "jsonb_path_ops"},
+        ),
+        # Active questions still missing from the duplicate index
+        Index(
+            "ix_questions_minhash_missing",
+            "instructor_id",
+            postgresql_where="minhash IS NULL AND is_active",
+        ),
+    )
+    
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     instructor_id = Column(UUID(as_uuid=True), ForeignKey("instructors.id", ondelete="CASCADE"), nullable=False, index=True)
     class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id", ondelete="SET NULL"), nullable=True, index=True)
@@ -36,6 +58,20 @@ class Question(Base):
     difficulty = Column(String(20), default="medium")  # easy, medium, hard
     tags = Column(JSONB, nullable=True)  # ["chapter1", "midterm", ...]
     
+    # Full-text search document, maintained by Postgres (deferred: never needed in responses)
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(question_text, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(explanation, '')), 'B')",
+            persisted=True,
+        ),
+    ))
+    
+    # MinHash signature of text + options for near-duplicate detection
+    # (see app.services.duplicate_service); NULL until indexed
+    minhash = deferred(Column(ARRAY(Integer), nullable=True))
+    
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -48,3 +84,18 @@ class Question(Base):
     
     def __repr__(self):
         return f"<Question {self.id}: {self.question_text[:50]}...>"
+
+
+class QuestionLSHBucket(Base):
+    """LSH bucket membership of an active question, for duplicate lookups."""
+    
+    __tablename__ = "question_lsh_buckets"
+    
+    # Primary key order serves "questions in these buckets" and the
+    # per-instructor GROUP BY bucket as index-only scans
+    instructor_id = Column(UUID(as_uuid=True), ForeignKey("instructors.id", ondelete="CASCADE"), primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+    question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True, index=True)
+    
+    def __repr__(self):
+        return f"<QuestionLSHBucket {self.bucket}: {self.question_id}>"
@@ -3,7 +3,7 @@ Quiz and QuizQuestionPool models.
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Integer, UniqueConstraint
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Integer, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -14,6 +14,14 @@ class Quiz(Base):
     
     __tablename__ = "quizzes"
     
+    __table_args__ = (
+        # Keyset pagination of an instructor's quizzes, newest first
+        Index("ix_quizzes_instructor_created", "instructor_id", "created_at", "id"),
+        # Reminder scheduler: published quizzes opening / closing soon
+        Index("ix_quizzes_published_start", "start_time", postgresql_where="is_published"),
+        Index("ix_quizzes_published_end", "end_time", postgresql_where="is_published"),
+    )
+    
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id", ondelete="CASCADE"), nullable=False, index=True)
     instructor_id = Column(UUID(as_uuid=True), ForeignKey("instructors.id", ondelete="CASCADE"), nullable=False, index=True)
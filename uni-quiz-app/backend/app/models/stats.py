@@ -0,0 +1,40 @@
+"""
+QuizStats model - incrementally maintained per-quiz statistics.
+"""
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, BigInteger, Numeric
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from app.database import Base
+
+# Score histogram: HISTOGRAM_BUCKETS buckets of equal width over 0-100%
+HISTOGRAM_BUCKETS = 10
+
+
+class QuizStats(Base):
+    """
+    Running totals of a quiz's attempts, so statistics never scan attempts.
+    
+    Rows are only changed by adding deltas (app.services.stats_service), so
+    concurrent submits never overwrite each other's counts.
+    """
+    
+    __tablename__ = "quiz_stats"
+    
+    quiz_id = Column(UUID(as_uuid=True), ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    
+    attempts_started = Column(Integer, nullable=False, default=0)
+    attempts_completed = Column(Integer, nullable=False, default=0)
+    passed_count = Column(Integer, nullable=False, default=0)
+    
+    # Sums over completed attempts, for mean and standard deviation
+    score_sum = Column(Numeric(14, 2), nullable=False, default=0)
+    score_sq_sum = Column(Numeric(18, 4), nullable=False, default=0)
+    time_spent_sum = Column(BigInteger, nullable=False, default=0)
+    
+    # Completed attempts per score bucket: [0-10%), [10-20%), ..., [90-100%]
+    histogram = Column(ARRAY(Integer, zero_indexes=True), nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<QuizStats {self.quiz_id} {self.attempts_completed}/{self.attempts_started}>"
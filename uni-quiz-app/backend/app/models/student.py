@@ -3,7 +3,7 @@ Student model for storing Telegram user information.
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, BigInteger
+from sqlalchemy import Column, String, Boolean, DateTime, BigInteger, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -20,7 +20,7 @@ class Student(Base):
     first_name = Column(String(255), nullable=True)
     last_name = Column(String(255), nullable=True)
     phone_number = Column(String(20), nullable=True)
-    student_id = Column(String(50), nullable=True)  # University student ID
+    student_id = Column(String(50), nullable=True, index=True)  # University student ID
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -37,3 +37,7 @@ class Student(Base):
     
     def __repr__(self):
         return f"<Student {self.telegram_id}: {self.full_name}>"
+
+
+# Roster imports match students by username, case-insensitively
+Index("ix_students_username_lower", func.lower(Student.telegram_username))
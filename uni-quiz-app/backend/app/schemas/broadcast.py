@@ -0,0 +1,35 @@
+"""
+Broadcast-related schemas.
+"""
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+from uuid import UUID
+
+
+class BroadcastCreate(BaseModel):
+    """Message to send to every student of a class."""
+    text: str = Field(..., min_length=1, max_length=4096)  # Telegram's message limit
+
+
+class BroadcastResponse(BaseModel):
+    """Broadcast with delivery stats."""
+    id: UUID
+    class_id: UUID
+    quiz_id: Optional[UUID]
+    kind: str
+    text: str
+    total: int
+    sent: int
+    failed: int
+    pending: int
+    created_at: datetime
+    completed_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+
+class BroadcastListResponse(BaseModel):
+    """List of broadcasts, newest first."""
+    broadcasts: List[BroadcastResponse]
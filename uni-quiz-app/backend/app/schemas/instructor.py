@@ -66,7 +66,9 @@ class ClassResponse(BaseModel):
 class ClassListResponse(BaseModel):
     """List of classes response."""
     classes: List[ClassResponse]
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
 
 
 class InviteLinkResponse(BaseModel):
@@ -90,3 +92,24 @@ class EnrolledStudentResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class RosterUnresolvedRow(BaseModel):
+    """A roster row that could not be matched to a student."""
+    line: int
+    value: str
+    reason: str
+
+
+class RosterImportResponse(BaseModel):
+    """Summary of a roster import."""
+    total: int
+    matched: int  # Existing students
+    created: int  # New students, from rows with a Telegram ID
+    enrolled: int  # New or reactivated enrollments
+    already_enrolled: int
+    unresolved_count: int
+    unresolved: List[RosterUnresolvedRow]  # First rows only; see unresolved_count
+    
+    class Config:
+        from_attributes = True
@@ -2,7 +2,7 @@
 Question-related schemas.
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
 from datetime import datetime
 from uuid import UUID
 from .question_ai import QuestionGenerateRequest, AIQuestionResponse
@@ -67,6 +67,20 @@ class QuestionResponse(BaseModel):
 class QuestionListResponse(BaseModel):
     """List of questions response."""
     questions: List[QuestionResponse]
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+
+
+class QuestionSearchHit(QuestionResponse):
+    """Question search result with its relevance rank."""
+    rank: float = 0.0
+
+
+class QuestionSearchResponse(BaseModel):
+    """Ranked question search results with tag facet counts."""
+    questions: List[QuestionSearchHit]
+    facets: Dict[str, int]
     total: int
 
 
@@ -76,7 +90,9 @@ class QuestionForStudent(BaseModel):
     question_text: str
     question_type: str
     options: Optional[List[QuestionOption]]
-    image_url: Optional[str]
+    image_url: Optional[str]  # Resized WebP derivative when available
+    image_fallback_url: Optional[str] = None  # Same size, JPEG
+    image_placeholder: Optional[str] = None  # Tiny preview shown while loading
     points: int
     
     class Config:
@@ -87,3 +103,40 @@ class BulkQuestionImport(BaseModel):
     """Bulk import questions schema."""
     class_id: Optional[UUID] = None
     questions: List[QuestionCreate]
+    skip_duplicates: bool = False  # Leave out questions flagged as near-duplicates
+
+
+class DuplicateMatch(BaseModel):
+    """A question in the bank (or earlier in the same batch) similar to a checked one."""
+    question_id: Optional[UUID] = None
+    index: Optional[int] = None  # Position in the checked batch
+    similarity: float
+
+
+class DuplicateFlag(BaseModel):
+    """Near-duplicates found for one checked question."""
+    index: int
+    matches: List[DuplicateMatch]
+
+
+class DuplicateCheckRequest(BaseModel):
+    """Questions to check against the bank before importing them."""
+    questions: List[QuestionCreate]
+    threshold: Optional[float] = Field(None, ge=0.3, le=1.0)
+
+
+class DuplicateCheckResponse(BaseModel):
+    """Only questions with at least one near-duplicate are listed."""
+    flagged: List[DuplicateFlag]
+
+
+class DuplicateCluster(BaseModel):
+    """Group of near-identical questions, oldest first."""
+    similarity: float  # Lowest confirmed pairwise similarity in the group
+    questions: List[QuestionResponse]
+
+
+class DuplicateClusterResponse(BaseModel):
+    """Near-duplicate clusters in an instructor's bank, largest first."""
+    clusters: List[DuplicateCluster]
+    total: int
@@ -4,8 +4,8 @@ from typing import List, Optional
 
 class QuestionGenerateRequest(BaseModel):
     """Schema for text-to-question generation."""
-    text: str = Field(..., min_length=50, max_length=20000)
-    count: int = Field(default=5, ge=1, le=10)
+    text: str = Field(..., min_length=50, max_length=200000)
+    count: int = Field(default=5, ge=1, le=30)
 
 class AIQuestionResponse(BaseModel):
     """Schema for AI generated question response."""
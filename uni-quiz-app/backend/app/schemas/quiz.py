@@ -68,7 +68,9 @@ class QuizResponse(BaseModel):
 class QuizListResponse(BaseModel):
     """List of quizzes response."""
     quizzes: List[QuizResponse]
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
 
 
 class QuizForStudent(BaseModel):
@@ -96,3 +98,55 @@ class AddQuestionsToQuiz(BaseModel):
 class QuizPublish(BaseModel):
     """Publish quiz."""
     is_published: bool = True
+    notify_students: bool = True  # Announce on Telegram when first published
+
+
+class QuizStatsResponse(BaseModel):
+    """Statistics of a quiz's attempts, maintained as attempts come in."""
+    quiz_id: UUID
+    title: Optional[str] = None
+    attempts_started: int
+    attempts_completed: int
+    in_progress: int
+    passed_count: int
+    pass_rate: Optional[float]  # Percent of completed attempts
+    average_score: Optional[float]
+    score_stddev: Optional[float]
+    average_time_seconds: Optional[float]
+    histogram: List[int]  # Completed attempts per score bucket, lowest first
+    bucket_width: float  # Percentage points per bucket
+    updated_at: Optional[datetime]
+
+
+class DashboardStatsResponse(BaseModel):
+    """Statistics of an instructor's most recent quizzes."""
+    quizzes: List[QuizStatsResponse]
+
+
+class ItemOptionStats(BaseModel):
+    """Selection statistics of one answer option (or no / another answer)."""
+    option_id: Optional[str]  # None for "Other answer" and "No answer"
+    label: str
+    is_correct: bool
+    count: int
+    rate: Optional[float]  # Share of attempts presented the question
+    upper_rate: Optional[float]  # Same, in the top 27% of attempts by score
+    lower_rate: Optional[float]  # Same, in the bottom 27%
+
+
+class ItemStats(BaseModel):
+    """Item analysis of one question."""
+    question_id: UUID
+    question_text: str
+    question_type: str
+    attempts: int  # Completed attempts presented the question
+    p_value: Optional[float]  # Difficulty: share answering correctly
+    discrimination: Optional[float]  # Point-biserial with the rest score
+    options: List[ItemOptionStats]
+
+
+class ItemAnalysisResponse(BaseModel):
+    """Item analysis of a quiz's completed attempts."""
+    quiz_id: UUID
+    attempts: int
+    items: List[ItemStats]
@@ -0,0 +1,33 @@
+"""
+Upload schemas - Presigned direct uploads.
+"""
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+
+
+class PresignUploadRequest(BaseModel):
+    """Schema for requesting a direct upload."""
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str
+    size: int = Field(..., gt=0)
+    sha256: str = Field(..., pattern=r"^[0-9a-fA-F]{64}$")
+
+
+class PresignedForm(BaseModel):
+    """Multipart form to POST the file with (fields first, then `file`)."""
+    method: str
+    url: str
+    fields: Dict[str, str]
+
+
+class PresignUploadResponse(BaseModel):
+    """Schema for a prepared direct upload."""
+    key: str
+    url: str
+    exists: bool
+    upload: Optional[PresignedForm] = None
+
+
+class CompleteUploadRequest(BaseModel):
+    """Schema for finishing a direct upload."""
+    key: str = Field(..., max_length=255)
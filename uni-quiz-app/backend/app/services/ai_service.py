@@ -1,16 +1,76 @@
 
+import asyncio
+import functools
 import json
 import logging
-import os
-from typing import List, Optional
+import math
+import random
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
 
 import google.generativeai as genai
-from fastapi import UploadFile
+import requests
+from google.api_core import exceptions as google_exceptions
 
 from app.config import settings
+from app.utils.ai_cache import ai_result_cache, cache_key
+from app.utils.documents import extract_pages_async, page_ranges
+from app.utils.image import prepare_vision_image_async
+from app.utils.text import split_text
 
 logger = logging.getLogger(__name__)
 
+# Errors worth another try: rate limits, overload, transient server/network failures
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.GatewayTimeout,
+    ConnectionError,
+    requests.ConnectionError,
+    requests.Timeout,
+)
+
+# Bump whenever a prompt changes, so cached results of the old prompt are not reused
+PROMPT_VERSION = 1
+
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 10.0
+
+TIMEOUT_MESSAGE = "AI generation timed out. Please try again."
+
+# Questions from different chunks sharing this share of words are duplicates
+DUPLICATE_SIMILARITY = 0.8
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _question_tokens(question: dict) -> set:
+    return set(_WORD_RE.findall(str(question.get("question_text", "")).lower()))
+
+
+def _similarity(a: set, b: set) -> float:
+    """Jaccard similarity of two word sets."""
+    if not a or not b:
+        return 1.0 if a == b else 0.0
+    return len(a & b) / len(a | b)
+
+
+class AIServiceBusyError(Exception):
+    """The instructor already has the maximum number of generations running."""
+
+
+class AIServiceTimeoutError(Exception):
+    """The model did not answer within AI_TIMEOUT_SECONDS (per attempt) or AI_TOTAL_TIMEOUT_SECONDS."""
+
+
 class AIService:
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
@@ -18,9 +78,24 @@ class AIService:
             logger.warning("GEMINI_API_KEY is not set. AI features will be disabled.")
             self.model = None
         else:
-            genai.configure(api_key=self.api_key)
+            if settings.GEMINI_API_ENDPOINT:
+                # Custom endpoint (proxy or local fake server) over plain REST
+                genai.configure(
+                    api_key=self.api_key,
+                    transport="rest",
+                    client_options={"api_endpoint": settings.GEMINI_API_ENDPOINT}
+                )
+            else:
+                genai.configure(api_key=self.api_key)
             # Use specific model version to ensure availability
-            self.model = genai.GenerativeModel('gemini-flash-latest')
+            self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+
+        # The SDK call is blocking: run it on a bounded pool, never on the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.AI_MAX_CONCURRENCY, thread_name_prefix="ai"
+        )
+        self._global_limit = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+        self._in_flight: Dict[str, int] = defaultdict(int)
 
     def _clean_json_response(self, text: str) -> str:
         """Clean markdown code blocks from response."""
@@ -33,15 +108,131 @@ class AIService:
             text = text[:-3]
         return text.strip()
 
-    async def generate_questions_from_text(self, text: str, count: int = 5) -> List[dict]:
-        """Generate multiple choice questions from text."""
+    @asynccontextmanager
+    async def _instructor_slot(self, instructor_id: Optional[UUID]):
+        """Reserve one of the instructor's concurrent generation slots."""
+        key = str(instructor_id) if instructor_id else None
+        if key and self._in_flight[key] >= settings.AI_MAX_CONCURRENCY_PER_INSTRUCTOR:
+            raise AIServiceBusyError(
+                "Too many AI generations running. Please wait for the current ones to finish."
+            )
+
+        if key:
+            self._in_flight[key] += 1
+        try:
+            yield
+        finally:
+            if key:
+                self._in_flight[key] -= 1
+                if not self._in_flight[key]:
+                    del self._in_flight[key]
+
+    def _release_slot(self, future: asyncio.Future) -> None:
+        self._global_limit.release()
+        if not future.cancelled():
+            future.exception()  # Retrieved, so an abandoned call's error is not reported as unhandled
+
+    async def _attempt(self, contents: Any, deadline: float) -> str:
+        """
+        One model request on the worker pool, waiting at most
+        AI_TIMEOUT_SECONDS and never past the overall deadline.
+
+        The global slot is held until the worker thread has really finished,
+        not just until we stop waiting, so at most AI_MAX_CONCURRENCY calls
+        are ever in flight.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(self._global_limit.acquire(), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            raise AIServiceTimeoutError(TIMEOUT_MESSAGE)
+
+        call = functools.partial(
+            self.model.generate_content,
+            contents,
+            request_options={"timeout": settings.AI_TIMEOUT_SECONDS}
+        )
+        try:
+            future = loop.run_in_executor(self._executor, call)
+        except BaseException:
+            self._global_limit.release()
+            raise
+        future.add_done_callback(self._release_slot)
+
+        timeout = min(settings.AI_TIMEOUT_SECONDS, deadline - loop.time())
+        try:
+            # Shielded: giving up on the call must not mark it done while its thread runs
+            response = await asyncio.wait_for(asyncio.shield(future), max(0.0, timeout))
+        except asyncio.TimeoutError:
+            raise AIServiceTimeoutError(TIMEOUT_MESSAGE)
+        return response.text
+
+    async def _call(self, contents: Any) -> str:
+        """
+        Run one model request without blocking the event loop, retrying
+        transient errors and timed-out attempts with backoff.
+
+        Raises:
+            AIServiceTimeoutError: If the last attempt timed out, or queueing,
+                attempts and backoff together exceed AI_TOTAL_TIMEOUT_SECONDS
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.AI_TOTAL_TIMEOUT_SECONDS
+
+        for attempt in range(settings.AI_MAX_RETRIES + 1):
+            try:
+                return await self._attempt(contents, deadline)
+            except (AIServiceTimeoutError, *RETRYABLE_ERRORS) as e:
+                # Exponential backoff with jitter
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.0)
+                if attempt >= settings.AI_MAX_RETRIES or loop.time() + delay >= deadline:
+                    raise
+
+                logger.warning(f"AI request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _generate(self, contents: Any, instructor_id: Optional[UUID] = None) -> str:
+        """
+        Run one model request for an instructor.
+
+        Args:
+            contents: Prompt parts for generate_content
+            instructor_id: Requesting instructor, for the per-instructor limit
+
+        Returns:
+            The model's text response
+
+        Raises:
+            AIServiceBusyError: If the instructor is at their concurrency limit
+            AIServiceTimeoutError: If the model does not answer in time
+        """
+        if not self.model:
+            raise ValueError("AI service is not configured (missing API key)")
+
+        async with self._instructor_slot(instructor_id):
+            return await self._call(contents)
+
+    def ensure_available(self, instructor_id: Optional[UUID] = None) -> None:
+        """
+        Check that a generation could start now (before opening a stream).
+
+        Raises:
+            ValueError: If the service is not configured
+            AIServiceBusyError: If the instructor is at their concurrency limit
+        """
         if not self.model:
             raise ValueError("AI service is not configured (missing API key)")
+        if instructor_id and self._in_flight.get(str(instructor_id), 0) >= settings.AI_MAX_CONCURRENCY_PER_INSTRUCTOR:
+            raise AIServiceBusyError(
+                "Too many AI generations running. Please wait for the current ones to finish."
+            )
 
-        prompt = f"""
+    def _text_prompt(self, text: str, count: int) -> str:
+        return f"""
         Analyze the following text and generate {count} multiple-choice questions.
         Return the result ONLY as a JSON array of objects.
-        
+
         Each object must have this format:
         {{
             "question_text": "The question string",
@@ -51,39 +242,293 @@ class AIService:
         }}
 
         Text to analyze:
-        {text[:5000]}
+        {text}
+        """
+
+    async def _questions_for_text(self, text: str, count: int) -> List[dict]:
+        """Generate questions for one chunk of text, using the result cache."""
+        key = cache_key("text", PROMPT_VERSION, settings.GEMINI_MODEL, count, text)
+        cached = await ai_result_cache.get(key)
+        if cached is not None:
+            return cached
+
+        questions = await self._call_for_questions(self._text_prompt(text, count))
+        await ai_result_cache.set(key, questions)
+        return questions
+
+    def _parse_questions(self, response_text: str) -> List[dict]:
+        """
+        Parse the model's answer into a list of question dicts, dropping
+        entries that are not questions.
+
+        Raises:
+            ValueError: If the answer is not a JSON array
         """
+        questions = json.loads(self._clean_json_response(response_text))
+        if not isinstance(questions, list):
+            raise ValueError("unexpected response format")
 
+        return [q for q in questions if isinstance(q, dict) and q.get("question_text")]
+
+    async def _call_for_questions(self, contents: Any) -> List[dict]:
+        """Call the model and parse its answer into a list of question dicts."""
         try:
-            response = self.model.generate_content(prompt)
-            cleaned_json = self._clean_json_response(response.text)
-            return json.loads(cleaned_json)
+            response_text = await self._call(contents)
+            return self._parse_questions(response_text)
+        except AIServiceTimeoutError:
+            raise
         except Exception as e:
-            import traceback
-            traceback.print_exc()
-            logger.error(f"Error generating questions from text: {e}")
+            logger.error(f"Error generating questions: {e}")
             raise ValueError(f"Failed to generate questions: {str(e)}")
 
-    async def generate_questions_from_image(self, image_file: UploadFile) -> List[dict]:
-        """Extract and generate questions from an image."""
+    def _document_prompt(self, count: int) -> str:
+        return f"""
+        The following are consecutive pages of a course document. Pages may be
+        given as extracted text, as images (scanned pages), or both.
+        Generate {count} multiple-choice questions covering their content.
+        Return the result ONLY as a JSON array of objects.
+
+        Each object must have this format:
+        {{
+            "question_text": "The question string",
+            "options": ["Option 1", "Option 2", "Option 3", "Option 4"],
+            "correct_answer": "The exact string of the correct option",
+            "explanation": "Brief explanation of why this answer is correct"
+        }}
+        """
+
+    async def _questions_for_pages(
+        self,
+        path: Path,
+        kind: str,
+        digest: str,
+        page_range: Tuple[int, int],
+        count: int
+    ) -> List[dict]:
+        """Generate questions for a range of document pages, using the result cache."""
+        start, end = page_range
+        key = cache_key("document", PROMPT_VERSION, settings.GEMINI_MODEL, count, digest, start, end)
+        cached = await ai_result_cache.get(key)
+        if cached is not None:
+            return cached
+
+        pages = await extract_pages_async(path, kind, start, end)
+
+        contents: List[Any] = [self._document_prompt(count)]
+        text = "\n\n".join(f"[Page {page.number}]\n{page.text}" for page in pages if page.text)
+        if text:
+            contents.append(text)
+
+        scans = [page for page in pages if page.image]
+        if len(scans) > settings.AI_MAX_PAGE_IMAGES:
+            # Spread the image budget evenly over the range
+            step = len(scans) / settings.AI_MAX_PAGE_IMAGES
+            scans = [scans[int(i * step)] for i in range(settings.AI_MAX_PAGE_IMAGES)]
+        for page in scans:
+            contents.append(f"[Page {page.number}, scanned]")
+            contents.append({"mime_type": "image/jpeg", "data": page.image})
+
+        if len(contents) == 1:
+            return []  # Blank pages
+
+        questions = await self._call_for_questions(contents)
+        await ai_result_cache.set(key, questions)
+        return questions
+
+    def _split_for_generation(self, text: str) -> List[str]:
+        """Split text into overlapping chunks, at most AI_MAX_CHUNKS of them."""
+        # Long documents get bigger chunks instead of more model calls
+        chunk_size = max(settings.AI_CHUNK_CHARS, math.ceil(len(text) / settings.AI_MAX_CHUNKS))
+        chunks = split_text(text, chunk_size, settings.AI_CHUNK_OVERLAP_CHARS)
+        return chunks[:settings.AI_MAX_CHUNKS]
+
+    async def _stream_questions(
+        self,
+        jobs: List[Callable[[int], Awaitable[List[dict]]]],
+        count: int,
+        instructor_id: Optional[UUID] = None
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Run chunk jobs concurrently and merge their questions as they finish.
+
+        Each job takes the number of questions to ask for and returns the
+        generated questions. Jobs run AI_CHUNK_CONCURRENCY at a time; each
+        contributes up to its share of `count` questions, near-duplicates
+        across jobs are dropped and spare questions fill any shortfall at
+        the end.
+
+        Yields:
+            ("question", question dict) for each accepted question and
+            ("progress", {"chunks_done", "chunks_total"}) after each job
+
+        Raises:
+            AIServiceBusyError: If the instructor is at their concurrency limit
+            ValueError / AIServiceTimeoutError: If every job failed
+        """
         if not self.model:
             raise ValueError("AI service is not configured (missing API key)")
 
+        total = len(jobs)
+        if not total:
+            raise ValueError("No content to generate questions from")
+
+        quota = math.ceil(count / total)
+        # One spare per chunk to make up for duplicates
+        per_chunk = count if total == 1 else quota + 1
+
+        chunk_limit = asyncio.Semaphore(settings.AI_CHUNK_CONCURRENCY)
+
+        async def run(job: Callable[[int], Awaitable[List[dict]]]) -> List[dict]:
+            async with chunk_limit:
+                return await job(per_chunk)
+
+        accepted: List[dict] = []
+        spare: List[dict] = []
+        seen: List[set] = []
+        last_error: Optional[Exception] = None
+        failures = 0
+
+        # The whole document counts as one of the instructor's generations
+        async with self._instructor_slot(instructor_id):
+            tasks = [asyncio.ensure_future(run(job)) for job in jobs]
+            try:
+                for done, future in enumerate(asyncio.as_completed(tasks), start=1):
+                    try:
+                        questions = await future
+                    except (ValueError, AIServiceTimeoutError) as e:
+                        logger.warning(f"Chunk {done}/{total} failed: {e}")
+                        last_error = e
+                        failures += 1
+                        questions = []
+
+                    taken = 0
+                    for question in questions:
+                        if len(accepted) >= count:
+                            break
+
+                        tokens = _question_tokens(question)
+                        if any(_similarity(tokens, other) >= DUPLICATE_SIMILARITY for other in seen):
+                            continue
+                        seen.append(tokens)
+
+                        if taken < quota:
+                            accepted.append(question)
+                            taken += 1
+                            yield "question", question
+                        else:
+                            spare.append(question)
+
+                    yield "progress", {"chunks_done": done, "chunks_total": total}
+
+                    if len(accepted) >= count:
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        if failures == total and last_error:
+            raise last_error
+
+        for question in spare[:count - len(accepted)]:
+            accepted.append(question)
+            yield "question", question
+
+    def stream_questions_from_text(
+        self,
+        text: str,
+        count: int = 5,
+        instructor_id: Optional[UUID] = None
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Generate questions from a text of any length, as they arrive.
+
+        The text is split into overlapping chunks (see _split_for_generation)
+        which are processed by _stream_questions.
+        """
+        jobs = [
+            functools.partial(self._questions_for_text, chunk)
+            for chunk in self._split_for_generation(text)
+        ]
+        return self._stream_questions(jobs, count, instructor_id)
+
+    def stream_questions_from_document(
+        self,
+        path: Path,
+        kind: str,
+        digest: str,
+        page_count: int,
+        count: int = 5,
+        instructor_id: Optional[UUID] = None
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Generate questions from a PDF or DOCX file, as they arrive.
+
+        Pages are grouped into at most AI_MAX_CHUNKS consecutive ranges;
+        each range is extracted on the document worker pool only when its
+        turn comes, so the document is never fully loaded.
+
+        Args:
+            path: Document file on disk (must exist until the stream ends)
+            kind: 'pdf' or 'docx'
+            digest: SHA-256 of the file, for the result cache
+            page_count: Number of pages (see count_pages_async)
+        """
+        jobs = [
+            functools.partial(self._questions_for_pages, path, kind, digest, page_range)
+            for page_range in page_ranges(page_count, settings.AI_MAX_CHUNKS)
+        ]
+        return self._stream_questions(jobs, count, instructor_id)
+
+    async def generate_questions_from_text(
+        self,
+        text: str,
+        count: int = 5,
+        instructor_id: Optional[UUID] = None
+    ) -> List[dict]:
+        """Generate multiple choice questions from text (see stream_questions_from_text)."""
+        questions = []
+        async for event, data in self.stream_questions_from_text(text, count, instructor_id):
+            if event == "question":
+                questions.append(data)
+        return questions
+
+    async def generate_questions_from_image(
+        self,
+        path: Path,
+        digest: str,
+        instructor_id: Optional[UUID] = None
+    ) -> List[dict]:
+        """
+        Extract and generate questions from an image.
+
+        The image is shrunk, re-oriented and re-encoded off the event loop
+        before upload (see prepare_vision_image); tall scans go to the
+        model as several overlapping tiles in one request.
+
+        Args:
+            path: Uploaded image on disk
+            digest: SHA-256 of the upload, used as the cache key
+            instructor_id: Instructor the request counts against
+        """
+        if not self.model:
+            raise ValueError("AI service is not configured (missing API key)")
+
+        key = cache_key(
+            "image", PROMPT_VERSION, settings.GEMINI_MODEL, digest,
+            settings.AI_IMAGE_MAX_SIDE, settings.AI_IMAGE_TILE_RATIO, settings.AI_IMAGE_MAX_TILES
+        )
+        cached = await ai_result_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            # Read image content
-            content = await image_file.read()
-            
-            # Create image part for Gemini
-            image_part = {
-                "mime_type": image_file.content_type,
-                "data": content
-            }
+            tiles = await prepare_vision_image_async(path)
 
             prompt = """
             Extract all multiple-choice questions from this image.
             If the image contains handwritten notes, transcribe them into questions.
             Verify the correct answer if marked, otherwise estimate the correct answer.
-            
+
             Return the result ONLY as a JSON array of objects with this format:
             {
                 "question_text": "The question string",
@@ -92,13 +537,24 @@ class AIService:
                 "explanation": "Brief explanation"
             }
             """
+            if len(tiles) > 1:
+                prompt += f"""
+            The image is a tall scan split top to bottom into {len(tiles)} slightly
+            overlapping parts, given in order. Do not repeat questions that appear
+            in the overlap between two parts.
+            """
+
+            contents = [prompt] + [{"mime_type": "image/jpeg", "data": tile} for tile in tiles]
+            response_text = await self._generate(contents, instructor_id)
+            questions = self._parse_questions(response_text)
 
-            response = self.model.generate_content([prompt, image_part])
-            cleaned_json = self._clean_json_response(response.text)
-            return json.loads(cleaned_json)
-            
+        except (AIServiceBusyError, AIServiceTimeoutError):
+            raise
         except Exception as e:
             logger.error(f"Error processing image: {e}")
             raise ValueError(f"Failed to process image: {str(e)}")
 
+        await ai_result_cache.set(key, questions)
+        return questions
+
 ai_service = AIService()
@@ -0,0 +1,78 @@
+"""
+Attempt sweeper - Background grading of expired timed attempts.
+
+The time limit is enforced by the Mini App's timer, which calls submit; if
+the student closes Telegram first the attempt would stay open forever and
+be missing from the results. Every ATTEMPT_SWEEP_SECONDS the sweeper grades
+attempts past their deadline (QuizService.finalize_expired_attempts) in
+batches of ATTEMPT_SWEEP_BATCH_SIZE, one transaction per batch, so a large
+exam ending at once is worked off in short, bounded steps.
+
+Each API worker may run a sweeper: claimed attempts are locked with SKIP
+LOCKED, so workers share the backlog instead of grading twice.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from app.config import settings
+from app.database import run_in_session
+from app.services.quiz_service import QuizService
+
+logger = logging.getLogger(__name__)
+
+_task: Optional[asyncio.Task] = None
+
+
+async def sweep_once() -> int:
+    """
+    Finalize every attempt expired by now, batch by batch.
+
+    Returns:
+        Number of attempts finalized
+    """
+    now = datetime.utcnow()
+    total = 0
+    while True:
+        count = await run_in_session(
+            lambda db: QuizService(db).finalize_expired_attempts(now, settings.ATTEMPT_SWEEP_BATCH_SIZE)
+        )
+        total += count
+        if count < settings.ATTEMPT_SWEEP_BATCH_SIZE:
+            return total
+
+
+async def _run() -> None:
+    while True:
+        try:
+            finalized = await sweep_once()
+            if finalized:
+                logger.info(f"Finalized {finalized} expired quiz attempts")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Attempt sweep failed")
+
+        await asyncio.sleep(settings.ATTEMPT_SWEEP_SECONDS)
+
+
+def start_attempt_sweeper() -> None:
+    """Start the sweeper in the running event loop."""
+    global _task
+    _task = asyncio.create_task(_run(), name="attempt-sweeper")
+
+
+async def stop_attempt_sweeper() -> None:
+    """Stop the sweeper."""
+    global _task
+
+    if _task is None:
+        return
+
+    task, _task = _task, None
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -3,6 +3,7 @@ Authentication service - Handles user authentication logic.
 """
 from sqlalchemy.orm import Session
 from app.models import Instructor, Student
+from app.services.enrollment_service import EnrollmentService
 from app.utils.security import hash_password, verify_password, create_access_token, create_refresh_token, decode_token
 from app.schemas.auth import InstructorRegister, InstructorLogin, Token
 
@@ -116,21 +117,10 @@ class AuthService:
         Returns:
             Student instance
         """
-        telegram_id = telegram_data.get('id')
-        
-        student = self.db.query(Student).filter(
-            Student.telegram_id == telegram_id
-        ).first()
-        
-        if not student:
-            student = Student(
-                telegram_id=telegram_id,
-                telegram_username=telegram_data.get('username'),
-                first_name=telegram_data.get('first_name'),
-                last_name=telegram_data.get('last_name')
-            )
-            self.db.add(student)
-            self.db.commit()
-            self.db.refresh(student)
-        
-        return student
+        # Same upsert as deep-link registration, so profile changes are kept
+        return EnrollmentService(self.db).get_or_create_student(
+            telegram_id=telegram_data.get('id'),
+            username=telegram_data.get('username'),
+            first_name=telegram_data.get('first_name'),
+            last_name=telegram_data.get('last_name')
+        )
@@ -0,0 +1,300 @@
+"""
+Broadcast service - Persistent fan-out queue for Telegram messages.
+
+A broadcast is one row in `broadcasts` plus one `broadcast_messages` row per
+recipient, inserted with a single INSERT ... SELECT over the class's active
+enrollments. The sender (app.bot.broadcast) drains the queue:
+
+    claim_due()       due pending rows, leased by pushing next_attempt_at
+                      forward (FOR UPDATE SKIP LOCKED: workers never share rows)
+    record_results()  sent / failed rows are finalized and counted into the
+                      broadcast's stats; retries are rescheduled
+
+A lease that runs out (sender crashed or restarted) simply makes its rows
+due again, so delivery resumes where it stopped.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Select, bindparam, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import Broadcast, BroadcastMessage, Enrollment, Quiz, Student
+
+
+def quiz_published_text(quiz: Quiz) -> str:
+    """Announcement for a newly published quiz."""
+    lines = [f"📝 New quiz: {quiz.title}"]
+    if quiz.start_time:
+        lines.append(f"🟢 Opens: {quiz.start_time:%Y-%m-%d %H:%M} UTC")
+    if quiz.end_time:
+        lines.append(f"🔴 Closes: {quiz.end_time:%Y-%m-%d %H:%M} UTC")
+    if quiz.time_limit_minutes:
+        lines.append(f"⏱ Time limit: {quiz.time_limit_minutes} min")
+    lines.append("")
+    lines.append("Open the Quiz App to take it.")
+    return "\n".join(lines)
+
+
+@dataclass
+class QueuedMessage:
+    """A claimed message, ready to send."""
+    id: int
+    broadcast_id: UUID
+    chat_id: int
+    attempts: int
+    text: str
+
+
+@dataclass
+class SendResult:
+    """Outcome of one send attempt."""
+    id: int
+    broadcast_id: UUID
+    outcome: str  # 'sent', 'failed', 'retry' (counts as an attempt) or 'deferred' (does not)
+    delay: float = 0.0
+    error: Optional[str] = None
+
+
+class BroadcastService:
+    """Service for queueing broadcasts and tracking their delivery."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def class_recipients(self, class_id: UUID) -> Select:
+        """Select (student_id, chat_id) of a class's active students."""
+        return select(Student.id, Student.telegram_id).join(
+            Enrollment, Enrollment.student_id == Student.id
+        ).where(
+            Enrollment.class_id == class_id,
+            Enrollment.is_active == True,
+            Student.is_active == True
+        )
+
+    def create_broadcast(
+        self,
+        instructor_id: UUID,
+        class_id: UUID,
+        text: str,
+        kind: str = "announcement",
+        quiz_id: Optional[UUID] = None,
+        recipients: Optional[Select] = None
+    ) -> Broadcast:
+        """
+        Queue a message for every recipient, in one statement.
+
+        Args:
+            instructor_id: Instructor the broadcast belongs to
+            class_id: Class the broadcast goes to
+            text: Message text
+            kind: Broadcast kind (see Broadcast.kind)
+            quiz_id: Quiz the broadcast is about, if any
+            recipients: Select of (student_id, chat_id); defaults to the
+                class's active students
+
+        Returns:
+            The committed broadcast, with `total` set
+        """
+        broadcast = Broadcast(
+            instructor_id=instructor_id,
+            class_id=class_id,
+            quiz_id=quiz_id,
+            kind=kind,
+            text=text
+        )
+        self.db.add(broadcast)
+        self.db.flush()
+
+        if recipients is None:
+            recipients = self.class_recipients(class_id)
+        rows = recipients.subquery()
+
+        now = datetime.utcnow()
+        stmt = pg_insert(BroadcastMessage).from_select(
+            ["broadcast_id", "student_id", "chat_id", "status", "attempts", "next_attempt_at"],
+            select(
+                literal(broadcast.id, BroadcastMessage.broadcast_id.type),
+                rows.c[0],
+                rows.c[1],
+                literal("pending"),
+                literal(0),
+                literal(now, BroadcastMessage.next_attempt_at.type)
+            )
+        ).on_conflict_do_nothing(constraint="uq_broadcast_chat")
+
+        broadcast.total = self.db.execute(stmt).rowcount
+        if broadcast.total == 0:
+            broadcast.completed_at = now
+
+        self.db.commit()
+        self.db.refresh(broadcast)
+        return broadcast
+
+    def announce_quiz_published(self, quiz: Quiz) -> Optional[Broadcast]:
+        """
+        Queue the "New quiz" announcement, unless the quiz was announced before.
+
+        Unpublishing and republishing a quiz does not announce it again; the
+        unique index on (quiz_id, kind) settles concurrent publishes.
+
+        Returns:
+            The queued broadcast, or None if the quiz was already announced
+        """
+        announced = self.db.query(Broadcast.id).filter(
+            Broadcast.quiz_id == quiz.id,
+            Broadcast.kind == "quiz_published"
+        ).first()
+        if announced:
+            return None
+
+        try:
+            return self.create_broadcast(
+                instructor_id=quiz.instructor_id,
+                class_id=quiz.class_id,
+                text=quiz_published_text(quiz),
+                kind="quiz_published",
+                quiz_id=quiz.id
+            )
+        except IntegrityError:
+            self.db.rollback()  # Announced by a concurrent request
+            return None
+
+    def claim_due(self, limit: int, lease_seconds: int) -> List[QueuedMessage]:
+        """
+        Lease up to `limit` due messages for sending.
+
+        Returns:
+            Claimed messages, oldest first; attempts already incremented
+        """
+        now = datetime.utcnow()
+
+        due = select(BroadcastMessage.id).where(
+            BroadcastMessage.status == "pending",
+            BroadcastMessage.next_attempt_at <= now
+        ).order_by(
+            BroadcastMessage.next_attempt_at
+        ).limit(limit).with_for_update(skip_locked=True).scalar_subquery()
+
+        claimed = self.db.execute(
+            update(BroadcastMessage).where(
+                BroadcastMessage.id.in_(due)
+            ).values(
+                next_attempt_at=now + timedelta(seconds=lease_seconds),
+                attempts=BroadcastMessage.attempts + 1
+            ).returning(
+                BroadcastMessage.id,
+                BroadcastMessage.broadcast_id,
+                BroadcastMessage.chat_id,
+                BroadcastMessage.attempts
+            ).execution_options(synchronize_session=False)
+        ).all()
+        self.db.commit()
+
+        if not claimed:
+            return []
+
+        texts = dict(self.db.execute(
+            select(Broadcast.id, Broadcast.text).where(
+                Broadcast.id.in_({row.broadcast_id for row in claimed})
+            )
+        ).all())
+
+        messages = [
+            QueuedMessage(
+                id=row.id,
+                broadcast_id=row.broadcast_id,
+                chat_id=row.chat_id,
+                attempts=row.attempts,
+                text=texts.get(row.broadcast_id, "")
+            )
+            for row in claimed
+        ]
+        messages.sort(key=lambda m: m.id)
+        return messages
+
+    def record_results(self, results: Sequence[SendResult]) -> None:
+        """Finalize or reschedule sent messages and update broadcast stats."""
+        if not results:
+            return
+
+        now = datetime.utcnow()
+        table = BroadcastMessage.__table__
+
+        sent = [{"b_id": r.id} for r in results if r.outcome == "sent"]
+        if sent:
+            self.db.execute(
+                table.update().where(table.c.id == bindparam("b_id")).values(
+                    status="sent", sent_at=now, error=None
+                ),
+                sent
+            )
+
+        failed = [{"b_id": r.id, "b_error": (r.error or "")[:255]} for r in results if r.outcome == "failed"]
+        if failed:
+            self.db.execute(
+                table.update().where(table.c.id == bindparam("b_id")).values(
+                    status="failed", error=bindparam("b_error")
+                ),
+                failed
+            )
+
+        for outcome in ("retry", "deferred"):
+            rows = [
+                {
+                    "b_id": r.id,
+                    "b_next": now + timedelta(seconds=r.delay),
+                    "b_error": (r.error or "")[:255] or None
+                }
+                for r in results if r.outcome == outcome
+            ]
+            if not rows:
+                continue
+            values = {"next_attempt_at": bindparam("b_next"), "error": bindparam("b_error")}
+            if outcome == "deferred":
+                # Rate limited before it was sent: not a real attempt
+                values["attempts"] = table.c.attempts - 1
+            self.db.execute(table.update().where(table.c.id == bindparam("b_id")).values(**values), rows)
+
+        sent_counts = Counter(r.broadcast_id for r in results if r.outcome == "sent")
+        failed_counts = Counter(r.broadcast_id for r in results if r.outcome == "failed")
+        for broadcast_id in sent_counts.keys() | failed_counts.keys():
+            self.db.execute(
+                update(Broadcast).where(Broadcast.id == broadcast_id).values(
+                    sent=Broadcast.sent + sent_counts[broadcast_id],
+                    failed=Broadcast.failed + failed_counts[broadcast_id]
+                )
+            )
+
+        if sent_counts or failed_counts:
+            self.db.execute(
+                update(Broadcast).where(
+                    Broadcast.id.in_(sent_counts.keys() | failed_counts.keys()),
+                    Broadcast.completed_at.is_(None),
+                    Broadcast.sent + Broadcast.failed >= Broadcast.total
+                ).values(completed_at=now)
+            )
+
+        self.db.commit()
+
+    def list_broadcasts(
+        self,
+        instructor_id: UUID,
+        class_id: Optional[UUID] = None,
+        quiz_id: Optional[UUID] = None,
+        limit: int = 50
+    ) -> List[Broadcast]:
+        """Get an instructor's broadcasts, newest first."""
+        query = self.db.query(Broadcast).filter(Broadcast.instructor_id == instructor_id)
+
+        if class_id:
+            query = query.filter(Broadcast.class_id == class_id)
+        if quiz_id:
+            query = query.filter(Broadcast.quiz_id == quiz_id)
+
+        return query.order_by(Broadcast.created_at.desc()).limit(limit).all()
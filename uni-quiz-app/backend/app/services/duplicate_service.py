@@ -0,0 +1,265 @@
+"""
+Duplicate service - Near-duplicate detection over the question bank.
+
+Every active question carries a MinHash signature (questions.minhash) and
+one row per LSH band in question_lsh_buckets (see app.utils.minhash).
+Lookups never compare a question against the whole bank:
+
+- new or imported questions probe the buckets table for candidates that
+  share a bucket, then confirm them by signature similarity
+- clusters come from a single GROUP BY bucket over the instructor's rows
+  (an index-only scan), confirmed the same way and merged with union-find
+
+The index is kept current on create, update, import and delete. Questions
+created before it existed are indexed once by index_question_duplicates.py
+(index_missing); lookups only read, so they never write or commit.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Question, QuestionLSHBucket
+from app.utils.minhash import lsh_buckets, signature, similarity
+
+
+@dataclass
+class DuplicateMatch:
+    """A question similar to a probed one: in the bank, or earlier in the batch."""
+    similarity: float
+    question_id: Optional[UUID] = None
+    index: Optional[int] = None
+
+
+class DuplicateService:
+    """Service for maintaining and querying the near-duplicate index."""
+
+    # Questions indexed per flush when catching up on unindexed rows
+    INDEX_BATCH_SIZE = 1000
+
+    # Buckets larger than this are confirmed against their first member only
+    MAX_PAIRWISE_BUCKET = 50
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ==================== Maintenance ====================
+
+    def index_questions(self, questions: Sequence[Question]) -> None:
+        """
+        Compute signatures and replace the LSH buckets of questions.
+
+        Inactive questions are removed from the index. Flushes, but does
+        not commit: call it before the commit that saves the questions.
+        """
+        if not questions:
+            return
+
+        self.db.flush()  # Assigns ids to new questions
+        self.remove_questions([q.id for q in questions])
+
+        rows = []
+        for question in questions:
+            if question.is_active is False:
+                question.minhash = None
+                continue
+
+            sig = signature(question.question_text, question.options)
+            question.minhash = sig
+            rows.extend(
+                {"instructor_id": question.instructor_id, "bucket": bucket, "question_id": question.id}
+                for bucket in set(lsh_buckets(sig))
+            )
+
+        if rows:
+            self.db.execute(insert(QuestionLSHBucket), rows)
+
+    def remove_questions(self, question_ids: Iterable[UUID]) -> None:
+        """Drop questions from the bucket index (e.g. on soft delete)."""
+        ids = list(question_ids)
+        if ids:
+            self.db.execute(delete(QuestionLSHBucket).where(QuestionLSHBucket.question_id.in_(ids)))
+
+    def index_missing(self, instructor_id: UUID) -> int:
+        """
+        Index an instructor's active questions that have no signature yet.
+
+        A backfill for questions created before the index existed (see
+        index_question_duplicates.py); commits every INDEX_BATCH_SIZE
+        questions.
+
+        Returns:
+            Number of questions indexed
+        """
+        indexed = 0
+        while True:
+            batch = self.db.query(Question).filter(
+                Question.instructor_id == instructor_id,
+                Question.is_active == True,
+                Question.minhash.is_(None)
+            ).limit(self.INDEX_BATCH_SIZE).all()
+
+            if not batch:
+                return indexed
+
+            self.index_questions(batch)
+            self.db.commit()
+            indexed += len(batch)
+
+    # ==================== Lookups ====================
+
+    def _signatures(self, question_ids: Iterable[UUID]) -> Dict[UUID, List[int]]:
+        ids = list(question_ids)
+        if not ids:
+            return {}
+        rows = self.db.execute(
+            select(Question.id, Question.minhash).where(Question.id.in_(ids))
+        ).all()
+        return {row.id: row.minhash for row in rows if row.minhash}
+
+    def find_matches(
+        self,
+        instructor_id: UUID,
+        candidates: Sequence[Tuple[str, Optional[list]]],
+        threshold: Optional[float] = None
+    ) -> List[List[DuplicateMatch]]:
+        """
+        Find near-duplicates of not-yet-saved questions.
+
+        Each candidate is matched against the bank and against the
+        candidates before it, so duplicates within an import are caught too.
+
+        Args:
+            instructor_id: Owner of the question bank to search
+            candidates: (question_text, options) per probed question
+            threshold: Minimum estimated similarity (default from settings)
+
+        Returns:
+            For each candidate, its matches, most similar first
+        """
+        if not candidates:
+            return []
+
+        threshold = settings.QUESTION_DUPLICATE_THRESHOLD if threshold is None else threshold
+
+        sigs = [signature(text, options) for text, options in candidates]
+        buckets_by_candidate = [set(lsh_buckets(sig)) for sig in sigs]
+        all_buckets = set().union(*buckets_by_candidate)
+
+        hits = self.db.execute(
+            select(QuestionLSHBucket.bucket, QuestionLSHBucket.question_id).where(
+                QuestionLSHBucket.instructor_id == instructor_id,
+                QuestionLSHBucket.bucket.in_(all_buckets)
+            )
+        ).all()
+
+        members = defaultdict(set)
+        for bucket, question_id in hits:
+            members[bucket].add(question_id)
+
+        indexed = self._signatures({question_id for _, question_id in hits})
+
+        earlier = defaultdict(list)  # Bucket -> indexes of earlier candidates
+        results = []
+        for index, (sig, buckets) in enumerate(zip(sigs, buckets_by_candidate)):
+            matches = []
+            for question_id in set().union(*(members.get(b, ()) for b in buckets)):
+                score = similarity(sig, indexed.get(question_id))
+                if score >= threshold:
+                    matches.append(DuplicateMatch(similarity=score, question_id=question_id))
+            for other in set().union(*(earlier.get(b, ()) for b in buckets)):
+                score = similarity(sig, sigs[other])
+                if score >= threshold:
+                    matches.append(DuplicateMatch(similarity=score, index=other))
+            for bucket in buckets:
+                earlier[bucket].append(index)
+
+            matches.sort(key=lambda m: m.similarity, reverse=True)
+            results.append(matches)
+        return results
+
+    def clusters(
+        self,
+        instructor_id: UUID,
+        threshold: Optional[float] = None
+    ) -> List[Tuple[List[Question], float]]:
+        """
+        Group an instructor's active questions into near-duplicate clusters.
+
+        Args:
+            instructor_id: Owner of the question bank
+            threshold: Minimum estimated similarity (default from settings)
+
+        Returns:
+            [(questions, lowest confirmed similarity), ...], largest first
+        """
+        threshold = settings.QUESTION_DUPLICATE_THRESHOLD if threshold is None else threshold
+
+        groups = self.db.execute(
+            select(func.array_agg(QuestionLSHBucket.question_id)).where(
+                QuestionLSHBucket.instructor_id == instructor_id
+            ).group_by(
+                QuestionLSHBucket.bucket
+            ).having(func.count() > 1)
+        ).scalars().all()
+        if not groups:
+            return []
+
+        sigs = self._signatures({question_id for group in groups for question_id in group})
+
+        parent: Dict[UUID, UUID] = {}
+
+        def find(x: UUID) -> UUID:
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        checked = set()
+        lowest: Dict[UUID, float] = {}
+
+        for group in groups:
+            group = sorted(group)
+            if len(group) > self.MAX_PAIRWISE_BUCKET:
+                pairs = [(group[0], other) for other in group[1:]]
+            else:
+                pairs = [(a, b) for i, a in enumerate(group) for b in group[i + 1:]]
+
+            for a, b in pairs:
+                if (a, b) in checked:
+                    continue  # Same pair sharing several bands
+                checked.add((a, b))
+
+                score = similarity(sigs.get(a), sigs.get(b))
+                if score < threshold:
+                    continue
+
+                root_a, root_b = find(a), find(b)
+                low = min(score, lowest.get(root_a, 1.0), lowest.get(root_b, 1.0))
+                if root_a != root_b:
+                    parent[root_b] = root_a
+                    lowest.pop(root_b, None)
+                lowest[root_a] = low
+
+        members = defaultdict(list)
+        for question_id in parent:
+            members[find(question_id)].append(question_id)
+
+        questions = {
+            q.id: q for q in self.db.query(Question).filter(
+                Question.id.in_([question_id for ids in members.values() for question_id in ids])
+            )
+        }
+
+        result = []
+        for root, ids in members.items():
+            cluster = sorted((questions[i] for i in ids if i in questions), key=lambda q: q.created_at)
+            if len(cluster) > 1:
+                result.append((cluster, lowest.get(root, 1.0)))
+        result.sort(key=lambda c: (-len(c[0]), c[1]))
+        return result
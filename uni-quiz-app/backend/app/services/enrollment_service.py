@@ -1,15 +1,40 @@
 """
 Enrollment service - Handles student enrollments via deep links.
+
+A deep-link join is two statements, both upserts on existing unique keys,
+so concurrent /start presses cannot race into unique violations:
+
+    INSERT INTO students ... ON CONFLICT (telegram_id) DO UPDATE
+        ... WHERE the Telegram profile changed
+    INSERT INTO enrollments ... ON CONFLICT ON CONSTRAINT uq_student_class
+        DO UPDATE ... WHERE the enrollment is inactive
+
+The class code is resolved through a small in-process cache (TTL
+CLASS_CODE_CACHE_SECONDS), so repeated joins to one class skip that lookup.
 """
+import time
+import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from app.models import Student, Class, Enrollment
 from app.config import settings
 
 
+# class_code -> (class_id, class name, expires at)
+_class_codes: Dict[str, Tuple[UUID, str, float]] = {}
+
+
+def forget_class_code(class_code: str) -> None:
+    """Drop a class code from this process's cache (class deactivated or deleted)."""
+    _class_codes.pop(class_code, None)
+
+
 class EnrollmentService:
     """Service for handling student enrollments."""
     
@@ -23,32 +48,79 @@ class EnrollmentService:
         first_name: Optional[str] = None,
         last_name: Optional[str] = None
     ) -> Student:
-        """Get existing student or create new one."""
-        student = self.db.query(Student).filter(
-            Student.telegram_id == telegram_id
-        ).first()
+        """
+        Get existing student or create new one, in one upsert.
+        
+        Profile fields are only overwritten by non-empty values, and the
+        row is only written when one of them actually changed.
+        
+        Returns:
+            Student instance (persistent in this session)
+        """
+        now = datetime.utcnow()
+        stmt = pg_insert(Student).values(
+            id=uuid.uuid4(),
+            telegram_id=telegram_id,
+            telegram_username=username or None,
+            first_name=first_name or None,
+            last_name=last_name or None,
+            is_active=True,
+            created_at=now,
+            updated_at=now
+        )
+        
+        incoming = {
+            "telegram_username": func.coalesce(stmt.excluded.telegram_username, Student.telegram_username),
+            "first_name": func.coalesce(stmt.excluded.first_name, Student.first_name),
+            "last_name": func.coalesce(stmt.excluded.last_name, Student.last_name),
+        }
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Student.telegram_id],
+            set_={**incoming, "updated_at": now},
+            where=or_(*(
+                getattr(Student, column).is_distinct_from(value)
+                for column, value in incoming.items()
+            ))
+        ).returning(*Student.__table__.c)
+        
+        row = self.db.execute(stmt).first()
+        if row is None:
+            # Existing student, nothing changed: nothing was written
+            return self.db.query(Student).filter(
+                Student.telegram_id == telegram_id
+            ).one()
+        
+        self.db.commit()
+        
+        # Build the instance from RETURNING instead of reloading it
+        student = Student(**row._mapping)
+        make_transient_to_detached(student)
+        return self.db.merge(student, load=False)
+    
+    def resolve_class_code(self, class_code: str) -> Optional[Tuple[UUID, str]]:
+        """
+        Find an active class by its code, through the in-process cache.
         
-        if not student:
-            student = Student(
-                telegram_id=telegram_id,
-                telegram_username=username,
-                first_name=first_name,
-                last_name=last_name
+        Returns:
+            Tuple of (class_id, class name), or None if no active class has it
+        """
+        cached = _class_codes.get(class_code)
+        if cached and cached[2] > time.monotonic():
+            return cached[0], cached[1]
+        
+        row = self.db.execute(
+            select(Class.id, Class.name).where(
+                Class.class_code == class_code,
+                Class.is_active == True
             )
-            self.db.add(student)
-            self.db.commit()
-            self.db.refresh(student)
-        else:
-            # Update info if changed
-            if username and student.telegram_username != username:
-                student.telegram_username = username
-            if first_name and student.first_name != first_name:
-                student.first_name = first_name
-            if last_name and student.last_name != last_name:
-                student.last_name = last_name
-            self.db.commit()
+        ).first()
+        
+        if row is None:
+            forget_class_code(class_code)
+            return None
         
-        return student
+        _class_codes[class_code] = (row.id, row.name, time.monotonic() + settings.CLASS_CODE_CACHE_SECONDS)
+        return row.id, row.name
     
     def enroll_student_by_code(
         self,
@@ -65,41 +137,55 @@ class EnrollmentService:
         Returns:
             Tuple of (Enrollment or None, status message)
         """
-        # Find class by code
-        target_class = self.db.query(Class).filter(
-            Class.class_code == class_code,
-            Class.is_active == True
-        ).first()
-        
-        if not target_class:
+        resolved = self.resolve_class_code(class_code)
+        if not resolved:
             return None, "Invalid or expired class link"
+        class_id, class_name = resolved
         
-        # Check if already enrolled
-        existing = self.db.query(Enrollment).filter(
-            Enrollment.student_id == student_id,
-            Enrollment.class_id == target_class.id
-        ).first()
-        
-        if existing:
-            if existing.is_active:
-                return existing, f"Already enrolled in: {target_class.name}"
-            else:
-                # Reactivate enrollment
-                existing.is_active = True
-                existing.enrolled_at = datetime.utcnow()
-                self.db.commit()
-                return existing, f"Re-enrolled in: {target_class.name}"
-        
-        # Create new enrollment
-        enrollment = Enrollment(
+        now = datetime.utcnow()
+        stmt = pg_insert(Enrollment).values(
+            id=uuid.uuid4(),
             student_id=student_id,
-            class_id=target_class.id
+            class_id=class_id,
+            enrolled_at=now,
+            is_active=True
         )
-        self.db.add(enrollment)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_student_class",
+            set_={"is_active": True, "enrolled_at": now},
+            where=Enrollment.is_active.is_not(True)
+        ).returning(
+            *Enrollment.__table__.c,
+            # xmax is 0 only for a freshly inserted row
+            (literal_column("xmax") == 0).label("inserted")
+        )
+        
+        try:
+            row = self.db.execute(stmt).first()
+        except IntegrityError:
+            # The class was deleted after it was cached
+            self.db.rollback()
+            forget_class_code(class_code)
+            return None, "Invalid or expired class link"
+        
+        if row is None:
+            existing = self.db.query(Enrollment).filter(
+                Enrollment.student_id == student_id,
+                Enrollment.class_id == class_id
+            ).one()
+            return existing, f"Already enrolled in: {class_name}"
+        
         self.db.commit()
-        self.db.refresh(enrollment)
         
-        return enrollment, f"Successfully enrolled in: {target_class.name}"
+        values = dict(row._mapping)
+        inserted = values.pop("inserted")
+        enrollment = Enrollment(**values)
+        make_transient_to_detached(enrollment)
+        enrollment = self.db.merge(enrollment, load=False)
+        
+        if inserted:
+            return enrollment, f"Successfully enrolled in: {class_name}"
+        return enrollment, f"Re-enrolled in: {class_name}"
     
     def generate_invite_link(self, class_id: UUID) -> str:
         """
@@ -0,0 +1,302 @@
+"""
+Item analysis - Per-question statistics of a quiz, computed with NumPy.
+
+One query loads every (attempt, presented question) pair of the quiz's
+completed attempts, including unanswered ones (the attempt's
+questions_order is expanded in SQL). The rows become compact arrays:
+
+    codes    int16 (attempts x questions)  selected option index, or
+             UNANSWERED / OTHER / NOT_PRESENTED
+    correct  bool  (attempts x questions)
+    earned   float32 (attempts x questions) points earned (0 if not presented)
+    possible float32 (attempts x questions) points at stake (0 if not presented)
+
+and all statistics are computed on whole arrays:
+
+    p_value         share of presented attempts answering correctly
+    discrimination  point-biserial correlation of the item with the rest
+                    score (the attempt's percentage without this item)
+    options         per option: selection rate overall and in the upper /
+                    lower 27% of attempts by percentage score
+
+Quizzes draw random subsets of their pool, so every statistic only counts
+the attempts that were presented the question.
+
+Results are cached per process until the quiz's stats row changes, i.e.
+until another attempt is started, submitted or swept.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import and_, cast, func, select, true
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.models import Question, QuizAttempt, QuizStats, StudentAnswer
+
+NOT_PRESENTED = -3
+UNANSWERED = -2
+OTHER = -1  # An answer matching no option (short answers, removed options)
+
+# Share of attempts in the upper and lower groups for distractor analysis
+GROUP_FRACTION = 0.27
+
+# Quizzes whose analysis is kept in memory
+CACHE_SIZE = 64
+
+
+class _AnalysisCache:
+    """Small LRU of analyses, keyed by quiz and stats version."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, quiz_id: UUID, version: tuple) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(quiz_id)
+            return entry[1]
+
+    def set(self, quiz_id: UUID, version: tuple, analysis: dict) -> None:
+        with self._lock:
+            self._entries[quiz_id] = (version, analysis)
+            self._entries.move_to_end(quiz_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+_cache = _AnalysisCache(CACHE_SIZE)
+
+
+def _masked_corr(x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Column-wise Pearson correlation of x and y over the rows where mask is set."""
+    m = mask.astype(np.float64)
+    n = m.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mx = (x * m).sum(axis=0) / n
+        my = (y * m).sum(axis=0) / n
+        dx = (x - mx) * m
+        dy = (y - my) * m
+        cov = (dx * dy).sum(axis=0)
+        r = cov / np.sqrt((dx * dx).sum(axis=0) * (dy * dy).sum(axis=0))
+    r[~np.isfinite(r) | (n < 2)] = np.nan
+    return r
+
+
+def _none_if_nan(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+class ItemAnalysisService:
+    """Service for computing a quiz's item analysis."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def analyze(self, quiz_id: UUID) -> dict:
+        """
+        Get the item analysis of a quiz, from the cache when still current.
+
+        Returns:
+            {"quiz_id", "attempts", "items": [...]}; items in order of
+            first appearance in the attempts
+        """
+        stats = self.db.execute(
+            select(QuizStats.attempts_completed, QuizStats.updated_at).where(QuizStats.quiz_id == quiz_id)
+        ).first()
+        version = tuple(stats) if stats else (0, None)
+
+        cached = _cache.get(quiz_id, version)
+        if cached is not None:
+            return cached
+
+        analysis = self._compute(quiz_id)
+        _cache.set(quiz_id, version, analysis)
+        return analysis
+
+    def _load(self, quiz_id: UUID) -> Tuple[list, list]:
+        """One row per (completed attempt, presented question), answered or not."""
+        presented = func.jsonb_array_elements_text(QuizAttempt.questions_order).table_valued("value").lateral()
+        question_id = cast(presented.c.value, PG_UUID)
+
+        rows = self.db.execute(
+            select(
+                QuizAttempt.id,
+                question_id,
+                StudentAnswer.selected_answer,
+                StudentAnswer.is_correct,
+                StudentAnswer.points_earned
+            ).select_from(QuizAttempt).join(
+                presented, true()
+            ).outerjoin(
+                StudentAnswer, and_(
+                    StudentAnswer.attempt_id == QuizAttempt.id,
+                    StudentAnswer.question_id == question_id
+                )
+            ).where(
+                QuizAttempt.quiz_id == quiz_id,
+                QuizAttempt.is_completed == True
+            )
+        ).all()
+
+        question_ids = list(dict.fromkeys(row[1] for row in rows))
+        questions = self.db.execute(
+            select(
+                Question.id,
+                Question.question_text,
+                Question.question_type,
+                Question.options,
+                Question.correct_answer,
+                Question.points
+            ).where(Question.id.in_(question_ids))
+        ).all() if question_ids else []
+
+        return rows, questions
+
+    def _compute(self, quiz_id: UUID) -> dict:
+        rows, question_rows = self._load(quiz_id)
+
+        questions = {q.id: q for q in question_rows}
+        q_ids = [qid for qid in dict.fromkeys(row[1] for row in rows) if qid in questions]
+        q_index = {qid: j for j, qid in enumerate(q_ids)}
+
+        # Option ids per question, matched case-insensitively like grading
+        option_ids: List[List[str]] = []
+        option_index: List[Dict[str, int]] = []
+        for qid in q_ids:
+            ids = [
+                str(opt.get("id", "")) for opt in (questions[qid].options or []) if isinstance(opt, dict)
+            ]
+            if not ids and questions[qid].question_type == "true_false":
+                ids = ["true", "false"]
+            option_ids.append(ids)
+            option_index.append({opt.strip().lower(): k for k, opt in enumerate(ids)})
+
+        a_index: Dict[UUID, int] = {}
+        n_rows = len(rows)
+        a_idx = np.empty(n_rows, dtype=np.int32)
+        j_idx = np.empty(n_rows, dtype=np.int32)
+        row_codes = np.empty(n_rows, dtype=np.int16)
+        row_correct = np.zeros(n_rows, dtype=bool)
+        row_earned = np.zeros(n_rows, dtype=np.float32)
+
+        used = 0
+        for attempt_id, question_id, selected, is_correct, points_earned in rows:
+            j = q_index.get(question_id)
+            if j is None:
+                continue  # Question deleted since
+            a_idx[used] = a_index.setdefault(attempt_id, len(a_index))
+            j_idx[used] = j
+            if selected is None or not selected.strip():
+                row_codes[used] = UNANSWERED
+            else:
+                row_codes[used] = option_index[j].get(selected.strip().lower(), OTHER)
+            row_correct[used] = bool(is_correct)
+            row_earned[used] = points_earned or 0
+            used += 1
+
+        a_idx, j_idx = a_idx[:used], j_idx[:used]
+        n_attempts, n_items = len(a_index), len(q_ids)
+
+        codes = np.full((n_attempts, n_items), NOT_PRESENTED, dtype=np.int16)
+        codes[a_idx, j_idx] = row_codes[:used]
+        correct = np.zeros((n_attempts, n_items), dtype=bool)
+        correct[a_idx, j_idx] = row_correct[:used]
+        earned = np.zeros((n_attempts, n_items), dtype=np.float32)
+        earned[a_idx, j_idx] = row_earned[:used]
+
+        presented = codes != NOT_PRESENTED
+        item_points = np.array([questions[qid].points or 0 for qid in q_ids], dtype=np.float32)
+        possible = presented * item_points
+
+        # Percentage scores, overall and without each item (rest score)
+        earned_total = earned.sum(axis=1, keepdims=True)
+        possible_total = possible.sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            score = np.where(possible_total > 0, earned_total / possible_total * 100, 0.0)[:, 0]
+            rest_possible = possible_total - possible
+            rest = np.where(rest_possible > 0, (earned_total - earned) / rest_possible * 100, 0.0)
+
+        n_presented = presented.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            p_values = correct.sum(axis=0) / n_presented
+        discrimination = _masked_corr(correct.astype(np.float64), rest, presented)
+
+        # Upper / lower groups by overall score
+        group_size = max(1, int(round(n_attempts * GROUP_FRACTION))) if n_attempts else 0
+        order = np.argsort(score, kind="stable")
+        lower = np.zeros(n_attempts, dtype=bool)
+        upper = np.zeros(n_attempts, dtype=bool)
+        lower[order[:group_size]] = True
+        upper[order[n_attempts - group_size:]] = True
+
+        # Option counts: columns are UNANSWERED, OTHER, option 0, option 1, ...
+        width = max((len(ids) for ids in option_ids), default=0) + 2
+        slots = (codes - UNANSWERED).astype(np.int64)  # UNANSWERED -> 0, OTHER -> 1, option k -> k + 2
+        flat = np.arange(n_items, dtype=np.int64)[None, :] * width + slots
+
+        def option_counts(rows_mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            mask = presented & rows_mask[:, None]
+            counts = np.bincount(flat[mask], minlength=n_items * width).reshape(n_items, width)
+            return counts, mask.sum(axis=0)
+
+        all_counts, all_n = option_counts(np.ones(n_attempts, dtype=bool))
+        upper_counts, upper_n = option_counts(upper)
+        lower_counts, lower_n = option_counts(lower)
+
+        def rates(counts: np.ndarray, n: np.ndarray) -> np.ndarray:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return counts / n[:, None]
+
+        all_rates = rates(all_counts, all_n)
+        upper_rates = rates(upper_counts, upper_n)
+        lower_rates = rates(lower_counts, lower_n)
+
+        items = []
+        for j, qid in enumerate(q_ids):
+            question = questions[qid]
+            correct_key = (question.correct_answer or "").strip().lower()
+
+            def option(slot: int, option_id: Optional[str], label: str) -> dict:
+                return {
+                    "option_id": option_id,
+                    "label": label,
+                    "is_correct": option_id is not None and option_id.strip().lower() == correct_key,
+                    "count": int(all_counts[j, slot]),
+                    "rate": _none_if_nan(all_rates[j, slot]),
+                    "upper_rate": _none_if_nan(upper_rates[j, slot]),
+                    "lower_rate": _none_if_nan(lower_rates[j, slot]),
+                }
+
+            texts = {
+                str(opt.get("id", "")): opt.get("text", "") for opt in (question.options or []) if isinstance(opt, dict)
+            }
+            options = [
+                option(k + 2, opt_id, texts.get(opt_id, opt_id.capitalize()))
+                for k, opt_id in enumerate(option_ids[j])
+            ]
+            options.append(option(1, None, "Other answer"))
+            options.append(option(0, None, "No answer"))
+
+            items.append({
+                "question_id": qid,
+                "question_text": question.question_text,
+                "question_type": question.question_type,
+                "attempts": int(n_presented[j]),
+                "p_value": _none_if_nan(p_values[j]),
+                "discrimination": _none_if_nan(discrimination[j]),
+                "options": options,
+            })
+
+        return {
+            "quiz_id": quiz_id,
+            "attempts": n_attempts,
+            "items": items,
+        }
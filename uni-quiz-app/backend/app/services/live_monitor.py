@@ -0,0 +1,229 @@
+"""
+Live monitor - Pushes quiz counter changes to instructors watching an exam.
+
+Writers call notify(db, quiz_id) next to the change they make (StatsService
+does for every started, submitted or swept attempt). The notification is
+held on the session and only published once the transaction commits; a
+rollback drops it.
+
+Each API process runs one broker. Subscribers (the live stream route) get
+an asyncio.Event per quiz that is set whenever the quiz changed; they then
+read the quiz's stats row once, however many changes came in meanwhile.
+
+Backends (LIVE_MONITOR_BACKEND) carry notifications to the brokers:
+
+    memory    Delivered within the process only. Enough for a single worker.
+    postgres  NOTIFY in the writer's transaction, LISTEN on one asyncpg
+              connection per process, so every worker sees every change.
+"""
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Session.info key of the quiz ids changed in the current transaction
+PENDING_KEY = "live_monitor_pending"
+
+NOTIFY_CHANNEL = "quiz_live"
+
+RECONNECT_SECONDS = 5
+
+
+class LiveBroker:
+    """Per-process registry of subscribers, by quiz."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Event]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Set the event loop subscribers live on (None when stopped)."""
+        self._loop = loop
+
+    @contextmanager
+    def subscribe(self, quiz_id: UUID) -> Iterator[asyncio.Event]:
+        """Get an event set on every change of the quiz, for the block's duration."""
+        changed = asyncio.Event()
+        subscribers = self._subscribers.setdefault(str(quiz_id), set())
+        subscribers.add(changed)
+        try:
+            yield changed
+        finally:
+            subscribers.discard(changed)
+            if not subscribers:
+                self._subscribers.pop(str(quiz_id), None)
+
+    def deliver(self, quiz_ids: List[str]) -> None:
+        """Wake the subscribers of the quizzes (event loop thread only)."""
+        for quiz_id in quiz_ids:
+            for changed in self._subscribers.get(quiz_id, ()):
+                changed.set()
+
+    def deliver_all(self) -> None:
+        """Wake every subscriber, e.g. after notifications may have been missed."""
+        for subscribers in self._subscribers.values():
+            for changed in subscribers:
+                changed.set()
+
+    def deliver_threadsafe(self, quiz_ids: List[str]) -> None:
+        """Wake the subscribers of the quizzes from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # No broker running in this process (e.g. run_bot.py)
+        loop.call_soon_threadsafe(self.deliver, quiz_ids)
+
+
+broker = LiveBroker()
+
+
+class LiveBackend:
+    """Interface shared by all live monitor backends."""
+
+    name = "base"
+
+    def before_commit(self, session: Session, quiz_ids: List[str]) -> None:
+        """Called inside the writer's transaction, before it commits."""
+
+    def after_commit(self, quiz_ids: List[str]) -> None:
+        """Called once the writer's transaction has committed."""
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class MemoryBackend(LiveBackend):
+    """Notifications stay in the process that made the change."""
+
+    name = "memory"
+
+    def after_commit(self, quiz_ids: List[str]) -> None:
+        broker.deliver_threadsafe(quiz_ids)
+
+
+class PostgresBackend(LiveBackend):
+    """NOTIFY / LISTEN on the application database."""
+
+    name = "postgres"
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._asyncpg = None
+
+    def before_commit(self, session: Session, quiz_ids: List[str]) -> None:
+        # Postgres delivers the notifications when (and only if) this commits
+        session.execute(
+            text("SELECT pg_notify(:channel, quiz_id) FROM unnest(CAST(:quiz_ids AS text[])) AS quiz_id"),
+            {"channel": NOTIFY_CHANNEL, "quiz_ids": quiz_ids}
+        )
+
+    @staticmethod
+    def _dsn() -> str:
+        # asyncpg takes plain postgresql:// URLs, without a SQLAlchemy driver suffix
+        url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+        return url.render_as_string(hide_password=False)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        broker.deliver([payload])
+
+    async def _listen(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await self._asyncpg.connect(self._dsn())
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+
+                # Changes made while disconnected were not heard
+                broker.deliver_all()
+                await closed.wait()
+                logger.warning("Live monitor connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Live monitor listener failed")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def start(self) -> None:
+        try:
+            import asyncpg
+        except ImportError:
+            raise RuntimeError("LIVE_MONITOR_BACKEND=postgres requires asyncpg (see requirements.txt)")
+
+        self._asyncpg = asyncpg
+        self._task = asyncio.create_task(self._listen(), name="live-monitor-listener")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # Already failed; logged here so shutdown is not interrupted
+            logger.exception("Live monitor listener had failed")
+
+
+def _create_backend() -> LiveBackend:
+    if settings.LIVE_MONITOR_BACKEND == "postgres":
+        return PostgresBackend()
+    return MemoryBackend()
+
+
+backend = _create_backend()
+
+
+def notify(db: Session, quiz_id: UUID) -> None:
+    """Mark a quiz as changed; published when the session commits."""
+    db.info.setdefault(PENDING_KEY, set()).add(str(quiz_id))
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session: Session) -> None:
+    pending = session.info.get(PENDING_KEY)
+    if pending:
+        backend.before_commit(session, sorted(pending))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        backend.after_commit(sorted(pending))
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+async def start_live_monitor() -> None:
+    """Start this process's broker (and the backend's listener)."""
+    broker.bind(asyncio.get_running_loop())
+    await backend.start()
+
+
+async def stop_live_monitor() -> None:
+    """Stop the broker."""
+    await backend.stop()
+    broker.bind(None)
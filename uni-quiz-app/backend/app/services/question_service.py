@@ -0,0 +1,169 @@
+"""
+Question service - Question bank queries, filtering and export.
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, func, literal
+from sqlalchemy.orm import Session, Query
+
+from app.models import Question
+from app.models.question import SEARCH_CONFIG
+
+
+class QuestionService:
+    """Service for question bank operations."""
+
+    # Rows fetched per round trip when streaming from a server-side cursor
+    EXPORT_BATCH_SIZE = 500
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def filter_questions(
+        self,
+        instructor_id: UUID,
+        class_id: Optional[UUID] = None,
+        tag: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        question_type: Optional[str] = None
+    ) -> Query:
+        """
+        Build a query over an instructor's active questions.
+
+        Args:
+            instructor_id: Owner of the question bank
+            class_id: Only questions attached to this class
+            tag: Only questions carrying this tag
+            difficulty: Only questions of this difficulty
+            question_type: Only questions of this type
+
+        Returns:
+            Unordered query of matching questions
+        """
+        query = self.db.query(Question).filter(
+            Question.instructor_id == instructor_id,
+            Question.is_active == True
+        )
+
+        if class_id:
+            query = query.filter(Question.class_id == class_id)
+        if tag:
+            # JSONB containment so the tags GIN index can be used
+            query = query.filter(Question.tags.contains([tag]))
+        if difficulty:
+            query = query.filter(Question.difficulty == difficulty)
+        if question_type:
+            query = query.filter(Question.question_type == question_type)
+
+        return query
+
+    def search_questions(
+        self,
+        instructor_id: UUID,
+        text: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        class_id: Optional[UUID] = None,
+        limit: int = 20
+    ) -> Tuple[List[Tuple[Question, float]], Dict[str, int], int]:
+        """
+        Ranked full-text search with tag facets, in a single query.
+
+        Matches are collected once in a CTE; the page of ranked questions,
+        the tag facet counts and the total are all computed from it, so the
+        database does the search work exactly once.
+
+        Args:
+            instructor_id: Owner of the question bank
+            text: Web-search style query ("quoted phrases", -exclusions, or)
+            tags: Only questions carrying all of these tags
+            class_id: Only questions attached to this class
+            limit: Maximum number of questions to return
+
+        Returns:
+            Tuple of ([(question, rank), ...], {tag: count}, total matches)
+        """
+        filters = [
+            Question.instructor_id == instructor_id,
+            Question.is_active == True
+        ]
+        rank = literal(0.0)
+
+        if class_id:
+            filters.append(Question.class_id == class_id)
+        if tags:
+            filters.append(Question.tags.contains(tags))
+        if text and text.strip():
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, text.strip())
+            filters.append(Question.search_vector.op("@@")(ts_query))
+            rank = func.ts_rank_cd(Question.search_vector, ts_query)
+
+        matches = select(
+            Question.id.label("id"),
+            Question.tags.label("tags"),
+            rank.label("rank")
+        ).where(*filters).cte("matches")
+
+        # Facets: count every tag across all matches, not just this page.
+        # Untagged questions hold SQL NULL or the JSON scalar null (the ORM
+        # writes tags=None as 'null'), which cannot be expanded
+        tag_values = select(
+            func.jsonb_array_elements_text(matches.c.tags).label("tag")
+        ).where(
+            func.jsonb_typeof(matches.c.tags) == "array"
+        ).subquery("tag_values")
+        tag_counts = select(
+            tag_values.c.tag,
+            func.count().label("n")
+        ).group_by(tag_values.c.tag).subquery("tag_counts")
+        facets = select(
+            func.jsonb_object_agg(tag_counts.c.tag, tag_counts.c.n)
+        ).scalar_subquery()
+        total = select(func.count()).select_from(matches).scalar_subquery()
+
+        stmt = select(
+            Question,
+            matches.c.rank,
+            facets.label("facets"),
+            total.label("total")
+        ).join(
+            matches, matches.c.id == Question.id
+        ).order_by(
+            matches.c.rank.desc(),
+            Question.created_at.desc(),
+            Question.id.desc()
+        ).limit(limit)
+
+        rows = self.db.execute(stmt).all()
+        if not rows:
+            return [], {}, 0
+
+        return (
+            [(row[0], float(row[1])) for row in rows],
+            rows[0].facets or {},
+            rows[0].total
+        )
+
+    def iter_export_rows(self, query: Query) -> Iterator[dict]:
+        """
+        Stream questions as plain export dicts.
+
+        Rows are read through a server-side cursor in batches of
+        EXPORT_BATCH_SIZE, so memory stays flat regardless of bank size.
+        """
+        query = query.order_by(Question.created_at, Question.id).yield_per(self.EXPORT_BATCH_SIZE)
+
+        for q in query:
+            yield {
+                'id': str(q.id),
+                'class_id': str(q.class_id) if q.class_id else None,
+                'question_text': q.question_text,
+                'question_type': q.question_type,
+                'options': q.options or [],
+                'correct_answer': q.correct_answer,
+                'explanation': q.explanation,
+                'image_url': q.image_url,
+                'points': q.points,
+                'difficulty': q.difficulty,
+                'tags': q.tags or [],
+                'created_at': q.created_at.isoformat() if q.created_at else None
+            }
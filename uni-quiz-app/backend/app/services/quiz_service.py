@@ -2,14 +2,17 @@
 Quiz service - Handles quiz creation, randomization, and attempt management.
 """
 import random
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Integer, Numeric, and_, case, cast, func, literal_column, or_, select, update
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
 from app.models import Quiz, QuizQuestionPool, Question, QuizAttempt, StudentAnswer, Enrollment
+from app.services.stats_service import StatsService
+from app.config import settings
 
 
 class QuizService:
@@ -184,6 +187,7 @@ class QuizService:
         )
         
         self.db.add(attempt)
+        StatsService(self.db).record_started(quiz_id)
         self.db.commit()
         self.db.refresh(attempt)
         
@@ -206,6 +210,12 @@ class QuizService:
         if attempt.is_completed:
             raise ValueError("Quiz already submitted")
         
+        # Same cutoff as the sweeper: the deadline plus ATTEMPT_GRACE_SECONDS
+        now = datetime.utcnow()
+        _, expired = self._deadline_status(attempt_id, now)
+        if expired:
+            raise ValueError("Time is up for this attempt")
+        
         # Check if question is part of this attempt
         if str(question_id) not in attempt.questions_order:
             raise ValueError("Question not part of this attempt")
@@ -218,12 +228,13 @@ class QuizService:
         
         if answer:
             answer.selected_answer = selected_answer
-            answer.answered_at = datetime.utcnow()
+            answer.answered_at = now
         else:
             answer = StudentAnswer(
                 attempt_id=attempt_id,
                 question_id=question_id,
-                selected_answer=selected_answer
+                selected_answer=selected_answer,
+                answered_at=now
             )
             self.db.add(answer)
         
@@ -235,10 +246,15 @@ class QuizService:
     def submit_quiz(self, attempt_id: UUID) -> QuizAttempt:
         """
         Submit entire quiz and calculate score.
+        
+        Graded like the expired-attempt sweeper: answers saved after the
+        deadline plus ATTEMPT_GRACE_SECONDS earn nothing, and an attempt
+        submitted after that is recorded as submitted at its deadline.
         """
+        # Locked, so the expired-attempt sweeper cannot grade it concurrently
         attempt = self.db.query(QuizAttempt).filter(
             QuizAttempt.id == attempt_id
-        ).first()
+        ).with_for_update().first()
         
         if not attempt:
             raise ValueError("Attempt not found")
@@ -246,6 +262,21 @@ class QuizService:
         if attempt.is_completed:
             raise ValueError("Quiz already submitted")
         
+        now = datetime.utcnow()
+        deadline, expired = self._deadline_status(attempt_id, now)
+        
+        # All answers at once, with whether each was saved in time
+        grace = timedelta(seconds=settings.ATTEMPT_GRACE_SECONDS)
+        on_time = func.coalesce(StudentAnswer.answered_at <= self.attempt_deadline() + grace, True)
+        answers = {
+            str(answer.question_id): (answer, answer_on_time)
+            for answer, answer_on_time in self.db.query(StudentAnswer, on_time).join(
+                QuizAttempt, QuizAttempt.id == StudentAnswer.attempt_id
+            ).join(
+                Quiz, Quiz.id == QuizAttempt.quiz_id
+            ).filter(StudentAnswer.attempt_id == attempt_id)
+        }
+        
         # Get all questions for this attempt
         questions = {
             str(q.id): q for q in 
@@ -265,15 +296,15 @@ class QuizService:
             
             total_points += question.points
             
-            # Get answer
-            answer = self.db.query(StudentAnswer).filter(
-                StudentAnswer.attempt_id == attempt_id,
-                StudentAnswer.question_id == UUID(qid)
-            ).first()
+            answer, answer_on_time = answers.get(qid, (None, False))
             
             if answer:
-                # Check answer
-                is_correct = answer.selected_answer.strip().lower() == question.correct_answer.strip().lower()
+                # Check answer; late ones earn nothing
+                is_correct = (
+                    answer_on_time
+                    and answer.selected_answer is not None
+                    and answer.selected_answer.strip().lower() == question.correct_answer.strip().lower()
+                )
                 answer.is_correct = is_correct
                 answer.points_earned = question.points if is_correct else 0
                 
@@ -282,7 +313,7 @@ class QuizService:
         
         # Update attempt
         attempt.is_completed = True
-        attempt.submitted_at = datetime.utcnow()
+        attempt.submitted_at = deadline if expired else now
         attempt.total_points = total_points
         attempt.earned_points = earned_points
         attempt.score = Decimal(earned_points / total_points * 100) if total_points > 0 else Decimal(0)
@@ -293,11 +324,222 @@ class QuizService:
             submitted = attempt.submitted_at.replace(tzinfo=None)
             attempt.time_spent_seconds = int((submitted - started).total_seconds())
         
+        self.db.flush()
+        StatsService(self.db).add_attempts([attempt.id])
         self.db.commit()
         self.db.refresh(attempt)
         
         return attempt
     
+    # ==================== Expired attempts ====================
+    
+    @staticmethod
+    def attempt_deadline():
+        """
+        SQL expression for an attempt's deadline: the earlier of started_at
+        plus the time limit and the quiz's end_time (NULL if neither is set).
+        Needs quiz_attempts joined with quizzes.
+        """
+        limit = QuizAttempt.started_at + Quiz.time_limit_minutes * literal_column("interval '1 minute'")
+        # LEAST ignores NULLs
+        return func.least(limit, Quiz.end_time)
+    
+    def _deadline_status(self, attempt_id: UUID, now: datetime) -> Tuple[Optional[datetime], bool]:
+        """
+        Get an attempt's deadline and whether it passed, grace included.
+        
+        Returns:
+            (deadline or None if untimed, True if now is past deadline plus
+            ATTEMPT_GRACE_SECONDS)
+        """
+        grace = timedelta(seconds=settings.ATTEMPT_GRACE_SECONDS)
+        deadline = self.attempt_deadline()
+        
+        row = self.db.execute(
+            select(
+                deadline,
+                func.coalesce(deadline + grace < now, False)
+            ).select_from(QuizAttempt).join(
+                Quiz, Quiz.id == QuizAttempt.quiz_id
+            ).where(QuizAttempt.id == attempt_id)
+        ).one()
+        
+        return row[0], row[1]
+    
+    def finalize_expired_attempts(self, now: datetime, limit: int) -> int:
+        """
+        Grade up to `limit` attempts whose deadline passed without a submit.
+        
+        Set-based: one claiming SELECT (FOR UPDATE SKIP LOCKED, so several
+        workers and concurrent submit_quiz calls never grade an attempt
+        twice) and two UPDATEs for the whole batch. Only answers saved
+        before the deadline (plus ATTEMPT_GRACE_SECONDS) count.
+        
+        Returns:
+            Number of attempts finalized
+        """
+        grace = timedelta(seconds=settings.ATTEMPT_GRACE_SECONDS)
+        deadline = self.attempt_deadline()
+        
+        # Walks the partial index ix_quiz_attempts_open_started (open
+        # attempts only); an attempt expires at the earliest `grace` after it
+        # started. Untimed quizzes are excluded in the join: their open
+        # attempts never expire
+        claimed = self.db.execute(
+            select(QuizAttempt.id).join(
+                Quiz, and_(
+                    Quiz.id == QuizAttempt.quiz_id,
+                    or_(Quiz.time_limit_minutes.is_not(None), Quiz.end_time.is_not(None))
+                )
+            ).where(
+                QuizAttempt.is_completed == False,
+                QuizAttempt.started_at < now - grace,
+                deadline < now - grace
+            ).order_by(
+                QuizAttempt.started_at
+            ).limit(limit).with_for_update(of=QuizAttempt, skip_locked=True)
+        ).scalars().all()
+        
+        if not claimed:
+            self.db.rollback()
+            return 0
+        
+        # Answers: graded like submit_quiz; late ones earn nothing
+        answer_correct = and_(
+            StudentAnswer.selected_answer.is_not(None),
+            StudentAnswer.answered_at <= deadline + grace,
+            func.lower(func.btrim(StudentAnswer.selected_answer)) == func.lower(func.btrim(Question.correct_answer))
+        )
+        self.db.execute(
+            update(StudentAnswer).where(
+                StudentAnswer.attempt_id.in_(claimed),
+                QuizAttempt.id == StudentAnswer.attempt_id,
+                Quiz.id == QuizAttempt.quiz_id,
+                Question.id == StudentAnswer.question_id
+            ).values(
+                is_correct=answer_correct,
+                points_earned=case((answer_correct, Question.points), else_=0)
+            ).execution_options(synchronize_session=False)
+        )
+        
+        # Attempts: totals over the attempt's question order, as submit_quiz
+        order_ids = func.jsonb_array_elements_text(QuizAttempt.questions_order).table_valued("value")
+        total_points = select(func.coalesce(func.sum(Question.points), 0)).where(
+            Question.id.in_(select(cast(order_ids.c.value, PG_UUID)))
+        ).scalar_subquery()
+        earned_points = select(func.coalesce(func.sum(StudentAnswer.points_earned), 0)).where(
+            StudentAnswer.attempt_id == QuizAttempt.id
+        ).scalar_subquery()
+        
+        self.db.execute(
+            update(QuizAttempt).where(
+                QuizAttempt.id.in_(claimed),
+                Quiz.id == QuizAttempt.quiz_id
+            ).values(
+                is_completed=True,
+                submitted_at=deadline,
+                total_points=total_points,
+                earned_points=earned_points,
+                score=case(
+                    (total_points > 0, func.round(cast(earned_points, Numeric) * 100 / total_points, 2)),
+                    else_=0
+                ),
+                time_spent_seconds=cast(func.extract("epoch", deadline - QuizAttempt.started_at), Integer)
+            ).execution_options(synchronize_session=False)
+        )
+        
+        StatsService(self.db).add_attempts(claimed)
+        self.db.commit()
+        return len(claimed)
+    
+    # ==================== Version probes (conditional GET) ====================
+    
+    def quiz_version(self, quiz_id: UUID, instructor_id: UUID) -> Optional[tuple]:
+        """
+        Get a cheap version of a quiz as returned by the instructor API.
+        
+        Returns:
+            (updated_at, pool size), or None if the quiz is not found
+        """
+        pool_size = self.db.query(func.count(QuizQuestionPool.id)).filter(
+            QuizQuestionPool.quiz_id == Quiz.id
+        ).correlate(Quiz).scalar_subquery()
+        
+        row = self.db.query(Quiz.updated_at, pool_size).filter(
+            Quiz.id == quiz_id,
+            Quiz.instructor_id == instructor_id
+        ).first()
+        
+        return tuple(row) if row else None
+    
+    def quiz_list_version(self, instructor_id: UUID, class_id: Optional[UUID] = None) -> tuple:
+        """
+        Get a cheap version of an instructor's quiz list.
+        
+        Returns:
+            (max updated_at, quiz count, total pool entries)
+        """
+        query = self.db.query(
+            func.max(Quiz.updated_at),
+            func.count(func.distinct(Quiz.id)),
+            func.count(QuizQuestionPool.id)
+        ).outerjoin(
+            QuizQuestionPool, QuizQuestionPool.quiz_id == Quiz.id
+        ).filter(Quiz.instructor_id == instructor_id)
+        
+        if class_id:
+            query = query.filter(Quiz.class_id == class_id)
+        
+        return tuple(query.one())
+    
+    def class_quizzes_version(self, class_id: UUID, student_id: UUID, now: datetime) -> tuple:
+        """
+        Get a cheap version of a class's quiz list as seen by a student.
+        
+        Availability depends on the clock, so the number of start and end
+        times already passed is part of the version.
+        
+        Returns:
+            (max updated_at, quiz count, started, ended, student's attempts)
+        """
+        attempts = self.db.query(func.count(QuizAttempt.id)).join(
+            Quiz, Quiz.id == QuizAttempt.quiz_id
+        ).filter(
+            Quiz.class_id == class_id,
+            Quiz.is_published == True,
+            QuizAttempt.student_id == student_id
+        ).scalar_subquery()
+        
+        row = self.db.query(
+            func.max(Quiz.updated_at),
+            func.count(Quiz.id),
+            func.count(Quiz.id).filter(Quiz.start_time <= now),
+            func.count(Quiz.id).filter(Quiz.end_time < now),
+            attempts
+        ).filter(
+            Quiz.class_id == class_id,
+            Quiz.is_published == True
+        ).one()
+        
+        return tuple(row)
+    
+    def attempt_results_version(self, attempt: QuizAttempt) -> tuple:
+        """
+        Get a cheap version of a completed attempt's results.
+        
+        Returns:
+            (submitted_at, quiz updated_at, max updated_at of its questions)
+        """
+        question_ids = [UUID(qid) for qid in attempt.questions_order or []]
+        
+        questions_updated = None
+        if question_ids:
+            questions_updated = self.db.query(func.max(Question.updated_at)).filter(
+                Question.id.in_(question_ids)
+            ).scalar()
+        
+        return (attempt.submitted_at, attempt.quiz.updated_at, questions_updated)
+    
     def get_quiz_results(self, quiz_id: UUID) -> List[dict]:
         """Get all results for a quiz (for export)."""
         attempts = self.db.query(QuizAttempt).filter(
@@ -0,0 +1,136 @@
+"""
+Reminder service - Deadline reminders for published quizzes.
+
+Two reminders exist per quiz, each sent at most once:
+
+    reminder_opens   REMINDER_OPENS_BEFORE_MINUTES before start_time
+    reminder_closes  REMINDER_CLOSES_BEFORE_MINUTES before end_time, only to
+                     students who have not attempted the quiz
+
+Reminders are broadcasts (app.services.broadcast_service), so "already
+sent" is simply "a broadcast of that kind exists for the quiz". Each tick
+finds all due reminders with one query over the partial time indexes on
+quizzes; recipients are selected with an anti-join against quiz_attempts.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import exists, func, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Broadcast, Quiz, QuizAttempt, Student
+from app.services.broadcast_service import BroadcastService
+
+# Any constant works; only one process per database runs a tick at a time
+TICK_LOCK_KEY = 0x5155495A
+
+
+@dataclass
+class DueReminder:
+    quiz_id: UUID
+    class_id: UUID
+    instructor_id: UUID
+    title: str
+    kind: str
+    at: datetime  # start_time or end_time
+
+
+def reminder_text(reminder: DueReminder, now: datetime) -> str:
+    """Message for a due reminder."""
+    minutes = max(1, round((reminder.at - now).total_seconds() / 60))
+    left = f"{minutes} min" if minutes < 90 else f"{round(minutes / 60)} h"
+
+    if reminder.kind == "reminder_opens":
+        return f"⏰ {reminder.title} opens in {left}.\n\nOpen the Quiz App when it starts."
+    return f"⏳ {reminder.title} closes in {left} and you haven't taken it yet.\n\nOpen the Quiz App to start now."
+
+
+class ReminderService:
+    """Service for finding and queueing due quiz reminders."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def due_reminders(self, now: datetime) -> List[DueReminder]:
+        """Find every reminder due now that has not been sent, in one query."""
+        opens_window = now + timedelta(minutes=settings.REMINDER_OPENS_BEFORE_MINUTES)
+        closes_window = now + timedelta(minutes=settings.REMINDER_CLOSES_BEFORE_MINUTES)
+
+        def due(kind: str, column, window: datetime):
+            sent = exists().where(
+                Broadcast.quiz_id == Quiz.id,
+                Broadcast.kind == kind
+            )
+            return select(
+                Quiz.id.label("quiz_id"),
+                Quiz.class_id,
+                Quiz.instructor_id,
+                Quiz.title,
+                literal(kind).label("kind"),
+                column.label("at")
+            ).where(
+                Quiz.is_published == True,
+                column > now,
+                column <= window,
+                ~sent
+            )
+
+        stmt = union_all(
+            due("reminder_opens", Quiz.start_time, opens_window),
+            due("reminder_closes", Quiz.end_time, closes_window)
+        )
+        return [DueReminder(**row._mapping) for row in self.db.execute(stmt)]
+
+    def recipients(self, reminder: DueReminder):
+        """Active students of the quiz's class; for closing reminders, only those without an attempt."""
+        query = BroadcastService(self.db).class_recipients(reminder.class_id)
+        if reminder.kind == "reminder_closes":
+            attempted = exists().where(
+                QuizAttempt.quiz_id == reminder.quiz_id,
+                QuizAttempt.student_id == Student.id
+            )
+            query = query.where(~attempted)
+        return query
+
+    def enqueue_due(self, now: datetime) -> int:
+        """
+        Queue all due reminders as broadcasts.
+
+        Runs under a transaction-level advisory lock, so concurrent API
+        workers do not queue the same reminder twice.
+
+        Returns:
+            Number of reminder broadcasts queued
+        """
+        locked = self.db.execute(select(func.pg_try_advisory_xact_lock(TICK_LOCK_KEY))).scalar()
+        if not locked:
+            self.db.rollback()
+            return 0
+
+        reminders = self.due_reminders(now)
+        if not reminders:
+            self.db.rollback()
+            return 0
+
+        broadcasts = BroadcastService(self.db)
+        queued = 0
+        for reminder in reminders:
+            try:
+                # Commits, which also releases the lock; the unique index on
+                # (quiz_id, kind) still guards the remaining reminders
+                broadcasts.create_broadcast(
+                    instructor_id=reminder.instructor_id,
+                    class_id=reminder.class_id,
+                    text=reminder_text(reminder, now),
+                    kind=reminder.kind,
+                    quiz_id=reminder.quiz_id,
+                    recipients=self.recipients(reminder)
+                )
+                queued += 1
+            except IntegrityError:
+                self.db.rollback()  # Queued by another worker meanwhile
+        return queued
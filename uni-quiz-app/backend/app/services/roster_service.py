@@ -0,0 +1,265 @@
+"""
+Roster service - Bulk enrollment of a class from a registrar's roster.
+
+Rows are processed in batches of ROSTER_BATCH_SIZE, each in a few set-based
+statements instead of one round trip per student:
+
+    rows with a Telegram ID    INSERT INTO students ... VALUES (...), (...)
+                               ON CONFLICT (telegram_id) DO UPDATE
+                               (fills in the university ID and missing names)
+    rows with only a username  one SELECT on lower(telegram_username)
+    or a university ID         one SELECT on student_id
+    all resolved students      INSERT INTO enrollments ... VALUES (...), (...)
+                               ON CONFLICT ON CONSTRAINT uq_student_class
+                               DO UPDATE ... WHERE inactive
+
+Students without a Telegram ID cannot be created (the bot can only reach
+them by ID), so unknown usernames and university IDs are reported as
+unresolved. The whole roster is imported in one transaction.
+"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import Enrollment, Student
+from app.utils.roster import RosterRow
+
+ROSTER_BATCH_SIZE = 500
+
+# Unresolved rows listed in the summary (all are counted)
+MAX_UNRESOLVED_LISTED = 200
+
+
+@dataclass
+class UnresolvedRow:
+    line: int
+    value: str
+    reason: str
+
+
+@dataclass
+class RosterSummary:
+    """Outcome of a roster import."""
+    total: int = 0
+    matched: int = 0  # Existing students
+    created: int = 0  # New students (by Telegram ID)
+    enrolled: int = 0  # New or reactivated enrollments
+    already_enrolled: int = 0
+    unresolved_count: int = 0
+    unresolved: List[UnresolvedRow] = field(default_factory=list)
+
+    def add_unresolved(self, row: RosterRow, reason: str) -> None:
+        self.unresolved_count += 1
+        if len(self.unresolved) < MAX_UNRESOLVED_LISTED:
+            self.unresolved.append(UnresolvedRow(line=row.line, value=row.label, reason=reason))
+
+
+class RosterService:
+    """Service for bulk-enrolling students from a roster."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def import_roster(self, class_id: UUID, rows: Iterable[RosterRow]) -> RosterSummary:
+        """
+        Enroll every student of a roster in a class.
+
+        Args:
+            class_id: Class to enroll into (ownership checked by the caller)
+            rows: Parsed roster rows (see app.utils.roster.iter_roster)
+
+        Returns:
+            Summary of matched, created and unresolved rows
+
+        Raises:
+            ValueError: If the roster cannot be read; nothing is imported
+        """
+        summary = RosterSummary()
+        seen: Set[UUID] = set()
+
+        try:
+            batch: List[RosterRow] = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= ROSTER_BATCH_SIZE:
+                    self._import_batch(class_id, batch, summary, seen)
+                    batch = []
+            if batch:
+                self._import_batch(class_id, batch, summary, seen)
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self.db.commit()
+        return summary
+
+    def _import_batch(
+        self,
+        class_id: UUID,
+        batch: List[RosterRow],
+        summary: RosterSummary,
+        seen: Set[UUID]
+    ) -> None:
+        summary.total += len(batch)
+
+        usable = []
+        for row in batch:
+            if row.error:
+                summary.add_unresolved(row, row.error)
+            else:
+                usable.append(row)
+
+        by_telegram, created_ids = self._upsert_by_telegram_id(
+            [row for row in usable if row.telegram_id]
+        )
+        by_username = self._lookup(
+            func.lower(Student.telegram_username),
+            {row.username for row in usable if not row.telegram_id and row.username}
+        )
+        by_student_id = self._lookup(
+            Student.student_id,
+            {row.student_id for row in usable if not row.telegram_id and row.student_id}
+        )
+
+        student_ids = []
+        for row in usable:
+            if row.telegram_id:
+                matches = [by_telegram[row.telegram_id]]
+            else:
+                matches = by_username.get(row.username) or by_student_id.get(row.student_id) or []
+
+            if not matches:
+                summary.add_unresolved(row, "No registered student found")
+                continue
+            if len(matches) > 1:
+                summary.add_unresolved(row, "Matches several students")
+                continue
+
+            student_id = matches[0]
+            if student_id in seen:
+                summary.add_unresolved(row, "Duplicate of an earlier row")
+                continue
+            seen.add(student_id)
+
+            if student_id in created_ids:
+                summary.created += 1
+            else:
+                summary.matched += 1
+            student_ids.append(student_id)
+
+        enrolled = self._enroll(class_id, student_ids)
+        summary.enrolled += enrolled
+        summary.already_enrolled += len(student_ids) - enrolled
+
+    def _upsert_by_telegram_id(self, rows: List[RosterRow]) -> Tuple[Dict[int, UUID], Set[UUID]]:
+        """
+        Create or update the students of rows with a Telegram ID.
+
+        Returns:
+            ({telegram_id: student id}, ids of the students created)
+        """
+        if not rows:
+            return {}, set()
+
+        # One row per Telegram ID: a statement may not update a row twice
+        unique = {row.telegram_id: row for row in rows}
+
+        now = datetime.utcnow()
+        stmt = pg_insert(Student).values([
+            {
+                "id": uuid.uuid4(),
+                "telegram_id": row.telegram_id,
+                "telegram_username": row.username,
+                "first_name": row.first_name,
+                "last_name": row.last_name,
+                "student_id": row.student_id,
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for row in unique.values()
+        ])
+
+        # The roster is authoritative for the university ID; Telegram profile
+        # fields are only filled in where missing
+        incoming = {
+            "student_id": func.coalesce(stmt.excluded.student_id, Student.student_id),
+            "telegram_username": func.coalesce(Student.telegram_username, stmt.excluded.telegram_username),
+            "first_name": func.coalesce(Student.first_name, stmt.excluded.first_name),
+            "last_name": func.coalesce(Student.last_name, stmt.excluded.last_name),
+        }
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Student.telegram_id],
+            set_={**incoming, "updated_at": now},
+            where=or_(*(
+                getattr(Student, column).is_distinct_from(value)
+                for column, value in incoming.items()
+            ))
+        ).returning(
+            Student.id,
+            Student.telegram_id,
+            # xmax is 0 only for a freshly inserted row
+            (literal_column("xmax") == 0).label("inserted")
+        )
+
+        ids = {}
+        created = set()
+        for row in self.db.execute(stmt):
+            ids[row.telegram_id] = row.id
+            if row.inserted:
+                created.add(row.id)
+
+        # Existing students with nothing to update are not returned
+        unchanged = unique.keys() - ids.keys()
+        if unchanged:
+            ids.update(self.db.execute(
+                select(Student.telegram_id, Student.id).where(Student.telegram_id.in_(unchanged))
+            ).all())
+
+        return ids, created
+
+    def _lookup(self, column, values: Set[str]) -> Dict[str, List[UUID]]:
+        """Map each value to the ids of the students it matches on `column`."""
+        if not values:
+            return {}
+
+        matches: Dict[str, List[UUID]] = {}
+        rows = self.db.execute(select(column, Student.id).where(column.in_(values)))
+        for value, student_id in rows:
+            matches.setdefault(value, []).append(student_id)
+        return matches
+
+    def _enroll(self, class_id: UUID, student_ids: List[UUID]) -> int:
+        """
+        Enroll students in a class, reactivating inactive enrollments.
+
+        Returns:
+            Number of enrollments created or reactivated
+        """
+        if not student_ids:
+            return 0
+
+        now = datetime.utcnow()
+        stmt = pg_insert(Enrollment).values([
+            {
+                "id": uuid.uuid4(),
+                "student_id": student_id,
+                "class_id": class_id,
+                "enrolled_at": now,
+                "is_active": True,
+            }
+            for student_id in student_ids
+        ])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_student_class",
+            set_={"is_active": True, "enrolled_at": now},
+            where=Enrollment.is_active.is_not(True)
+        ).returning(Enrollment.id)
+
+        return len(self.db.execute(stmt).all())
@@ -0,0 +1,223 @@
+"""
+Stats service - Incrementally maintained per-quiz statistics.
+
+`quiz_stats` holds running sums and a fixed-bucket score histogram per quiz.
+Writers add deltas in the same transaction as the change they count:
+
+    start_quiz_attempt             record_started()    attempts_started + 1
+    submit_quiz, attempt sweeper   add_attempts(ids)   completed attempts,
+                                                       aggregated per quiz
+
+add_attempts(ids, sign=-1) takes attempts back out, so a regrade is
+remove, regrade, add. Changing a quiz's passing score changes which
+attempts passed; rebuild() recomputes that quiz's row from its attempts,
+holding the row lock so concurrent submits wait instead of being lost.
+
+Every change also notifies the live monitor (app.services.live_monitor),
+published when the writer commits.
+
+Reading is a primary-key lookup, independent of the number of attempts.
+"""
+from datetime import datetime
+from math import sqrt
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import array, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import Quiz, QuizAttempt, QuizStats
+from app.models.stats import HISTOGRAM_BUCKETS
+from app.services import live_monitor
+
+BUCKET_WIDTH = 100 / HISTOGRAM_BUCKETS
+
+SUM_COLUMNS = (
+    "attempts_started",
+    "attempts_completed",
+    "passed_count",
+    "score_sum",
+    "score_sq_sum",
+    "time_spent_sum",
+)
+
+
+def _attempt_aggregates(sign: int = 1) -> dict:
+    """Per-quiz aggregates over quiz_attempts joined with quizzes."""
+    completed = QuizAttempt.is_completed == True
+    score = func.coalesce(QuizAttempt.score, 0)
+    passed = completed & (score >= func.coalesce(Quiz.passing_score, 60))
+    bucket = func.least(func.floor(score / BUCKET_WIDTH), HISTOGRAM_BUCKETS - 1)
+
+    def total(expr):
+        return literal(sign) * func.coalesce(func.sum(expr).filter(completed), 0)
+
+    return {
+        "attempts_completed": literal(sign) * func.count().filter(completed),
+        "passed_count": literal(sign) * func.count().filter(passed),
+        "score_sum": total(score),
+        "score_sq_sum": total(score * score),
+        "time_spent_sum": total(func.coalesce(QuizAttempt.time_spent_seconds, 0)),
+        "histogram": array([
+            literal(sign) * func.count().filter(completed & (bucket == i))
+            for i in range(HISTOGRAM_BUCKETS)
+        ]),
+    }
+
+
+class StatsService:
+    """Service for maintaining and reading quiz statistics."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _upsert_deltas(self, stmt, replace: bool = False) -> None:
+        """Add (or, with replace, set) the inserted values onto existing rows; notify their quizzes."""
+        excluded = stmt.excluded
+        if replace:
+            values = {column: getattr(excluded, column) for column in SUM_COLUMNS}
+            values["histogram"] = excluded.histogram
+        else:
+            values = {
+                column: getattr(QuizStats, column) + getattr(excluded, column)
+                for column in SUM_COLUMNS
+            }
+            values["histogram"] = array([
+                QuizStats.histogram[i] + excluded.histogram[i]
+                for i in range(HISTOGRAM_BUCKETS)
+            ])
+        values["updated_at"] = datetime.utcnow()
+
+        quiz_ids = self.db.execute(
+            stmt.on_conflict_do_update(index_elements=[QuizStats.quiz_id], set_=values).returning(QuizStats.quiz_id)
+        ).scalars().all()
+        for quiz_id in quiz_ids:
+            live_monitor.notify(self.db, quiz_id)
+
+    @staticmethod
+    def _empty_row(quiz_id: UUID) -> dict:
+        """Values of a stats row with nothing counted yet."""
+        return {
+            "quiz_id": quiz_id,
+            **{column: 0 for column in SUM_COLUMNS},
+            "histogram": [0] * HISTOGRAM_BUCKETS,
+            "updated_at": datetime.utcnow(),
+        }
+
+    def record_started(self, quiz_id: UUID) -> None:
+        """Count a new attempt (not committed)."""
+        stmt = pg_insert(QuizStats).values({**self._empty_row(quiz_id), "attempts_started": 1})
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[QuizStats.quiz_id],
+            set_={
+                "attempts_started": QuizStats.attempts_started + 1,
+                "updated_at": datetime.utcnow(),
+            }
+        ))
+        live_monitor.notify(self.db, quiz_id)
+
+    def add_attempts(self, attempt_ids: Sequence[UUID], sign: int = 1) -> None:
+        """
+        Add completed attempts to their quizzes' stats (not committed).
+
+        Args:
+            attempt_ids: Attempts, graded; incomplete ones are ignored
+            sign: 1 to add, -1 to take back out (before a regrade)
+        """
+        if not attempt_ids:
+            return
+
+        aggregates = _attempt_aggregates(sign)
+        query = select(
+            QuizAttempt.quiz_id,
+            literal(0).label("attempts_started"),
+            *(expr.label(name) for name, expr in aggregates.items())
+        ).join(
+            Quiz, Quiz.id == QuizAttempt.quiz_id
+        ).where(
+            QuizAttempt.id.in_(attempt_ids),
+            QuizAttempt.is_completed == True
+        ).group_by(QuizAttempt.quiz_id)
+
+        stmt = pg_insert(QuizStats).from_select(["quiz_id", "attempts_started", *aggregates], query)
+        self._upsert_deltas(stmt)
+
+    def rebuild(self, quiz_id: UUID) -> None:
+        """
+        Recompute a quiz's stats from all its attempts (not committed).
+
+        The stats row is created if missing and locked first (SELECT ...
+        FOR UPDATE), and the aggregate reads after the lock is held. A submit
+        committed earlier is in the aggregate. A submit committing later
+        waits for the lock and then adds its delta on top. Without the lock
+        it would be overwritten by an aggregate that never saw it.
+        """
+        self.db.execute(
+            pg_insert(QuizStats).values(self._empty_row(quiz_id)).on_conflict_do_nothing(
+                index_elements=[QuizStats.quiz_id]
+            )
+        )
+        self.db.execute(
+            select(QuizStats.quiz_id).where(QuizStats.quiz_id == quiz_id).with_for_update()
+        )
+
+        aggregates = _attempt_aggregates()
+        query = select(
+            literal(quiz_id, QuizStats.quiz_id.type).label("quiz_id"),
+            func.count(QuizAttempt.id).label("attempts_started"),
+            *(expr.label(name) for name, expr in aggregates.items())
+        ).select_from(Quiz).outerjoin(
+            QuizAttempt, QuizAttempt.quiz_id == Quiz.id
+        ).where(Quiz.id == quiz_id)
+
+        stmt = pg_insert(QuizStats).from_select(["quiz_id", "attempts_started", *aggregates], query)
+        self._upsert_deltas(stmt, replace=True)
+
+    def get_stats(self, quiz_id: UUID) -> dict:
+        """
+        Get a quiz's statistics.
+
+        Returns:
+            Counts, pass rate, mean / standard deviation of the score,
+            average time and histogram (zeros if no attempt was started)
+        """
+        stats = self.db.get(QuizStats, quiz_id)
+        return self.summarize(quiz_id, stats)
+
+    def get_many(self, quiz_ids: List[UUID]) -> List[dict]:
+        """Get statistics of several quizzes, in the given order."""
+        rows = {
+            stats.quiz_id: stats
+            for stats in self.db.query(QuizStats).filter(QuizStats.quiz_id.in_(quiz_ids))
+        } if quiz_ids else {}
+        return [self.summarize(quiz_id, rows.get(quiz_id)) for quiz_id in quiz_ids]
+
+    @staticmethod
+    def summarize(quiz_id: UUID, stats: Optional[QuizStats]) -> dict:
+        """Derive the reported statistics from a stats row."""
+        started = stats.attempts_started if stats else 0
+        completed = stats.attempts_completed if stats else 0
+        passed = stats.passed_count if stats else 0
+
+        average = stddev = average_time = None
+        if completed > 0:
+            average = float(stats.score_sum) / completed
+            variance = float(stats.score_sq_sum) / completed - average ** 2
+            stddev = sqrt(max(0.0, variance))
+            average_time = stats.time_spent_sum / completed
+
+        return {
+            "quiz_id": quiz_id,
+            "attempts_started": started,
+            "attempts_completed": completed,
+            "in_progress": max(0, started - completed),
+            "passed_count": passed,
+            "pass_rate": passed / completed * 100 if completed else None,
+            "average_score": average,
+            "score_stddev": stddev,
+            "average_time_seconds": average_time,
+            "histogram": list(stats.histogram) if stats else [0] * HISTOGRAM_BUCKETS,
+            "bucket_width": BUCKET_WIDTH,
+            "updated_at": stats.updated_at if stats else None,
+        }
@@ -0,0 +1,167 @@
+"""
+AI result cache - Generated questions stored on disk by content hash.
+
+Entries are JSON files named by a SHA-256 key over everything that shapes
+the model's answer (input bytes, prompt version, model name, count):
+
+    <AI_CACHE_DIR>/<2 hex chars>/<key>.json
+
+A file's mtime is its last use: hits touch it, entries older than the TTL
+are treated as missing, and when the cache grows past its size limit the
+least recently used entries are evicted. All file work runs in a thread.
+
+Eviction scans the whole directory, so writes do not trigger it: each
+process keeps a running estimate of the cache size and only scans when
+the estimate passes the limit, or every RESCAN_SECONDS to pick up other
+workers' writes and expired entries. Eviction goes down to
+EVICT_TO_FRACTION of the limit, so a full cache is not rescanned on every
+write.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+RESCAN_SECONDS = 3600
+EVICT_TO_FRACTION = 0.9
+
+
+def cache_key(*parts: Any) -> str:
+    """
+    Build a cache key from the parts of a request.
+
+    Bytes are hashed as-is, everything else by its string form; parts are
+    length-prefixed so different splits never collide.
+    """
+    hasher = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else str(part).encode()
+        hasher.update(len(data).to_bytes(8, "big"))
+        hasher.update(data)
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """Size- and age-bounded JSON cache on the local disk."""
+
+    def __init__(self, directory: str, ttl_seconds: int, max_bytes: int):
+        self.directory = Path(directory) if directory else None
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._estimated_bytes: Optional[int] = None  # Unknown until the first scan
+        self._scanned_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None and self.max_bytes > 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+
+            value = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)  # Mark as recently used
+            return value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable AI cache entry {key}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def _set(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+
+        tmp_path = path.with_name(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._estimated_bytes is not None:
+                self._estimated_bytes += len(data) - replaced
+            scan = (
+                self._estimated_bytes is None
+                or self._estimated_bytes > self.max_bytes
+                or time.time() - self._scanned_at > RESCAN_SECONDS
+            )
+        if scan:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the least recently used ones if over the limit."""
+        now = time.time()
+        entries: List[Tuple[float, int, Path]] = []
+
+        for sub_dir in self.directory.iterdir():
+            if not sub_dir.is_dir():
+                continue
+            for entry in os.scandir(sub_dir):
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Evicted by another worker
+
+                if now - stat.st_mtime > self.ttl_seconds:
+                    Path(entry.path).unlink(missing_ok=True)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO_FRACTION if total > self.max_bytes else self.max_bytes
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+        with self._lock:
+            self._estimated_bytes = total
+            self._scanned_at = now
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None on a miss."""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value. Failures are logged, not raised."""
+        if not self.enabled:
+            return
+        try:
+            await asyncio.to_thread(self._set, key, value)
+        except OSError as e:
+            logger.warning(f"Could not write AI cache entry {key}: {e}")
+
+
+ai_result_cache = ResultCache(
+    settings.AI_CACHE_DIR,
+    ttl_seconds=settings.AI_CACHE_TTL_HOURS * 3600,
+    max_bytes=settings.AI_CACHE_MAX_MB * 1024 * 1024,
+)
@@ -0,0 +1,233 @@
+"""
+Response compression middleware - gzip and brotli, negotiated per request.
+
+Starlette's GZipMiddleware only speaks gzip and compresses everything above
+a fixed size. This middleware:
+
+- picks brotli or gzip from Accept-Encoding (honouring q-values); brotli
+  needs the optional `brotli` package and is skipped without it
+- leaves small bodies, already-encoded responses and compressed media
+  (images, xlsx/zip, ...) untouched
+- compresses streamed bodies chunk by chunk with a flush after each one,
+  so streaming exports are never buffered; event streams pass through
+- uses a cheaper compression level for large single bodies, where the
+  extra ratio of a high level is not worth the CPU
+"""
+import gzip
+import io
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+# Content types worth compressing; everything else passes through
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Latency matters more than ratio for these
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+# Single bodies above this size are compressed with the cheaper level
+LARGE_BODY_SIZE = 1024 * 1024
+
+GZIP_LEVEL = 6
+GZIP_LEVEL_LARGE = 4
+BROTLI_QUALITY = 5
+BROTLI_QUALITY_LARGE = 4
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Parse an Accept-Encoding header into {coding: q}."""
+    codings = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def choose_encoding(header: str, available: List[str]) -> Optional[str]:
+    """
+    Pick the best content coding the client accepts.
+
+    Args:
+        header: Accept-Encoding request header
+        available: Supported codings in order of preference
+
+    Returns:
+        The chosen coding, or None to send the body as-is
+    """
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get("*", 0.0)
+
+    best, best_q = None, 0.0
+    for coding in available:
+        q = codings.get(coding, wildcard)
+        # Ties go to the earlier (preferred) coding
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Encoder:
+    """Incremental compressor with the same interface for every coding."""
+
+    def __init__(self, encoding: str, large: bool = False):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY_LARGE if large else BROTLI_QUALITY)
+        else:
+            self._buffer = io.BytesIO()
+            self._gzip = gzip.GzipFile(
+                mode="wb", fileobj=self._buffer, compresslevel=GZIP_LEVEL_LARGE if large else GZIP_LEVEL
+            )
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + self._brotli.flush() if flush else out
+
+        self._gzip.write(data)
+        if flush:
+            self._gzip.flush()
+        return self._drain()
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+
+        self._gzip.close()
+        return self._drain()
+
+    def _drain(self) -> bytes:
+        out = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return out
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli or gzip."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.available = (["br"] if brotli is not None else []) + ["gzip"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.available)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    """Per-request state: decides on the first body chunk, then streams."""
+
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    def _eligible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith(UNCOMPRESSED_TYPES):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def send_with_compression(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # Hold the headers until the first body chunk shows the body's shape
+            self.start_message = message
+            self.passthrough = not self._eligible(Headers(raw=message["headers"]))
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+
+            if self.passthrough or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                # Whole body at once: compress it in one go
+                self.encoder = _Encoder(self.encoding, large=len(body) > LARGE_BODY_SIZE)
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streaming: length is unknown until the end
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            self.encoder = _Encoder(self.encoding)
+            await self.send(start)
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if more_body:
+            # Flush every chunk so clients see data as soon as it is produced
+            chunk = self.encoder.compress(body, flush=True)
+            if chunk:
+                await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            chunk = self.encoder.compress(body) + self.encoder.finish()
+            await self.send({"type": "http.response.body", "body": chunk})
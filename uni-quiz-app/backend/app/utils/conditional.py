@@ -0,0 +1,75 @@
+"""
+Conditional GET utilities - Weak ETags from row versions.
+
+Read endpoints probe a cheap version of the data they would return (e.g.
+max(updated_at) and a row count) before loading and serializing it:
+
+    version = service.quiz_version(quiz_id, current_user.id)
+    not_modified = conditional_response(request, response, version, ...)
+    if not_modified:
+        return not_modified
+
+The ETag is set on the injected `response`, so FastAPI copies it onto the
+full response when the data did change. ETags are weak: the same version
+may be served with different encodings (see app.utils.compression).
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Clients may store responses but must revalidate them on every use
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from version parts (timestamps, counts, ids, params)."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    version: Any,
+    *params: Any
+) -> Optional[Response]:
+    """
+    Tag a response with an ETag and short-circuit if the client has it.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        response: FastAPI's injected response, receives the ETag header
+        version: Version probe result; None means nothing to tag (e.g.
+            the resource does not exist) and the endpoint carries on
+        *params: Request parameters that change the response body
+
+    Returns:
+        A 304 response if the client's copy is current, otherwise None
+    """
+    if version is None:
+        return None
+
+    etag = make_etag(version, *params)
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
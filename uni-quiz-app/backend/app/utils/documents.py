@@ -0,0 +1,177 @@
+"""
+Document ingestion utilities - Page-by-page extraction from PDF and DOCX.
+
+Documents are read from a file on disk one page range at a time, so only
+the pages currently being processed are ever in memory:
+
+    PDF   PyMuPDF; pages without a text layer (scans) are rendered to
+          JPEG so the model can read them instead
+    DOCX  word/document.xml is parsed incrementally straight out of the
+          zip; explicit page breaks split pages, long runs of text are cut
+          into pages of about DOCX_PAGE_CHARS characters
+
+Extraction is blocking and runs on a dedicated worker pool; every task
+opens its own handle, as MuPDF documents must not be shared across threads.
+"""
+import asyncio
+import math
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import iterparse
+
+from app.config import settings
+
+DOCUMENT_TYPES = {
+    ".pdf": "pdf",
+    ".docx": "docx",
+}
+
+# Pages with less text than this are treated as scans
+SCANNED_PAGE_MIN_CHARS = 20
+
+# Synthetic page size for DOCX files without explicit page breaks
+DOCX_PAGE_CHARS = 3000
+
+PAGE_IMAGE_JPEG_QUALITY = 80
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+_executor = ThreadPoolExecutor(max_workers=settings.DOCUMENT_WORKERS, thread_name_prefix="document")
+
+
+@dataclass
+class DocumentPage:
+    """Content of one page: its text, or a rendered image for scans."""
+    number: int
+    text: str
+    image: Optional[bytes] = None
+
+
+def document_type(filename: str) -> Optional[str]:
+    """Get the document type ('pdf' or 'docx') for a file name, if supported."""
+    return DOCUMENT_TYPES.get(Path(filename).suffix.lower())
+
+
+# ==================== PDF ====================
+
+def _open_pdf(path: Path):
+    # Imported lazily: only needed for document ingestion
+    import fitz
+
+    try:
+        return fitz.open(path, filetype="pdf")
+    except Exception as e:
+        raise ValueError(f"Not a valid PDF: {e}")
+
+
+def _pdf_page(page) -> DocumentPage:
+    text = page.get_text("text").strip()
+    if len(text) >= SCANNED_PAGE_MIN_CHARS or not page.get_images():
+        return DocumentPage(number=page.number + 1, text=text)
+
+    pixmap = page.get_pixmap(dpi=settings.AI_PAGE_IMAGE_DPI)
+    image = pixmap.tobytes("jpg", jpg_quality=PAGE_IMAGE_JPEG_QUALITY)
+    return DocumentPage(number=page.number + 1, text=text, image=image)
+
+
+# ==================== DOCX ====================
+
+def _iter_docx_pages(path: Path) -> Iterator[str]:
+    """Yield the text of each page of a DOCX file, parsing it incrementally."""
+    try:
+        archive = zipfile.ZipFile(path)
+        xml = archive.open("word/document.xml")
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"Not a valid DOCX file: {e}")
+
+    with archive, xml:
+        paragraphs: List[str] = []
+        parts: List[str] = []
+        size = 0
+
+        for event, elem in iterparse(xml, events=("end",)):
+            tag = elem.tag
+            if tag == _W + "t":
+                parts.append(elem.text or "")
+            elif tag == _W + "tab":
+                parts.append("\t")
+            elif tag == _W + "br" and elem.get(_W + "type") == "page":
+                # Hard page break inside a paragraph
+                paragraphs.append("".join(parts))
+                parts = []
+                yield "\n".join(paragraphs).strip()
+                paragraphs, size = [], 0
+            elif tag == _W + "p":
+                text = "".join(parts)
+                parts = []
+                paragraphs.append(text)
+                size += len(text)
+                # Only whole paragraphs are kept; drop the parsed subtree
+                elem.clear()
+                if size >= DOCX_PAGE_CHARS:
+                    yield "\n".join(paragraphs).strip()
+                    paragraphs, size = [], 0
+            elif tag == _W + "tbl":
+                elem.clear()
+
+        if paragraphs:
+            yield "\n".join(paragraphs).strip()
+
+
+# ==================== Public API ====================
+
+def count_pages(path: Path, kind: str) -> int:
+    """
+    Count the pages of a document (blocking).
+
+    Raises:
+        ValueError: If the file is not a valid document of that type
+    """
+    if kind == "pdf":
+        with _open_pdf(path) as doc:
+            if doc.needs_pass:
+                raise ValueError("Password-protected PDFs are not supported")
+            return doc.page_count
+
+    return sum(1 for _ in _iter_docx_pages(path))
+
+
+def extract_pages(path: Path, kind: str, start: int, end: int) -> List[DocumentPage]:
+    """
+    Extract pages [start, end) of a document (blocking, zero-based).
+
+    Raises:
+        ValueError: If the file is not a valid document of that type
+    """
+    if kind == "pdf":
+        with _open_pdf(path) as doc:
+            return [_pdf_page(doc[number]) for number in range(start, min(end, doc.page_count))]
+
+    pages = []
+    for number, text in enumerate(_iter_docx_pages(path)):
+        if number >= end:
+            break
+        if number >= start:
+            pages.append(DocumentPage(number=number + 1, text=text))
+    return pages
+
+
+def page_ranges(page_count: int, max_ranges: int) -> List[Tuple[int, int]]:
+    """Split pages into at most max_ranges consecutive [start, end) ranges."""
+    size = max(1, math.ceil(page_count / max_ranges))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+async def count_pages_async(path: Path, kind: str) -> int:
+    """Run count_pages on the document worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, count_pages, path, kind)
+
+
+async def extract_pages_async(path: Path, kind: str, start: int, end: int) -> List[DocumentPage]:
+    """Run extract_pages on the document worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, extract_pages, path, kind, start, end)
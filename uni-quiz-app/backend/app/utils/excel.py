@@ -1,10 +1,12 @@
 """
-Excel export utilities for quiz results.
+Excel export utilities for quiz results and question banks.
 """
+import tempfile
 from io import BytesIO
 from datetime import datetime
-from typing import List, Any
+from typing import List, Any, BinaryIO, Iterable, Iterator, Optional
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
 
@@ -12,7 +14,9 @@ from openpyxl.utils import get_column_letter
 def create_quiz_results_excel(
     quiz_title: str,
     class_name: str,
-    results: List[dict]
+    results: List[dict],
+    stats: dict,
+    item_analysis: Optional[dict] = None
 ) -> BytesIO:
     """
     Create an Excel file with quiz results.
@@ -21,6 +25,9 @@ def create_quiz_results_excel(
         quiz_title: Title of the quiz
         class_name: Name of the class
         results: List of result dicts containing student info and scores
+        stats: Quiz statistics (StatsService.get_stats), for the summary
+        item_analysis: Item analysis (app.services.item_analysis), added
+            as a second sheet when given
         
     Returns:
         BytesIO buffer containing the Excel file
@@ -144,21 +151,23 @@ def create_quiz_results_excel(
     summary_row = len(results) + 7
     ws.cell(row=summary_row, column=1, value="Summary").font = Font(bold=True)
     
-    total_students = len(results)
-    passed_count = sum(1 for r in results if r.get('passed', False))
-    avg_score = sum(r.get('score', 0) for r in results) / total_students if total_students > 0 else 0
+    completed = stats['attempts_completed']
+    passed_count = stats['passed_count']
     
-    ws.cell(row=summary_row + 1, column=1, value=f"Total Students: {total_students}")
+    ws.cell(row=summary_row + 1, column=1, value=f"Completed Attempts: {completed}")
     ws.cell(row=summary_row + 2, column=1, value=f"Passed: {passed_count}")
-    ws.cell(row=summary_row + 3, column=1, value=f"Failed: {total_students - passed_count}")
-    ws.cell(row=summary_row + 4, column=1, value=f"Average Score: {avg_score:.2f}%")
-    ws.cell(row=summary_row + 5, column=1, value=f"Pass Rate: {(passed_count/total_students*100) if total_students > 0 else 0:.1f}%")
+    ws.cell(row=summary_row + 3, column=1, value=f"Failed: {completed - passed_count}")
+    ws.cell(row=summary_row + 4, column=1, value=f"Average Score: {stats['average_score'] or 0:.2f}%")
+    ws.cell(row=summary_row + 5, column=1, value=f"Pass Rate: {stats['pass_rate'] or 0:.1f}%")
     
     # Adjust column widths
     column_widths = [8, 25, 20, 15, 12, 12, 10, 18, 18, 12]
     for col, width in enumerate(column_widths, 1):
         ws.column_dimensions[get_column_letter(col)].width = width
     
+    if item_analysis is not None:
+        _write_item_analysis_sheet(wb, item_analysis, header_font, header_fill, border)
+    
     # Save to BytesIO
     output = BytesIO()
     wb.save(output)
@@ -167,78 +176,181 @@ def create_quiz_results_excel(
     return output
 
 
-def create_question_bank_excel(questions: List[dict]) -> BytesIO:
+# Item analysis: items outside these ranges are highlighted for review
+ITEM_P_VALUE_RANGE = (0.2, 0.9)
+ITEM_MIN_DISCRIMINATION = 0.2
+
+
+def _write_item_analysis_sheet(wb: Workbook, analysis: dict, header_font, header_fill, border) -> None:
+    """Add an "Item Analysis" sheet: one row per question, one column per option."""
+    ws = wb.create_sheet("Item Analysis")
+    
+    items = analysis.get('items', [])
+    option_columns = max((len(item['options']) for item in items), default=0)
+    
+    headers = ["#", "Question", "Type", "Attempts", "Difficulty (p)", "Discrimination"]
+    headers += [f"Option {i}" for i in range(1, option_columns + 1)]
+    
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=1, column=col, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        cell.border = border
+    
+    review_fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
+    correct_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+    
+    def percent(value):
+        return "-" if value is None else f"{value * 100:.0f}%"
+    
+    for idx, item in enumerate(items, 1):
+        row = idx + 1
+        p_value = item.get('p_value')
+        discrimination = item.get('discrimination')
+        
+        values = [idx, item.get('question_text', ''), item.get('question_type', ''), item.get('attempts', 0), p_value, discrimination]
+        for col, value in enumerate(values, 1):
+            ws.cell(row=row, column=col, value=value).border = border
+        
+        if p_value is not None and not ITEM_P_VALUE_RANGE[0] <= p_value <= ITEM_P_VALUE_RANGE[1]:
+            ws.cell(row=row, column=5).fill = review_fill
+        if discrimination is not None and discrimination < ITEM_MIN_DISCRIMINATION:
+            ws.cell(row=row, column=6).fill = review_fill
+        
+        # "label: rate (upper / lower)" per option
+        for offset, option in enumerate(item['options']):
+            label = option.get('option_id') or option.get('label')
+            text = (
+                f"{label}: {percent(option.get('rate'))} "
+                f"(U {percent(option.get('upper_rate'))} / L {percent(option.get('lower_rate'))})"
+            )
+            cell = ws.cell(row=row, column=7 + offset, value=text)
+            cell.border = border
+            if option.get('is_correct'):
+                cell.fill = correct_fill
+    
+    column_widths = [6, 50, 16, 10, 14, 15] + [24] * option_columns
+    for col, width in enumerate(column_widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+    ws.freeze_panes = "C2"
+
+
+QUESTION_BANK_HEADERS = [
+    "Question Text",
+    "Type",
+    "Option A",
+    "Option B",
+    "Option C",
+    "Option D",
+    "Correct Answer",
+    "Explanation",
+    "Points",
+    "Difficulty",
+    "Tags"
+]
+
+QUESTION_BANK_COLUMN_WIDTHS = [50, 15, 20, 20, 20, 20, 15, 40, 10, 12, 25]
+
+# Size of each chunk yielded when streaming a finished workbook
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _question_bank_row(q: dict) -> list:
+    """Flatten a question dict into a question bank sheet row."""
+    row = [q.get('question_text', ''), q.get('question_type', 'multiple_choice')]
+    
+    # Options (always four columns)
+    options = (q.get('options') or [])[:4]
+    for opt in options:
+        row.append(opt.get('text', '') if isinstance(opt, dict) else str(opt))
+    row.extend([None] * (4 - len(options)))
+    
+    tags = q.get('tags') or []
+    row.extend([
+        q.get('correct_answer', ''),
+        q.get('explanation', ''),
+        q.get('points', 1),
+        q.get('difficulty', 'medium'),
+        ', '.join(tags) if tags else ''
+    ])
+    return row
+
+
+def write_question_bank_excel(questions: Iterable[dict], output: BinaryIO) -> None:
     """
-    Create an Excel file with question bank for export.
+    Write a question bank workbook to a file-like object.
+    
+    Uses openpyxl's write-only mode, so rows are flushed to a temporary
+    file as they are appended instead of being kept as cell objects.
     
     Args:
-        questions: List of question dicts
-        
-    Returns:
-        BytesIO buffer containing the Excel file
+        questions: Iterable of question dicts (may be a lazy generator)
+        output: Writable binary file-like object
     """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Question Bank"
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Question Bank")
     
-    # Headers
-    headers = [
-        "Question Text",
-        "Type",
-        "Option A",
-        "Option B",
-        "Option C",
-        "Option D",
-        "Correct Answer",
-        "Explanation",
-        "Points",
-        "Difficulty",
-        "Tags"
-    ]
+    # Column widths must be set before any row is written
+    for col, width in enumerate(QUESTION_BANK_COLUMN_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
     
     header_font = Font(bold=True, color="FFFFFF")
     header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
     
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
+    header_row = []
+    for header in QUESTION_BANK_HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
         cell.font = header_font
         cell.fill = header_fill
+        header_row.append(cell)
+    ws.append(header_row)
     
     # Data rows
-    for idx, q in enumerate(questions, 2):
-        ws.cell(row=idx, column=1, value=q.get('question_text', ''))
-        ws.cell(row=idx, column=2, value=q.get('question_type', 'multiple_choice'))
-        
-        # Options
-        options = q.get('options', [])
-        for opt_idx, opt in enumerate(options[:4]):
-            if isinstance(opt, dict):
-                ws.cell(row=idx, column=3 + opt_idx, value=opt.get('text', ''))
-            else:
-                ws.cell(row=idx, column=3 + opt_idx, value=str(opt))
-        
-        ws.cell(row=idx, column=7, value=q.get('correct_answer', ''))
-        ws.cell(row=idx, column=8, value=q.get('explanation', ''))
-        ws.cell(row=idx, column=9, value=q.get('points', 1))
-        ws.cell(row=idx, column=10, value=q.get('difficulty', 'medium'))
-        
-        tags = q.get('tags', [])
-        ws.cell(row=idx, column=11, value=', '.join(tags) if tags else '')
+    for q in questions:
+        ws.append(_question_bank_row(q))
     
-    # Adjust column widths
-    ws.column_dimensions['A'].width = 50
-    ws.column_dimensions['B'].width = 15
-    for col in ['C', 'D', 'E', 'F']:
-        ws.column_dimensions[col].width = 20
-    ws.column_dimensions['G'].width = 15
-    ws.column_dimensions['H'].width = 40
-    ws.column_dimensions['I'].width = 10
-    ws.column_dimensions['J'].width = 12
-    ws.column_dimensions['K'].width = 25
+    wb.save(output)
+
+
+def create_question_bank_excel(questions: List[dict]) -> BytesIO:
+    """
+    Create an Excel file with question bank for export.
     
-    # Save to BytesIO
+    Args:
+        questions: List of question dicts
+        
+    Returns:
+        BytesIO buffer containing the Excel file
+    """
     output = BytesIO()
-    wb.save(output)
+    write_question_bank_excel(questions, output)
     output.seek(0)
     
     return output
+
+
+def stream_question_bank_excel(questions: Iterable[dict]) -> Iterator[bytes]:
+    """
+    Build a question bank workbook and yield it in chunks.
+    
+    The workbook is spooled to a temporary file (in memory only while
+    small), then read back in STREAM_CHUNK_SIZE pieces. This is a sync
+    generator, so StreamingResponse drives it from the threadpool and the
+    event loop is never blocked by row fetching or zip compression.
+    
+    Args:
+        questions: Iterable of question dicts (may be a lazy generator)
+        
+    Yields:
+        Chunks of the .xlsx file
+    """
+    with tempfile.SpooledTemporaryFile(max_size=STREAM_CHUNK_SIZE * 16) as output:
+        write_question_bank_excel(questions, output)
+        output.seek(0)
+        
+        while True:
+            chunk = output.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,38 @@
+"""
+Streaming export helpers (NDJSON).
+"""
+import json
+from typing import Iterable, Iterator
+
+# Flush buffered lines once they reach this many bytes
+NDJSON_CHUNK_SIZE = 64 * 1024
+
+
+def iter_ndjson(rows: Iterable[dict]) -> Iterator[bytes]:
+    """
+    Encode rows as newline-delimited JSON.
+
+    Lines are grouped into chunks of roughly NDJSON_CHUNK_SIZE bytes so a
+    large export is not sent as tens of thousands of tiny writes.
+
+    Args:
+        rows: Iterable of JSON-serializable dicts (may be a lazy generator)
+
+    Yields:
+        UTF-8 encoded NDJSON chunks
+    """
+    buffer = []
+    size = 0
+
+    for row in rows:
+        line = (json.dumps(row, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        buffer.append(line)
+        size += len(line)
+
+        if size >= NDJSON_CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+
+    if buffer:
+        yield b"".join(buffer)
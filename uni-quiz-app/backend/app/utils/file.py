@@ -1,43 +1,376 @@
+"""
+File upload utilities - Streaming, size-limited, content-addressed storage.
+
+Uploads are read in chunks, hashed while they are written to a temporary
+file, and then stored (see app.utils.storage) under a key derived from
+their SHA-256 digest:
+
+    <sub_dir>/<2 hex chars>/<sha256>.<ext>
+
+Identical files (common when question banks are copied between classes)
+therefore map to the same key and are stored only once.
+
+Clients may also upload straight to the storage backend with a presigned
+form (see presign_upload), so the upload itself never passes through the
+API workers, and then call finalize_direct_upload, which checks the
+object against the digest in the key and builds derivatives. Building
+derivatives reads the original back once; see finalize_direct_upload.
+"""
+import hashlib
 import os
+import re
 import shutil
 import uuid
 from pathlib import Path
-from fastapi import UploadFile, HTTPException
+from typing import Tuple
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile, HTTPException, status
 
-UPLOAD_DIR = Path("uploads")
+from app.config import settings
+from app.utils.image import DERIVABLE_EXTENSIONS, derivative_names, generate_derivatives_async
+from app.utils.storage import get_storage
+
+UPLOAD_DIR = Path(settings.UPLOAD_DIR)
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+ALLOWED_CONTENT_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+# Bytes read from the upload per iteration
+CHUNK_SIZE = 64 * 1024
+
+# Temporary files live inside UPLOAD_DIR so the local backend's move is an atomic rename
+TMP_DIR = UPLOAD_DIR / ".tmp"
+
+_CONTENT_KEY_RE = re.compile(r"^(?P<sub_dir>[a-z_]+)/(?P<prefix>[0-9a-f]{2})/(?P<digest>[0-9a-f]{64})(?P<ext>\.[a-z]+)$")
+
+
+def _normalize_extension(filename: str) -> str:
+    """Return the lower-cased extension, mapping aliases to one spelling."""
+    ext = Path(filename).suffix.lower()
+    return ".jpg" if ext == ".jpeg" else ext
+
+
+def _max_upload_bytes() -> int:
+    return settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+
+
+def content_key(digest: str, ext: str, sub_dir: str = "images") -> str:
+    """
+    Get the content-addressed storage key for a file.
 
-def save_upload_file(upload_file: UploadFile, sub_dir: str = "images") -> str:
+    Args:
+        digest: Hex SHA-256 of the file contents
+        ext: File extension including the dot
+        sub_dir: Subdirectory within uploads
+
+    Returns:
+        Storage key, also the URL path below /uploads
     """
-    Save an uploaded file to the uploads directory.
-    
+    return f"{sub_dir}/{digest[:2]}/{digest}{ext}"
+
+
+def content_path(digest: str, ext: str, sub_dir: str = "images") -> Path:
+    """Get the local path of a content-addressed file (local backend only)."""
+    return UPLOAD_DIR / content_key(digest, ext, sub_dir)
+
+
+def parse_content_key(key: str) -> Tuple[str, str]:
+    """
+    Split a content-addressed key into digest and extension.
+
+    Raises:
+        ValueError: If the key was not produced by content_key
+    """
+    match = _CONTENT_KEY_RE.match(key)
+    if not match or match.group("prefix") != match.group("digest")[:2]:
+        raise ValueError("Invalid upload key")
+    if match.group("ext") not in ALLOWED_EXTENSIONS:
+        raise ValueError("File type not allowed")
+    return match.group("digest"), match.group("ext")
+
+
+def key_url(key: str) -> str:
+    """Get the public URL of a stored file."""
+    return f"/uploads/{key}"
+
+
+async def stream_to_tmp(upload_file: UploadFile, max_bytes: int) -> Tuple[Path, str]:
+    """
+    Stream an upload to a temporary file, hashing it on the way.
+
+    The file is read in CHUNK_SIZE pieces, never held in memory as a
+    whole, and rejected with 413 as soon as it exceeds max_bytes.
+
+    Returns:
+        (temporary path, hex SHA-256); the caller owns the temporary file
+    """
+    hasher = hashlib.sha256()
+    size = 0
+
+    await aiofiles.os.makedirs(TMP_DIR, exist_ok=True)
+    tmp_path = TMP_DIR / f"{uuid.uuid4().hex}.part"
+
+    try:
+        async with aiofiles.open(tmp_path, "wb") as buffer:
+            while True:
+                chunk = await upload_file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_MB} MB"
+                    )
+
+                hasher.update(chunk)
+                await buffer.write(chunk)
+
+        if size == 0:
+            raise HTTPException(status_code=400, detail="File is empty")
+    except BaseException:
+        if os.path.exists(tmp_path):
+            await aiofiles.os.remove(tmp_path)
+        raise
+
+    return tmp_path, hasher.hexdigest()
+
+
+async def _has_derivatives(key: str, digest: str, ext: str) -> bool:
+    """Whether an image's derivatives are all stored (True if it has none)."""
+    if ext not in DERIVABLE_EXTENSIONS:
+        return True
+
+    # The placeholder is stored last, so its presence means the set is complete
+    prefix = key.rsplit("/", 1)[0]
+    return await get_storage().exists(f"{prefix}/{derivative_names(digest)[-1]}")
+
+
+async def _store_derivatives(source: Path, key: str, digest: str, ext: str) -> None:
+    """
+    Build and store any missing derivatives of an image.
+
+    Raises:
+        HTTPException: 400 if the file is not a valid image
+    """
+    if await _has_derivatives(key, digest, ext):
+        return
+
+    storage = get_storage()
+    prefix = key.rsplit("/", 1)[0]
+    names = derivative_names(digest)
+
+    work_dir = TMP_DIR / uuid.uuid4().hex
+    await aiofiles.os.makedirs(work_dir, exist_ok=True)
+    try:
+        # Resized copies for the mini app, built off the event loop
+        try:
+            paths = await generate_derivatives_async(source, work_dir, digest)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="File is not a valid image")
+
+        for name, path in zip(names, paths):
+            derivative_key = f"{prefix}/{name}"
+            if await storage.exists(derivative_key):
+                continue
+            await storage.put_file(derivative_key, path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+async def save_upload_file(upload_file: UploadFile, sub_dir: str = "images") -> str:
+    """
+    Save an uploaded file to the configured storage backend.
+
     Args:
         upload_file: The file to save
         sub_dir: Subdirectory within uploads
-        
+
     Returns:
         The URL path to the saved file
     """
     if not upload_file.filename:
         raise HTTPException(status_code=400, detail="Filename is missing")
-        
-    ext = Path(upload_file.filename).suffix.lower()
+
+    ext = _normalize_extension(upload_file.filename)
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail="File type not allowed")
-    
-    # Create directory if not exists
-    save_dir = UPLOAD_DIR / sub_dir
-    save_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Generate unique filename
-    filename = f"{uuid.uuid4()}{ext}"
-    file_path = save_dir / filename
-    
-    try:
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
+
+    storage = get_storage()
+
+    try:
+        tmp_path, digest = await stream_to_tmp(upload_file, _max_upload_bytes())
+    finally:
+        await upload_file.close()
+
+    key = content_key(digest, ext, sub_dir)
+    try:
+        # Derivatives first: they also validate that the file is an image
+        await _store_derivatives(tmp_path, key, digest, ext)
+
+        if await storage.exists(key):
+            # Duplicate content: keep the stored copy
+            await aiofiles.os.remove(tmp_path)
+        else:
+            await storage.put_file(key, tmp_path)
+    finally:
+        if os.path.exists(tmp_path):
+            await aiofiles.os.remove(tmp_path)
+
+    return key_url(key)
+
+
+async def presign_upload(
+    filename: str,
+    content_type: str,
+    size: int,
+    sha256: str,
+    sub_dir: str = "images"
+) -> dict:
+    """
+    Prepare a direct upload of a file whose digest the client computed.
+
+    Args:
+        filename: Original file name (for the extension)
+        content_type: MIME type the client will send
+        size: File size in bytes
+        sha256: Hex SHA-256 of the file contents
+        sub_dir: Subdirectory within uploads
+
+    Returns:
+        Dict with key, url, exists and upload (None if the file is already
+        stored, otherwise the form to POST the file with)
+
+    Raises:
+        ValueError: If the file type or size is not allowed
+    """
+    ext = _normalize_extension(filename)
+    if ext not in ALLOWED_EXTENSIONS or ALLOWED_CONTENT_TYPES.get(content_type) != ext:
+        raise ValueError("File type not allowed")
+
+    max_bytes = _max_upload_bytes()
+    if size > max_bytes:
+        raise ValueError(f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_MB} MB")
+
+    storage = get_storage()
+    key = content_key(sha256.lower(), ext, sub_dir)
+    exists = await storage.exists(key)
+
+    return {
+        "key": key,
+        "url": key_url(key),
+        "exists": exists,
+        "upload": None if exists else storage.presign_upload(key, content_type, max_bytes, sha256.lower()),
+    }
+
+
+async def finalize_direct_upload(key: str) -> str:
+    """
+    Verify a directly uploaded file and build its derivatives.
+
+    The object is checked against the digest in its key with the checksum
+    the store verified on upload (S3 ChecksumSHA256, read with a HEAD
+    request). The object is only read back into the worker, in full, when
+    derivatives still have to be built, or to hash it when the store kept
+    no checksum (local storage, stores without upload checksums). A
+    mismatching object is deleted.
+
+    Args:
+        key: Key returned by presign_upload
+
+    Returns:
+        The URL path to the stored file
+
+    Raises:
+        HTTPException: 400 if the key is invalid, the object is missing or
+            its contents do not match the key
+    """
+    try:
+        digest, ext = parse_content_key(key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    storage = get_storage()
+    size = await storage.size(key)
+    if size is None:
+        raise HTTPException(status_code=400, detail="File has not been uploaded")
+    if size > _max_upload_bytes():
+        await storage.delete(key)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_MB} MB"
+        )
+
+    checksum = await storage.stored_sha256(key)
+    if checksum is not None and checksum != digest:
+        await storage.delete(key)
+        raise HTTPException(status_code=400, detail="File contents do not match the upload key")
+
+    needs_derivatives = not await _has_derivatives(key, digest, ext)
+    if checksum is not None and not needs_derivatives:
+        return key_url(key)
+
+    await aiofiles.os.makedirs(TMP_DIR, exist_ok=True)
+    tmp_path = TMP_DIR / f"{uuid.uuid4().hex}.part"
+    try:
+        await storage.get_file(key, tmp_path)
+
+        if checksum is None:
+            hasher = hashlib.sha256()
+            async with aiofiles.open(tmp_path, "rb") as f:
+                while chunk := await f.read(CHUNK_SIZE):
+                    hasher.update(chunk)
+
+            if hasher.hexdigest() != digest:
+                await storage.delete(key)
+                raise HTTPException(status_code=400, detail="File contents do not match the upload key")
+
+        if needs_derivatives:
+            try:
+                await _store_derivatives(tmp_path, key, digest, ext)
+            except HTTPException:
+                await storage.delete(key)
+                raise
+    finally:
+        if os.path.exists(tmp_path):
+            await aiofiles.os.remove(tmp_path)
+
+    return key_url(key)
+
+
+async def receive_direct_upload(upload_file: UploadFile, key: str, max_bytes: int) -> None:
+    """
+    Store a file POSTed to a local presigned upload form.
+
+    The contents must match the digest in the key; derivatives are built
+    by finalize_direct_upload, as with other backends.
+
+    Raises:
+        HTTPException: 400 if the key is invalid or the contents do not match
+    """
+    try:
+        digest, _ = parse_content_key(key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        tmp_path, actual = await stream_to_tmp(upload_file, min(max_bytes, _max_upload_bytes()))
+    finally:
+        await upload_file.close()
+
+    try:
+        if actual != digest:
+            raise HTTPException(status_code=400, detail="File contents do not match the upload key")
+
+        storage = get_storage()
+        if not await storage.exists(key):
+            await storage.put_file(key, tmp_path)
     finally:
-        upload_file.file.close()
-        
-    # Return URL path (assuming mounted at /uploads)
-    return f"/uploads/{sub_dir}/{filename}"
+        if os.path.exists(tmp_path):
+            await aiofiles.os.remove(tmp_path)
@@ -0,0 +1,284 @@
+"""
+Image derivative utilities - Resized, recompressed copies of question images.
+
+For every content-addressed image (see app.utils.file) a fixed set of
+derivatives is written next to the original:
+
+    <sha256>_w<width>.webp   one per configured width
+    <sha256>_w<width>.jpg    JPEG fallback for each width
+    <sha256>_lqip.webp       tiny blurred placeholder
+
+Derivative names are derived from the original's URL, so no metadata has
+to be stored or looked up when serving questions to students.
+"""
+import asyncio
+import io
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from PIL import Image, ImageOps
+
+from app.config import settings
+
+# Formats that are resized; GIFs may be animated and are served as-is
+DERIVABLE_EXTENSIONS = {".jpg", ".png", ".webp"}
+
+WEBP_QUALITY = 75
+JPEG_QUALITY = 80
+PLACEHOLDER_WIDTH = 24
+
+VISION_JPEG_QUALITY = 85
+# Tiles of tall scans have roughly A4 proportions
+VISION_TILE_ASPECT = 1.4
+VISION_TILE_OVERLAP = 0.1
+
+# Matches URLs produced by save_upload_file: /uploads/<sub>/<aa>/<sha256>.<ext>
+_CONTENT_URL_RE = re.compile(r"^(?P<base>/uploads/.+/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64}))(?P<ext>\.[a-z]+)$")
+
+# Dedicated pool so image work never starves the request threadpool
+_executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix="image")
+
+
+def _derivative_name(digest: str, suffix: str) -> str:
+    return f"{digest}_{suffix}"
+
+
+def derivative_names(digest: str) -> List[str]:
+    """
+    List the file names of all derivatives of an image.
+
+    The placeholder comes last: it is also written last, so its presence
+    means the whole set is complete.
+    """
+    names = [
+        _derivative_name(digest, f"w{width}") + ext
+        for width in settings.image_derivative_widths
+        for ext in (".webp", ".jpg")
+    ]
+    names.append(_derivative_name(digest, "lqip") + ".webp")
+    return names
+
+
+def generate_derivatives(
+    source: Path,
+    out_dir: Optional[Path] = None,
+    digest: Optional[str] = None
+) -> List[Path]:
+    """
+    Write all derivatives for a stored image (blocking, CPU-bound).
+
+    Existing derivatives in out_dir are left untouched, so this is safe to
+    call again for duplicate uploads or from a backfill script.
+
+    Args:
+        source: Path of the original image
+        out_dir: Where to write derivatives (default: next to the source)
+        digest: SHA-256 of the original (default: the source file's stem)
+
+    Returns:
+        Paths of all derivatives, in derivative_names() order
+
+    Raises:
+        ValueError: If the file is not a readable image
+    """
+    out_dir = out_dir or source.parent
+    digest = digest or source.stem
+    paths = [out_dir / name for name in derivative_names(digest)]
+
+    if all(path.exists() for path in paths):
+        return paths
+
+    try:
+        with Image.open(source) as img:
+            img.load()
+            # Phone photos are often stored sideways with an EXIF rotation flag
+            img = ImageOps.exif_transpose(img)
+    except Exception as e:
+        raise ValueError(f"Not a valid image: {e}")
+
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB")
+
+    *sized_paths, placeholder = paths
+    widths = [width for width in settings.image_derivative_widths for _ in (".webp", ".jpg")]
+
+    for width, path in zip(widths, sized_paths):
+        if path.exists():
+            continue
+
+        # Never upscale: small originals yield derivatives at their own size
+        resized = img
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            resized = img.resize((width, height), Image.LANCZOS)
+
+        tmp_path = path.with_name(path.name + ".part")
+        if path.suffix == ".webp":
+            resized.save(tmp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+        else:
+            # JPEG has no alpha channel: flatten onto white
+            if resized.mode == "RGBA":
+                background = Image.new("RGB", resized.size, (255, 255, 255))
+                background.paste(resized, mask=resized.getchannel("A"))
+                resized = background
+            resized.save(tmp_path, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        tmp_path.replace(path)
+
+    if not placeholder.exists():
+        height = max(1, round(img.height * PLACEHOLDER_WIDTH / img.width))
+        tiny = img.resize((PLACEHOLDER_WIDTH, height), Image.BILINEAR)
+        tmp_path = placeholder.with_name(placeholder.name + ".part")
+        tiny.save(tmp_path, "WEBP", quality=30)
+        tmp_path.replace(placeholder)
+
+    return paths
+
+
+async def generate_derivatives_async(
+    source: Path,
+    out_dir: Optional[Path] = None,
+    digest: Optional[str] = None
+) -> List[Path]:
+    """Run generate_derivatives on the image worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, generate_derivatives, source, out_dir, digest)
+
+
+def derivative_url(image_url: Optional[str], width: int, fmt: str = "webp") -> Optional[str]:
+    """
+    Get the URL of an image derivative.
+
+    Args:
+        image_url: URL of the original image
+        width: One of settings.image_derivative_widths
+        fmt: 'webp' or 'jpg'
+
+    Returns:
+        Derivative URL, or the original URL if it has no derivatives
+        (legacy uploads, GIFs, external links)
+    """
+    if not image_url:
+        return image_url
+
+    match = _CONTENT_URL_RE.match(image_url)
+    if not match or match.group("ext") not in DERIVABLE_EXTENSIONS:
+        return image_url
+
+    base = match.group("base")
+    return f"{base[:-64]}{_derivative_name(match.group('digest'), f'w{width}')}.{fmt}"
+
+
+def placeholder_url(image_url: Optional[str]) -> Optional[str]:
+    """Get the URL of an image's tiny placeholder, or None if it has none."""
+    if not image_url:
+        return None
+
+    match = _CONTENT_URL_RE.match(image_url)
+    if not match or match.group("ext") not in DERIVABLE_EXTENSIONS:
+        return None
+
+    base = match.group("base")
+    return f"{base[:-64]}{_derivative_name(match.group('digest'), 'lqip')}.webp"
+
+
+def student_image_url(image_url: Optional[str], fmt: str = "webp") -> Optional[str]:
+    """Get the derivative URL served to students in the mini app."""
+    widths = settings.image_derivative_widths
+    # Smallest generated width that still covers the target width
+    width = min((w for w in widths if w >= settings.STUDENT_IMAGE_WIDTH), default=max(widths))
+    return derivative_url(image_url, width, fmt)
+
+
+# ==================== AI vision input ====================
+
+def _vision_tiles(img: Image.Image, max_tiles: int) -> List[Image.Image]:
+    """Cut an image into overlapping tiles along its long axis."""
+    width, height = img.size
+    vertical = height >= width
+    short, long = (width, height) if vertical else (height, width)
+
+    tile = round(short * VISION_TILE_ASPECT)
+    step = round(tile * (1 - VISION_TILE_OVERLAP))
+    count = min(max_tiles, max(1, math.ceil((long - tile) / step) + 1))
+    if count == max_tiles:
+        # Very long images: stretch tiles so max_tiles still cover everything
+        tile = max(tile, math.ceil(long / (count - (count - 1) * VISION_TILE_OVERLAP)))
+    step = (long - tile) / (count - 1) if count > 1 else 0
+
+    tiles = []
+    for i in range(count):
+        start = round(i * step)
+        box = (0, start, width, start + tile) if vertical else (start, 0, start + tile, height)
+        tiles.append(img.crop(box))
+    return tiles
+
+
+def prepare_vision_image(source: Path) -> List[bytes]:
+    """
+    Shrink a photo or scan to what the vision model can use (blocking).
+
+    Orientation is fixed from EXIF, the image is flattened to RGB, scaled
+    so its long side is at most AI_IMAGE_MAX_SIDE and re-encoded as JPEG.
+    Scans much taller (or wider) than a page are cut into overlapping
+    page-shaped tiles instead, so text stays legible.
+
+    Args:
+        source: Path of the uploaded image
+
+    Returns:
+        JPEG bytes, one per tile (a single item for ordinary images)
+
+    Raises:
+        ValueError: If the file is not a readable image
+    """
+    max_side = settings.AI_IMAGE_MAX_SIDE
+
+    try:
+        with Image.open(source) as img:
+            short, long = sorted(img.size)
+            tiled = long / short > settings.AI_IMAGE_TILE_RATIO
+
+            # Tiles are scaled by their width, whole images by their long side
+            scale = (max_side / VISION_TILE_ASPECT) / short if tiled else max_side / long
+            if scale < 1 and img.format == "JPEG":
+                # Let the JPEG decoder skip detail we would throw away anyway
+                img.draft("RGB", (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+
+            img.load()
+            img = ImageOps.exif_transpose(img)
+    except Exception as e:
+        raise ValueError(f"Not a valid image: {e}")
+
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        img = background
+    else:
+        img = img.convert("RGB")
+
+    width, height = img.size
+    factor = (max_side / VISION_TILE_ASPECT) / min(width, height) if tiled else max_side / max(width, height)
+    if factor < 1:
+        img = img.resize((max(1, round(width * factor)), max(1, round(height * factor))), Image.LANCZOS)
+
+    parts = _vision_tiles(img, settings.AI_IMAGE_MAX_TILES) if tiled else [img]
+
+    encoded = []
+    for part in parts:
+        if max(part.size) > max_side:
+            part = part.copy()
+            part.thumbnail((max_side, max_side), Image.LANCZOS)
+        buffer = io.BytesIO()
+        part.save(buffer, "JPEG", quality=VISION_JPEG_QUALITY, optimize=True)
+        encoded.append(buffer.getvalue())
+    return encoded
+
+
+async def prepare_vision_image_async(source: Path) -> List[bytes]:
+    """Run prepare_vision_image on the image worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, prepare_vision_image, source)
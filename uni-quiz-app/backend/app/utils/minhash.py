@@ -0,0 +1,112 @@
+"""
+MinHash utilities - Near-duplicate detection for question text.
+
+A question is normalized (case, accents, punctuation, option order) and cut
+into overlapping character shingles. Its MinHash signature estimates the
+Jaccard similarity of two shingle sets by the share of equal positions:
+
+    similarity(signature(a), signature(b)) ~ |A & B| / |A | B|
+
+For locality-sensitive hashing the signature is split into LSH_BANDS bands
+of LSH_ROWS values, each hashed to a 64-bit bucket. Two questions share at
+least one bucket with probability 1 - (1 - s^ROWS)^BANDS, so candidates are
+found by bucket equality (an index lookup) instead of comparing all pairs:
+
+    s = 0.5  ->  0.65      s = 0.7  ->  0.99      s = 0.8  ->  ~1.0
+"""
+import hashlib
+import re
+import struct
+import unicodedata
+import zlib
+from typing import Iterable, List, Optional
+
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+
+SHINGLE_SIZE = 5
+
+# Marks an empty bin before densification
+_EMPTY = -1
+# Fibonacci hashing constant, spreads CRC32 values over the bins
+_MIX = 0x9E3779B1
+
+_BAND_STRUCT = struct.Struct(f">H{LSH_ROWS}I")
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_question(question_text: str, options: Optional[Iterable] = None) -> str:
+    """
+    Normalize a question for comparison.
+
+    Option texts are sorted, so shuffled copies of a question still match.
+    Options may be dicts ({"id", "text"}), pydantic models or plain strings.
+    """
+    texts = []
+    for opt in options or []:
+        if isinstance(opt, dict):
+            texts.append(str(opt.get("text", "")))
+        else:
+            texts.append(str(getattr(opt, "text", opt)))
+
+    combined = " ".join([question_text or ""] + sorted(texts))
+    if not combined.isascii():
+        combined = unicodedata.normalize("NFKD", combined)
+        combined = "".join(ch for ch in combined if not unicodedata.combining(ch))
+    return _NON_WORD_RE.sub(" ", combined.lower()).strip()
+
+
+def _shingles(text: str) -> set:
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(question_text: str, options: Optional[Iterable] = None) -> List[int]:
+    """
+    Compute the MinHash signature (NUM_PERM integers) of a question.
+
+    Uses one-permutation hashing: every shingle is hashed once, the hash
+    picks one of NUM_PERM bins and the bin keeps its minimum, so the cost
+    is linear in the text length. Empty bins (short texts) borrow the value
+    of the next filled bin, which keeps equal-position estimates unbiased.
+    """
+    bins = [_EMPTY] * NUM_PERM
+    for shingle in _shingles(normalize_question(question_text, options)):
+        h = (zlib.crc32(shingle.encode()) * _MIX) & 0xFFFFFFFF
+        bin_, value = h % NUM_PERM, h >> 7  # 25 bits, leaves room for the offset
+        if bins[bin_] == _EMPTY or value < bins[bin_]:
+            bins[bin_] = value
+
+    # Densify by rotation; the offset keeps borrowed values distinct per bin
+    sig = list(bins)
+    for i in range(NUM_PERM):
+        if bins[i] != _EMPTY:
+            continue
+        for step in range(1, NUM_PERM):
+            source = bins[(i + step) % NUM_PERM]
+            if source != _EMPTY:
+                sig[i] = source + (step << 25)
+                break
+        else:
+            sig[i] = 0
+    return sig
+
+
+def lsh_buckets(sig: List[int]) -> List[int]:
+    """Hash each band of a signature to a signed 64-bit bucket id."""
+    buckets = []
+    for band in range(LSH_BANDS):
+        data = _BAND_STRUCT.pack(band, *sig[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+        digest = hashlib.blake2b(data, digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "big", signed=True))
+    return buckets
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not a or not b:
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
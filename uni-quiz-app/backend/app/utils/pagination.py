@@ -0,0 +1,141 @@
+"""
+Pagination utilities - Keyset cursors and fast row counts.
+
+List endpoints order rows by (created_at, id) descending. A cursor encodes
+the sort key of the last row on a page, so the next page is a single index
+range scan instead of an OFFSET that reads and discards every earlier row.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+# Values accepted by the `count` query parameter of list endpoints
+COUNT_MODE_PATTERN = "^(exact|estimate|none)$"
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper for a SELECT statement."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """
+    Encode a row's sort key as an opaque URL-safe cursor.
+
+    Args:
+        created_at: Row creation time
+        row_id: Row primary key
+
+    Returns:
+        Cursor string
+    """
+    raw = json.dumps([created_at.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def paginate(
+    query: Query,
+    model: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of a query ordered by (created_at, id) descending.
+
+    With a cursor the page starts right after the cursor row (keyset
+    pagination); without one, `skip` is applied as a plain offset so
+    existing clients keep working.
+
+    Args:
+        query: Filtered, unordered query
+        model: Model with `created_at` and `id` columns
+        limit: Page size
+        cursor: Cursor from a previous page's `next_cursor`
+        skip: Offset, only used when no cursor is given
+
+    Returns:
+        Tuple of (rows, next_cursor or None if this is the last page)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    elif skip:
+        query = query.offset(skip)
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, next_cursor
+
+
+def estimate_count(db: Session, query: Query) -> int:
+    """
+    Estimate a query's row count from the planner's statistics.
+
+    Runs EXPLAIN instead of COUNT(*), so the cost is constant regardless of
+    table size. Accuracy depends on how fresh ANALYZE statistics are.
+    """
+    statement = query.order_by(None).statement
+    plan = db.execute(_Explain(statement)).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(db: Session, query: Query, mode: str = "exact") -> Tuple[Optional[int], bool]:
+    """
+    Count a list query according to the requested mode.
+
+    Args:
+        db: Database session
+        query: Filtered, unordered query
+        mode: 'exact' (COUNT(*)), 'estimate' (planner estimate) or 'none'
+
+    Returns:
+        Tuple of (total or None, whether the total is an estimate)
+    """
+    if mode == "none":
+        return None, False
+    if mode == "estimate":
+        return estimate_count(db, query), True
+    return query.order_by(None).count(), False
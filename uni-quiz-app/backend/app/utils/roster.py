@@ -0,0 +1,219 @@
+"""
+Roster file reading (CSV / XLSX) for bulk enrollment.
+
+Rows are yielded one at a time: CSV is read line by line and XLSX through
+openpyxl's read-only mode, so a roster is never loaded as a whole.
+
+The first row is the header. Recognized columns (case-insensitive, spaces
+and dashes count as underscores):
+
+    telegram_id    telegram_id, tg_id, chat_id
+    username       username, telegram_username, tg_username, telegram
+    student_id     student_id, student_number, student_no, university_id
+    first_name     first_name, firstname, given_name
+    last_name      last_name, lastname, surname, family_name
+
+At least one of telegram_id, username or student_id is required. Values
+are checked against the students table's column limits: an out-of-range
+Telegram ID or an over-long student ID makes the row an error, names are
+cut to fit.
+"""
+import csv
+import re
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+ROSTER_TYPES = {
+    ".csv": "csv",
+    ".xlsx": "xlsx",
+}
+
+HEADER_ALIASES = {
+    "telegram_id": "telegram_id",
+    "tg_id": "telegram_id",
+    "chat_id": "telegram_id",
+    "username": "username",
+    "telegram_username": "username",
+    "tg_username": "username",
+    "telegram": "username",
+    "student_id": "student_id",
+    "student_number": "student_id",
+    "student_no": "student_id",
+    "university_id": "student_id",
+    "first_name": "first_name",
+    "firstname": "first_name",
+    "given_name": "first_name",
+    "last_name": "last_name",
+    "lastname": "last_name",
+    "surname": "last_name",
+    "family_name": "last_name",
+}
+
+IDENTIFIER_FIELDS = ("telegram_id", "username", "student_id")
+
+# Column limits of the students table
+MAX_TELEGRAM_ID = 2 ** 63 - 1  # BIGINT
+MAX_STUDENT_ID_LENGTH = 50
+MAX_NAME_LENGTH = 255
+
+_USERNAME_RE = re.compile(r"^(?:https?://)?(?:t\.me/|telegram\.me/)?@?([A-Za-z0-9_]{3,64})/?$")
+
+
+@dataclass
+class RosterRow:
+    """One roster line; identifiers are normalized, invalid ones are None."""
+    line: int
+    telegram_id: Optional[int] = None
+    username: Optional[str] = None  # Lowercase, without '@'
+    student_id: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    error: Optional[str] = None  # Set when the row cannot be used
+
+    @property
+    def label(self) -> str:
+        """The row's identifiers, for reporting."""
+        if self.telegram_id:
+            return str(self.telegram_id)
+        if self.username:
+            return f"@{self.username}"
+        return self.student_id or ""
+
+
+def roster_type(filename: str) -> Optional[str]:
+    """Get 'csv' or 'xlsx' from a filename, None if unsupported."""
+    return ROSTER_TYPES.get(Path(filename).suffix.lower())
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Excel stores numeric IDs as floats
+    return str(value).strip()
+
+
+def _header_map(header: Iterable) -> Dict[int, str]:
+    columns = {}
+    for index, name in enumerate(header):
+        key = re.sub(r"[\s\-]+", "_", _cell(name).lower())
+        field = HEADER_ALIASES.get(key)
+        if field and field not in columns.values():
+            columns[index] = field
+
+    if not any(field in columns.values() for field in IDENTIFIER_FIELDS):
+        raise ValueError("Roster header needs a telegram_id, username or student_id column")
+    return columns
+
+
+def _parse_row(line: int, cells: list, columns: Dict[int, str]) -> Optional[RosterRow]:
+    values = {
+        field: _cell(cells[index]) if index < len(cells) else ""
+        for index, field in columns.items()
+    }
+    if not any(values.get(field) for field in IDENTIFIER_FIELDS):
+        if any(values.values()):
+            return RosterRow(line=line, error="No Telegram ID, username or student ID")
+        return None  # Blank line
+
+    row = RosterRow(
+        line=line,
+        first_name=values.get("first_name", "")[:MAX_NAME_LENGTH] or None,
+        last_name=values.get("last_name", "")[:MAX_NAME_LENGTH] or None
+    )
+
+    raw_student_id = values.get("student_id")
+    if raw_student_id:
+        if len(raw_student_id) > MAX_STUDENT_ID_LENGTH:
+            row.error = f"Student ID longer than {MAX_STUDENT_ID_LENGTH} characters"
+        else:
+            row.student_id = raw_student_id
+
+    raw_id = values.get("telegram_id")
+    if raw_id:
+        try:
+            row.telegram_id = int(raw_id)
+        except ValueError:
+            row.telegram_id = None
+        if not row.telegram_id or not 0 < row.telegram_id <= MAX_TELEGRAM_ID:
+            row.telegram_id = None
+            row.error = f"Invalid Telegram ID: {raw_id[:32]}"
+
+    raw_username = values.get("username")
+    if raw_username:
+        match = _USERNAME_RE.match(raw_username)
+        if match:
+            row.username = match.group(1).lower()
+        elif not row.telegram_id and not row.student_id:
+            row.error = f"Invalid username: {raw_username[:64]}"
+
+    return row
+
+
+def _iter_csv(path: Path) -> Iterator[list]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+
+def _iter_xlsx(path: Path) -> Iterator[list]:
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(path, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile):
+        raise ValueError("Not a valid XLSX file")
+    try:
+        for values in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(values)
+    finally:
+        workbook.close()
+
+
+def iter_roster(path: Path, kind: str, max_rows: int) -> Iterator[RosterRow]:
+    """
+    Read a roster file row by row.
+
+    Args:
+        path: Roster file
+        kind: 'csv' or 'xlsx'
+        max_rows: Maximum data rows
+
+    Yields:
+        Non-blank rows after the header
+
+    Raises:
+        ValueError: If the file cannot be read, has no usable header or
+            has more than max_rows rows
+    """
+    reader = _iter_csv(path) if kind == "csv" else _iter_xlsx(path)
+
+    try:
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("Roster is empty")
+        columns = _header_map(header)
+
+        count = 0
+        for line, cells in enumerate(reader, start=2):
+            row = _parse_row(line, cells, columns)
+            if row is None:
+                continue
+            count += 1
+            if count > max_rows:
+                raise ValueError(f"Roster has more than {max_rows} rows")
+            yield row
+    except UnicodeDecodeError:
+        raise ValueError("CSV roster must be UTF-8 encoded")
+    except (csv.Error, OSError, KeyError, IndexError) as e:
+        raise ValueError(f"Could not read roster: {e}")
+    finally:
+        reader.close()
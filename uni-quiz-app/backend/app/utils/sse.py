@@ -0,0 +1,17 @@
+"""
+Server-Sent Events utilities.
+"""
+import json
+from typing import Any
+
+# Stop proxies (nginx) from buffering the stream and clients from caching it
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one SSE message with a JSON payload."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
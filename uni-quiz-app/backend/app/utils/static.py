@@ -0,0 +1,111 @@
+"""
+Static file serving for /uploads - Cache headers and proxy offload.
+
+Content-addressed files (see app.utils.file and app.utils.image) never
+change under a given URL, so they are served with a strong ETag derived
+from their name and `Cache-Control: immutable`. Anything else (legacy
+uploads) gets a short max-age and Starlette's stat-based ETag.
+
+With UPLOADS_OFFLOAD set, the worker only answers the conditional check
+and hands the byte transfer to the fronting proxy:
+
+    x-accel-redirect  nginx: internal location at UPLOADS_ACCEL_PREFIX
+    x-sendfile        Apache mod_xsendfile / lighttpd: absolute file path
+
+The proxy then also takes care of Range requests.
+"""
+import os
+import re
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.config import settings
+
+# <sha256>.<ext>, <sha256>_w<width>.<ext> or <sha256>_lqip.<ext>
+_CONTENT_NAME_RE = re.compile(r"^[0-9a-f]{64}(_w\d+|_lqip)?\.[a-z]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class UploadStaticFiles(StaticFiles):
+    """StaticFiles with long-lived caching and optional proxy offload."""
+
+    def __init__(
+        self,
+        *args,
+        offload: Optional[str] = None,
+        accel_prefix: str = "/protected-uploads/",
+        mutable_max_age: int = 3600,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.offload = offload or None
+        self.accel_prefix = accel_prefix.rstrip("/") + "/"
+        self.mutable_max_age = mutable_max_age
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        # Never expose in-progress uploads (.tmp/, *.part) or other dotfiles
+        parts = path.replace("\\", "/").split("/")
+        if any(p.startswith(".") for p in parts if p) or path.endswith(".part"):
+            raise HTTPException(status_code=404)
+
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        if _CONTENT_NAME_RE.match(name):
+            # Same name, same bytes: the name itself is a strong validator
+            response.headers["etag"] = f'"{os.path.splitext(name)[0]}"'
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["cache-control"] = f"public, max-age={self.mutable_max_age}"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        if self.offload:
+            return self._offload_response(full_path, response)
+
+        return response
+
+    def _offload_response(self, full_path, file_response: FileResponse) -> Response:
+        """Build an empty response telling the proxy which file to send."""
+        headers = {
+            key: value for key, value in file_response.headers.items()
+            if key in ("etag", "cache-control", "last-modified", "content-type")
+        }
+
+        if self.offload == "x-accel-redirect":
+            relative = os.path.relpath(full_path, os.path.realpath(self.directory))
+            headers["x-accel-redirect"] = self.accel_prefix + relative.replace(os.sep, "/")
+        else:
+            headers["x-sendfile"] = os.path.abspath(full_path)
+
+        # Let the proxy fill in Content-Length from the file it serves
+        response = Response(status_code=file_response.status_code, headers=headers)
+        del response.headers["content-length"]
+        return response
+
+
+def create_upload_app() -> UploadStaticFiles:
+    """Create the /uploads app from settings."""
+    return UploadStaticFiles(
+        directory=settings.UPLOAD_DIR,
+        offload=settings.UPLOADS_OFFLOAD,
+        accel_prefix=settings.UPLOADS_ACCEL_PREFIX,
+    )
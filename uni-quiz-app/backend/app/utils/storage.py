@@ -0,0 +1,281 @@
+"""
+Storage backends for uploaded files.
+
+Files are addressed by a key such as `images/ab/<sha256>.jpg`; the public
+URL of a key is always `/uploads/<key>`, whichever backend stores it.
+
+    local  Files under UPLOAD_DIR, served by /uploads (see app.utils.static)
+    s3     Any S3-compatible object store (AWS S3, MinIO, ...). /uploads
+           redirects to the object store and clients upload with presigned
+           POST forms, so image bytes never pass through the API workers.
+
+Both backends hand out the same kind of presigned upload (a multipart POST
+form), so the client code does not depend on the backend.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import mimetypes
+import shutil
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import aiofiles.os
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.utils.static import IMMUTABLE_CACHE_CONTROL
+
+
+def guess_content_type(key: str) -> str:
+    """Guess a key's MIME type from its extension."""
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+class StorageBackend(ABC):
+    """Interface shared by all storage backends."""
+
+    name = "base"
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def size(self, key: str) -> Optional[int]:
+        """Get an object's size in bytes, or None if it does not exist."""
+
+    @abstractmethod
+    async def stored_sha256(self, key: str) -> Optional[str]:
+        """
+        Get the hex SHA-256 the store verified when the object was uploaded.
+
+        Returns:
+            The digest, or None if the store kept none (callers then have
+            to read the object back to check it)
+        """
+
+    @abstractmethod
+    async def put_file(self, key: str, path: Path) -> None:
+        """Store a local file under key. The local file is consumed."""
+
+    @abstractmethod
+    async def get_file(self, key: str, dest: Path) -> None:
+        """Copy an object to a local file."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def presign_upload(self, key: str, content_type: str, max_bytes: int, sha256: str) -> dict:
+        """
+        Create a direct upload form for key.
+
+        Args:
+            key: Object key
+            content_type: MIME type the client will send
+            max_bytes: Maximum object size
+            sha256: Hex SHA-256 the contents must have, enforced by the
+                store where it supports upload checksums
+
+        Returns:
+            Dict with `method` ("POST"), `url` and form `fields`; the client
+            sends the fields followed by the file as `file` in a
+            multipart/form-data request.
+        """
+
+    @abstractmethod
+    def download_url(self, key: str) -> str:
+        """Get a URL the browser can fetch the object from directly."""
+
+
+class LocalStorage(StorageBackend):
+    """Files on the local disk under UPLOAD_DIR."""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    async def exists(self, key: str) -> bool:
+        return await aiofiles.os.path.exists(self.path(key))
+
+    async def size(self, key: str) -> Optional[int]:
+        try:
+            return (await aiofiles.os.stat(self.path(key))).st_size
+        except FileNotFoundError:
+            return None
+
+    async def stored_sha256(self, key: str) -> Optional[str]:
+        return None
+
+    async def put_file(self, key: str, path: Path) -> None:
+        target = self.path(key)
+        await aiofiles.os.makedirs(target.parent, exist_ok=True)
+        await aiofiles.os.replace(path, target)
+
+    async def get_file(self, key: str, dest: Path) -> None:
+        await run_in_threadpool(shutil.copyfile, self.path(key), dest)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await aiofiles.os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def presign_upload(self, key: str, content_type: str, max_bytes: int, sha256: str) -> dict:
+        # The upload route hashes the file while receiving it (see
+        # app.utils.file.receive_direct_upload)
+        expires = int(time.time()) + settings.STORAGE_PRESIGN_EXPIRE_SECONDS
+        return {
+            "method": "POST",
+            "url": "/api/uploads/direct",
+            "fields": {
+                "key": key,
+                "expires": str(expires),
+                "max_bytes": str(max_bytes),
+                "signature": sign_local_upload(key, expires, max_bytes),
+            },
+        }
+
+    def download_url(self, key: str) -> str:
+        return f"/uploads/{key}"
+
+
+class S3Storage(StorageBackend):
+    """Objects in an S3-compatible bucket."""
+
+    name = "s3"
+
+    def __init__(self):
+        # Optional dependency: only needed when STORAGE_BACKEND=s3
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the 'boto3' package")
+
+        if not settings.S3_BUCKET:
+            raise RuntimeError("S3_BUCKET not configured")
+
+        self.bucket = settings.S3_BUCKET
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION or None,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+            # Path-style addressing works with MinIO and other stand-ins
+            config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+        )
+
+    def _head(self, key: str) -> Optional[dict]:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key, ChecksumMode="ENABLED")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(self._head, key) is not None
+
+    async def size(self, key: str) -> Optional[int]:
+        head = await run_in_threadpool(self._head, key)
+        return head["ContentLength"] if head else None
+
+    async def stored_sha256(self, key: str) -> Optional[str]:
+        head = await run_in_threadpool(self._head, key)
+        checksum = head.get("ChecksumSHA256") if head else None
+        # Multipart objects carry a checksum of part checksums ("...-N")
+        if not checksum or "-" in checksum:
+            return None
+        try:
+            return base64.b64decode(checksum).hex()
+        except (binascii.Error, ValueError):
+            return None
+
+    async def put_file(self, key: str, path: Path) -> None:
+        await run_in_threadpool(
+            self.client.upload_file,
+            str(path),
+            self.bucket,
+            key,
+            ExtraArgs={
+                "ContentType": guess_content_type(key),
+                "CacheControl": IMMUTABLE_CACHE_CONTROL,
+            },
+        )
+        await aiofiles.os.remove(path)
+
+    async def get_file(self, key: str, dest: Path) -> None:
+        await run_in_threadpool(self.client.download_file, self.bucket, key, str(dest))
+
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+    def presign_upload(self, key: str, content_type: str, max_bytes: int, sha256: str) -> dict:
+        # The policy pins the key, content type and SHA-256 checksum and caps
+        # the size, so the store itself rejects anything else and keeps the
+        # checksum for stored_sha256
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={
+                "Content-Type": content_type,
+                "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+                "x-amz-checksum-algorithm": "SHA256",
+                "x-amz-checksum-sha256": checksum,
+            },
+            Conditions=[
+                {"Content-Type": content_type},
+                {"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+                {"x-amz-checksum-algorithm": "SHA256"},
+                {"x-amz-checksum-sha256": checksum},
+                ["content-length-range", 1, max_bytes],
+            ],
+            ExpiresIn=settings.STORAGE_PRESIGN_EXPIRE_SECONDS,
+        )
+        return {"method": "POST", "url": post["url"], "fields": post["fields"]}
+
+    def download_url(self, key: str) -> str:
+        if settings.S3_PUBLIC_URL:
+            return f"{settings.S3_PUBLIC_URL.rstrip('/')}/{key}"
+
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=settings.STORAGE_PRESIGN_EXPIRE_SECONDS,
+        )
+
+
+def sign_local_upload(key: str, expires: int, max_bytes: int) -> str:
+    """HMAC signature for a local direct upload form."""
+    message = f"{key}:{expires}:{max_bytes}".encode()
+    return hmac.new(settings.JWT_SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify_local_upload(key: str, expires: int, max_bytes: int, signature: str) -> bool:
+    """Check a local direct upload form's signature and expiry."""
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sign_local_upload(key, expires, max_bytes), signature)
+
+
+@lru_cache
+def get_storage() -> StorageBackend:
+    """Get the configured storage backend (created once per process)."""
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage()
+    return LocalStorage(settings.UPLOAD_DIR)
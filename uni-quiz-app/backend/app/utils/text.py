@@ -0,0 +1,58 @@
+"""
+Text utilities - Splitting long documents for AI generation.
+"""
+from typing import List
+
+# Preferred break points, best first
+_SEPARATORS = ("\n\n", "\n", ". ", "? ", "! ", " ")
+
+
+def split_text(text: str, chunk_size: int, overlap: int = 0) -> List[str]:
+    """
+    Split text into chunks of at most chunk_size characters.
+
+    Chunks end at the best natural break (paragraph, line, sentence, word)
+    in the last third of their window, and each chunk repeats the final
+    `overlap` characters of the previous one, so a passage cut at a
+    boundary is still seen whole by one chunk.
+
+    Args:
+        text: Text to split
+        chunk_size: Maximum chunk length in characters
+        overlap: Characters shared by consecutive chunks
+
+    Returns:
+        Non-empty chunks in document order
+    """
+    text = text.strip()
+    if len(text) <= chunk_size:
+        return [text] if text else []
+
+    overlap = min(overlap, chunk_size // 3)
+    chunks = []
+    start = 0
+
+    while start < len(text):
+        end = min(len(text), start + chunk_size)
+
+        if end < len(text):
+            window_start = start + chunk_size * 2 // 3
+            for separator in _SEPARATORS:
+                pos = text.rfind(separator, window_start, end)
+                if pos != -1:
+                    end = pos + len(separator)
+                    break
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+
+        if end >= len(text):
+            break
+
+        # Begin the overlap at a word boundary
+        next_start = end - overlap
+        space = text.find(" ", next_start, end)
+        start = max(start + 1, space + 1 if space != -1 else next_start)
+
+    return chunks
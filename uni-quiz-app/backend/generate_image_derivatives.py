@@ -0,0 +1,62 @@
+
+import hashlib
+import os
+import shutil
+import sys
+
+# Add backend directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.models import Question
+from app.utils.file import UPLOAD_DIR, content_path, _normalize_extension
+from app.utils.image import DERIVABLE_EXTENSIONS, generate_derivatives, derivative_url
+
+def migrate_question_images():
+    """Move legacy question images to content-addressed paths and build derivatives."""
+    db = SessionLocal()
+    try:
+        questions = db.query(Question).filter(Question.image_url.isnot(None)).all()
+        print(f"Found {len(questions)} questions with images.")
+
+        migrated = 0
+        generated = 0
+        for question in questions:
+            url = question.image_url
+            if not url.startswith("/uploads/"):
+                continue  # External link
+
+            ext = _normalize_extension(url)
+            if ext not in DERIVABLE_EXTENSIONS:
+                continue
+
+            source = UPLOAD_DIR / url[len("/uploads/"):]
+            if not source.exists():
+                print(f"Missing file for question {question.id}: {source}")
+                continue
+
+            if derivative_url(url, 0) == url:
+                # Legacy name: copy to its content-addressed path
+                digest = hashlib.sha256(source.read_bytes()).hexdigest()
+                target = content_path(digest, ext)
+                if not target.exists():
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(source, target)
+                question.image_url = "/uploads/" + target.relative_to(UPLOAD_DIR).as_posix()
+                source = target
+                migrated += 1
+
+            try:
+                generate_derivatives(source)
+                generated += 1
+            except ValueError as e:
+                print(f"Skipping question {question.id}: {e}")
+
+        db.commit()
+        print(f"Migrated {migrated} legacy images, processed {generated} images.")
+
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_question_images()
@@ -0,0 +1,34 @@
+import os
+import sys
+
+# Add backend directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.models import Question
+from app.services.duplicate_service import DuplicateService
+
+def index_existing_questions():
+    """Build the near-duplicate index for questions created before it existed."""
+    db = SessionLocal()
+    try:
+        instructor_ids = [
+            row.instructor_id for row in db.query(Question.instructor_id).filter(
+                Question.is_active == True,
+                Question.minhash.is_(None)
+            ).distinct()
+        ]
+        print(f"Found {len(instructor_ids)} instructors with unindexed questions.")
+
+        service = DuplicateService(db)
+        indexed = 0
+        for instructor_id in instructor_ids:
+            indexed += service.index_missing(instructor_id)
+
+        print(f"Indexed {indexed} questions.")
+
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    index_existing_questions()
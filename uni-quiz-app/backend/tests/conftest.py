@@ -0,0 +1,62 @@
+"""
+Test fixtures.
+
+Database tests run against a real PostgreSQL server: the services rely on
+JSONB, full-text search, ON CONFLICT and SKIP LOCKED, which nothing else
+emulates. Point TEST_DATABASE_URL at an empty, disposable database:
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/uni_quiz_test pytest
+
+It is migrated to head once per run (so the migrations are tested too) and
+every test runs in a transaction that is rolled back afterwards. Without
+TEST_DATABASE_URL the database tests are skipped.
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+
+# Before anything imports app.config: the app's engine must use the test database
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ.setdefault("DEBUG", "false")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """The app's engine, on the migrated test database."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    command.upgrade(config, "head")
+
+    from app.database import engine
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    """
+    A session whose commits only release savepoints; everything is rolled
+    back when the test ends.
+    """
+    from sqlalchemy.orm import Session
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
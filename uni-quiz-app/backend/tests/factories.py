@@ -0,0 +1,102 @@
+"""
+Minimal row builders for database tests. Each flushes and returns the row.
+"""
+import itertools
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Class, Enrollment, Instructor, Question, Quiz, QuizAttempt, QuizQuestionPool, Student, StudentAnswer
+)
+
+_sequence = itertools.count(1)
+
+
+def create_instructor(db: Session, **fields) -> Instructor:
+    n = next(_sequence)
+    instructor = Instructor(
+        email=f"instructor{n}@example.edu",
+        password_hash="x",
+        full_name=f"Instructor {n}",
+        **fields
+    )
+    db.add(instructor)
+    db.flush()
+    return instructor
+
+
+def create_class(db: Session, instructor: Instructor, **fields) -> Class:
+    class_ = Class(instructor_id=instructor.id, name=f"Class {next(_sequence)}", **fields)
+    db.add(class_)
+    db.flush()
+    return class_
+
+
+def create_student(db: Session, class_: Optional[Class] = None, **fields) -> Student:
+    n = next(_sequence)
+    fields.setdefault("telegram_id", 10_000_000 + n)
+    fields.setdefault("first_name", f"Student {n}")
+    student = Student(**fields)
+    db.add(student)
+    db.flush()
+    if class_ is not None:
+        db.add(Enrollment(student_id=student.id, class_id=class_.id))
+        db.flush()
+    return student
+
+
+def create_question(db: Session, instructor: Instructor, **fields) -> Question:
+    fields.setdefault("question_text", f"Question {next(_sequence)}")
+    fields.setdefault("question_type", "multiple_choice")
+    fields.setdefault("options", [{"id": "a", "text": "A"}, {"id": "b", "text": "B"}])
+    fields.setdefault("correct_answer", "a")
+    fields.setdefault("points", 1)
+    question = Question(instructor_id=instructor.id, **fields)
+    db.add(question)
+    db.flush()
+    return question
+
+
+def create_quiz(
+    db: Session,
+    class_: Class,
+    questions: List[Question],
+    **fields
+) -> Quiz:
+    fields.setdefault("title", f"Quiz {next(_sequence)}")
+    fields.setdefault("question_count", len(questions))
+    fields.setdefault("is_published", True)
+    fields.setdefault("randomize_questions", False)
+    fields.setdefault("max_attempts", 5)
+    quiz = Quiz(class_id=class_.id, instructor_id=class_.instructor_id, **fields)
+    db.add(quiz)
+    db.flush()
+    for question in questions:
+        db.add(QuizQuestionPool(quiz_id=quiz.id, question_id=question.id))
+    db.flush()
+    return quiz
+
+
+def create_attempt(
+    db: Session,
+    quiz: Quiz,
+    student: Student,
+    answers: Optional[Dict[Question, str]] = None,
+    **fields
+) -> QuizAttempt:
+    """An open attempt over the quiz's pool, with the given answers saved."""
+    pool = db.query(QuizQuestionPool.question_id).filter(QuizQuestionPool.quiz_id == quiz.id)
+    fields.setdefault("questions_order", [str(row.question_id) for row in pool])
+    attempt = QuizAttempt(quiz_id=quiz.id, student_id=student.id, **fields)
+    db.add(attempt)
+    db.flush()
+    for question, selected in (answers or {}).items():
+        db.add(StudentAnswer(
+            attempt_id=attempt.id,
+            question_id=question.id,
+            selected_answer=selected,
+            answered_at=attempt.started_at
+        ))
+    db.flush()
+    return attempt
@@ -0,0 +1,98 @@
+"""
+Attempt deadlines: the expired-attempt sweeper and submits after the deadline.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.config import settings
+from app.models import QuizStats, StudentAnswer
+from app.services.quiz_service import QuizService
+from tests.factories import (
+    create_attempt, create_class, create_instructor, create_question, create_quiz, create_student
+)
+
+
+@pytest.fixture
+def setup(db):
+    instructor = create_instructor(db)
+    class_ = create_class(db, instructor)
+    questions = [create_question(db, instructor, points=2), create_question(db, instructor, points=1)]
+    timed = create_quiz(db, class_, questions, time_limit_minutes=10)
+    return class_, questions, timed
+
+
+def _answer(db, attempt, question):
+    return db.query(StudentAnswer).filter(
+        StudentAnswer.attempt_id == attempt.id,
+        StudentAnswer.question_id == question.id
+    ).one()
+
+
+def test_sweeper_grades_expired_attempts(db, setup):
+    class_, (q1, q2), timed = setup
+    untimed = create_quiz(db, class_, [q1, q2])
+    now = datetime.utcnow()
+    started = now - timedelta(hours=1)
+
+    expired = create_attempt(db, timed, create_student(db, class_), {q1: "a", q2: "a"}, started_at=started)
+    # Saved well after the time limit ran out: earns nothing
+    _answer(db, expired, q2).answered_at = started + timedelta(minutes=20)
+    running = create_attempt(db, timed, create_student(db, class_), started_at=now - timedelta(minutes=1))
+    never_expires = create_attempt(db, untimed, create_student(db, class_), started_at=now - timedelta(days=2))
+    db.flush()
+
+    assert QuizService(db).finalize_expired_attempts(now, limit=100) == 1
+
+    db.refresh(expired)
+    assert expired.is_completed
+    assert (expired.total_points, expired.earned_points, expired.score) == (3, 2, Decimal("66.67"))
+    assert expired.submitted_at - expired.started_at == timedelta(minutes=10)
+    assert expired.time_spent_seconds == 600
+    assert (_answer(db, expired, q1).is_correct, _answer(db, expired, q1).points_earned) == (True, 2)
+    assert (_answer(db, expired, q2).is_correct, _answer(db, expired, q2).points_earned) == (False, 0)
+
+    db.refresh(running)
+    db.refresh(never_expires)
+    assert not running.is_completed
+    assert not never_expires.is_completed
+
+    stats = db.get(QuizStats, timed.id)
+    assert (stats.attempts_completed, stats.passed_count) == (1, 1)
+
+
+def test_answers_rejected_after_deadline_and_grace(db, setup):
+    class_, (q1, _), timed = setup
+    now = datetime.utcnow()
+    grace = timedelta(seconds=settings.ATTEMPT_GRACE_SECONDS)
+    service = QuizService(db)
+
+    in_grace = create_attempt(
+        db, timed, create_student(db, class_),
+        started_at=now - timedelta(minutes=10) - grace / 2
+    )
+    assert service.submit_answer(in_grace.id, q1.id, "a").selected_answer == "a"
+
+    too_late = create_attempt(
+        db, timed, create_student(db, class_),
+        started_at=now - timedelta(minutes=10) - grace - timedelta(seconds=5)
+    )
+    with pytest.raises(ValueError, match="Time is up"):
+        service.submit_answer(too_late.id, q1.id, "a")
+
+
+def test_late_submit_graded_like_the_sweeper(db, setup):
+    class_, (q1, q2), timed = setup
+    started = datetime.utcnow() - timedelta(hours=1)
+
+    attempt = create_attempt(db, timed, create_student(db, class_), {q1: "a", q2: "a"}, started_at=started)
+    _answer(db, attempt, q2).answered_at = started + timedelta(minutes=20)
+    db.flush()
+
+    attempt = QuizService(db).submit_quiz(attempt.id)
+
+    assert (attempt.total_points, attempt.earned_points) == (3, 2)
+    assert attempt.submitted_at - attempt.started_at == timedelta(minutes=10)
+    assert attempt.time_spent_seconds == 600
+    assert _answer(db, attempt, q2).points_earned == 0
@@ -0,0 +1,51 @@
+"""
+Webhook secret enforcement (no database needed).
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import bot
+from app.bot import webhook
+from app.config import settings
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(bot.router, prefix="/api/bot")
+    return TestClient(app)
+
+
+def test_webhook_rejects_everything_without_configured_secret(client, monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_WEBHOOK_SECRET", "")
+
+    assert client.post("/api/bot/webhook", json={"update_id": 1}).status_code == 403
+    response = client.post("/api/bot/webhook", json={"update_id": 1}, headers={SECRET_HEADER: ""})
+    assert response.status_code == 403
+
+
+def test_webhook_checks_secret_header(client, monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_WEBHOOK_SECRET", "s3cret")
+
+    assert client.post("/api/bot/webhook", json={"update_id": 1}).status_code == 403
+    response = client.post("/api/bot/webhook", json={"update_id": 1}, headers={SECRET_HEADER: "wrong"})
+    assert response.status_code == 403
+
+    # Past the secret check; the bot itself is not running here
+    response = client.post("/api/bot/webhook", json={"update_id": 1}, headers={SECRET_HEADER: "s3cret"})
+    assert response.status_code == 503
+
+
+@pytest.mark.parametrize("secret", ["", "has spaces", "x" * 257])
+def test_start_webhook_bot_requires_valid_secret(monkeypatch, secret):
+    monkeypatch.setattr(settings, "TELEGRAM_WEBHOOK_URL", "https://api.example.edu")
+    monkeypatch.setattr(settings, "TELEGRAM_WEBHOOK_SECRET", secret)
+
+    with pytest.raises(ValueError, match="TELEGRAM_WEBHOOK_SECRET"):
+        asyncio.run(webhook.start_webhook_bot())
+    assert webhook.get_application() is None
@@ -0,0 +1,90 @@
+"""
+Broadcast queue: quiz announcements, claim leases and delivery stats.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models import Broadcast, BroadcastMessage
+from app.services.broadcast_service import BroadcastService, SendResult
+from tests.factories import create_class, create_instructor, create_question, create_quiz, create_student
+
+
+def _class_with_students(db, count):
+    instructor = create_instructor(db)
+    class_ = create_class(db, instructor)
+    students = [create_student(db, class_) for _ in range(count)]
+    return instructor, class_, students
+
+
+def test_quiz_is_announced_once(db):
+    instructor, class_, _ = _class_with_students(db, 2)
+    quiz = create_quiz(db, class_, [create_question(db, instructor)])
+    service = BroadcastService(db)
+
+    broadcast = service.announce_quiz_published(quiz)
+    assert broadcast is not None
+    assert broadcast.kind == "quiz_published"
+    assert broadcast.total == 2
+
+    # Unpublished and published again
+    assert service.announce_quiz_published(quiz) is None
+    assert db.query(Broadcast).filter(Broadcast.quiz_id == quiz.id).count() == 1
+
+    # A concurrent publish that missed the check is stopped by the unique index
+    with pytest.raises(IntegrityError):
+        service.create_broadcast(instructor.id, class_.id, "Again", kind="quiz_published", quiz_id=quiz.id)
+    db.rollback()
+    assert db.query(Broadcast).filter(Broadcast.quiz_id == quiz.id).count() == 1
+
+
+def test_claim_leases_messages_until_the_lease_runs_out(db):
+    instructor, class_, students = _class_with_students(db, 3)
+    service = BroadcastService(db)
+    broadcast = service.create_broadcast(instructor.id, class_.id, "Hello")
+
+    claimed = service.claim_due(limit=2, lease_seconds=60)
+    assert len(claimed) == 2
+    assert all(m.attempts == 1 and m.text == "Hello" for m in claimed)
+    assert {m.chat_id for m in claimed} <= {s.telegram_id for s in students}
+
+    # Leased rows are not due; only the third message is left
+    remaining = service.claim_due(limit=10, lease_seconds=60)
+    assert len(remaining) == 1
+    assert remaining[0].id not in {m.id for m in claimed}
+    assert service.claim_due(limit=10, lease_seconds=60) == []
+
+    # A sender that died: its lease runs out and the rows are due again
+    db.query(BroadcastMessage).filter(
+        BroadcastMessage.broadcast_id == broadcast.id
+    ).update({"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)})
+    reclaimed = service.claim_due(limit=10, lease_seconds=60)
+    assert len(reclaimed) == 3
+    assert {m.attempts for m in reclaimed} == {2}
+
+
+def test_record_results_updates_stats_and_completes(db):
+    instructor, class_, _ = _class_with_students(db, 3)
+    service = BroadcastService(db)
+    broadcast = service.create_broadcast(instructor.id, class_.id, "Hello")
+    sent, failed, deferred = service.claim_due(limit=10, lease_seconds=60)
+
+    service.record_results([
+        SendResult(id=sent.id, broadcast_id=broadcast.id, outcome="sent"),
+        SendResult(id=failed.id, broadcast_id=broadcast.id, outcome="failed", error="Forbidden"),
+        SendResult(id=deferred.id, broadcast_id=broadcast.id, outcome="deferred", delay=0)
+    ])
+    db.refresh(broadcast)
+    assert (broadcast.sent, broadcast.failed, broadcast.pending) == (1, 1, 1)
+    assert broadcast.completed_at is None
+
+    # A deferred send is not counted as an attempt
+    retried, = service.claim_due(limit=10, lease_seconds=60)
+    assert retried.id == deferred.id
+    assert retried.attempts == 1
+
+    service.record_results([SendResult(id=retried.id, broadcast_id=broadcast.id, outcome="sent")])
+    db.refresh(broadcast)
+    assert (broadcast.sent, broadcast.failed, broadcast.pending) == (2, 1, 0)
+    assert broadcast.completed_at is not None
@@ -0,0 +1,19 @@
+"""
+Session helpers for async code.
+"""
+import asyncio
+import threading
+
+from sqlalchemy import text
+
+from app.database import run_in_session
+
+
+def test_run_in_session_stays_off_the_bot_pool(engine):
+    def probe(db):
+        return db.execute(text("SELECT 1")).scalar(), threading.current_thread().name
+
+    value, thread_name = asyncio.run(run_in_session(probe))
+
+    assert value == 1
+    assert not thread_name.startswith("bot-db")
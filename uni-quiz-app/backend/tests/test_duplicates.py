@@ -0,0 +1,47 @@
+"""
+Near-duplicate index: lookups are read-only; the backfill indexes old rows.
+"""
+import pytest
+from sqlalchemy import event
+
+from app.services.duplicate_service import DuplicateService
+from tests.factories import create_instructor, create_question
+
+TEXT = "What is the capital city of France and its largest metropolitan area?"
+OPTIONS = [{"id": "a", "text": "Paris"}, {"id": "b", "text": "Lyon"}]
+
+
+@pytest.fixture
+def commits(db):
+    """Count the commits made through the test session."""
+    count = []
+    listener = lambda session: count.append(1)
+    event.listen(db, "after_commit", listener)
+    yield count
+    event.remove(db, "after_commit", listener)
+
+
+def test_lookups_never_commit_or_backfill(db, commits):
+    instructor = create_instructor(db)
+    indexed = create_question(db, instructor, question_text=TEXT, options=OPTIONS)
+    create_question(db, instructor, question_text=TEXT, options=OPTIONS)  # Not indexed yet
+    service = DuplicateService(db)
+    service.index_questions([indexed])
+
+    matches = service.find_matches(instructor.id, [(TEXT, OPTIONS)])
+    assert [m.question_id for m in matches[0]] == [indexed.id]
+    assert service.clusters(instructor.id) == []
+    assert commits == []
+
+
+def test_backfill_indexes_existing_questions(db):
+    instructor = create_instructor(db)
+    questions = [create_question(db, instructor, question_text=TEXT, options=OPTIONS) for _ in range(2)]
+    service = DuplicateService(db)
+
+    assert service.index_missing(instructor.id) == 2
+    assert service.index_missing(instructor.id) == 0
+
+    (cluster, similarity), = service.clusters(instructor.id)
+    assert {q.id for q in cluster} == {q.id for q in questions}
+    assert similarity == 1.0
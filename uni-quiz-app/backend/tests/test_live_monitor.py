@@ -0,0 +1,49 @@
+"""
+Live monitor Postgres backend: LISTEN delivery and shutdown.
+"""
+import asyncio
+import uuid
+
+from sqlalchemy import text
+
+from app.services.live_monitor import NOTIFY_CHANNEL, PostgresBackend, broker
+
+
+def test_postgres_backend_delivers_committed_notifications(engine):
+    quiz_id = uuid.uuid4()
+
+    async def scenario():
+        backend = PostgresBackend()
+        broker.bind(asyncio.get_running_loop())
+        await backend.start()
+        try:
+            with broker.subscribe(quiz_id) as changed:
+                # Connecting wakes every subscriber once (changes may have been missed)
+                await asyncio.wait_for(changed.wait(), timeout=5)
+                changed.clear()
+
+                with engine.begin() as connection:
+                    connection.execute(
+                        text("SELECT pg_notify(:channel, :quiz_id)"),
+                        {"channel": NOTIFY_CHANNEL, "quiz_id": str(quiz_id)}
+                    )
+                await asyncio.wait_for(changed.wait(), timeout=5)
+        finally:
+            await backend.stop()
+            broker.bind(None)
+
+    asyncio.run(scenario())
+
+
+def test_stop_tolerates_a_failed_listener():
+    async def scenario():
+        async def fail():
+            raise RuntimeError("listener died")
+
+        backend = PostgresBackend()
+        backend._task = asyncio.create_task(fail())
+        await asyncio.sleep(0)
+        await backend.stop()
+        assert backend._task is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,49 @@
+"""
+Question bank search (QuestionService.search_questions).
+"""
+from app.services.question_service import QuestionService
+from tests.factories import create_instructor, create_question
+
+
+def test_search_counts_tags_and_skips_untagged_questions(db):
+    instructor = create_instructor(db)
+    create_question(db, instructor, question_text="Photosynthesis needs light", tags=["biology", "midterm"])
+    create_question(db, instructor, question_text="Cell division", tags=["biology"])
+    # Untagged: stored as the JSON scalar null, as the question API writes it
+    create_question(db, instructor, question_text="Untagged question", tags=None)
+    create_question(db, instructor, question_text="Empty tag list", tags=[])
+
+    hits, facets, total = QuestionService(db).search_questions(instructor.id)
+
+    assert total == 4
+    assert len(hits) == 4
+    assert facets == {"biology": 2, "midterm": 1}
+
+
+def test_search_ranks_text_matches_and_filters_by_tags(db):
+    instructor = create_instructor(db)
+    match = create_question(db, instructor, question_text="Photosynthesis in plants", tags=["biology"])
+    create_question(db, instructor, question_text="Photosynthesis quiz", tags=None)
+    create_question(db, instructor, question_text="Newton's laws", tags=["physics"])
+
+    service = QuestionService(db)
+
+    hits, facets, total = service.search_questions(instructor.id, text="photosynthesis")
+    assert total == 2
+    assert all(rank > 0 for _, rank in hits)
+    assert facets == {"biology": 1}
+
+    hits, facets, total = service.search_questions(instructor.id, text="photosynthesis", tags=["biology"])
+    assert [question.id for question, _ in hits] == [match.id]
+    assert total == 1
+
+
+def test_search_only_sees_own_active_questions(db):
+    instructor = create_instructor(db)
+    other = create_instructor(db)
+    create_question(db, other, question_text="Someone else's question", tags=["biology"])
+    create_question(db, instructor, question_text="Retired question", tags=["biology"], is_active=False)
+
+    hits, facets, total = QuestionService(db).search_questions(instructor.id)
+
+    assert (hits, facets, total) == ([], {}, 0)
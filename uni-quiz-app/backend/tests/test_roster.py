@@ -0,0 +1,60 @@
+"""
+Roster parsing limits and the set-based roster import.
+"""
+from app.models import Enrollment, Student
+from app.services.roster_service import RosterService
+from app.utils.roster import MAX_NAME_LENGTH, MAX_TELEGRAM_ID, iter_roster
+from tests.factories import create_class, create_instructor, create_student
+
+
+def _read(tmp_path, text):
+    path = tmp_path / "roster.csv"
+    path.write_text(text, encoding="utf-8")
+    return list(iter_roster(path, "csv", max_rows=100))
+
+
+def test_rows_outside_column_limits(tmp_path):
+    long_name = "N" * 300
+    rows = _read(tmp_path, "\n".join([
+        "telegram_id,student_id,first_name",
+        f"{MAX_TELEGRAM_ID},S1,Ann",
+        f"{MAX_TELEGRAM_ID + 1},S2,Bob",
+        "-5,S3,Cy",
+        f",{'9' * 51},Dee",
+        f"42,S5,{long_name}",
+    ]))
+
+    assert [row.error is None for row in rows] == [True, False, False, False, True]
+    assert rows[0].telegram_id == MAX_TELEGRAM_ID
+    assert rows[1].telegram_id is None and "Invalid Telegram ID" in rows[1].error
+    assert rows[3].student_id is None and "Student ID" in rows[3].error
+    assert rows[4].first_name == long_name[:MAX_NAME_LENGTH]
+
+
+def test_import_reports_invalid_rows_and_upserts(db, tmp_path):
+    instructor = create_instructor(db)
+    class_ = create_class(db, instructor)
+    existing = create_student(db, telegram_username="known_user", first_name="Kept")
+
+    rows = _read(tmp_path, "\n".join([
+        "telegram_id,username,student_id,first_name",
+        f"{existing.telegram_id},,U-1,Ignored",
+        f"555000111,,U-2,{'L' * 300}",
+        f"{MAX_TELEGRAM_ID + 1},,U-3,Huge",
+        ",known_user,,",  # Same student as the first row
+        ",nobody_here,,",
+    ]))
+    summary = RosterService(db).import_roster(class_.id, rows)
+
+    assert (summary.total, summary.matched, summary.created) == (5, 1, 1)
+    assert summary.enrolled == 2
+    assert summary.already_enrolled == 0
+    assert sorted(u.line for u in summary.unresolved) == [4, 5, 6]
+
+    db.refresh(existing)
+    assert existing.student_id == "U-1"  # Roster sets the university ID
+    assert existing.first_name == "Kept"  # but keeps the Telegram profile name
+
+    created = db.query(Student).filter(Student.telegram_id == 555000111).one()
+    assert len(created.first_name) == MAX_NAME_LENGTH
+    assert db.query(Enrollment).filter(Enrollment.class_id == class_.id).count() == 2
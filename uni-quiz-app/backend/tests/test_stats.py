@@ -0,0 +1,133 @@
+"""
+Incremental quiz statistics: deltas, rebuild and the results export summary.
+"""
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from openpyxl import load_workbook
+from sqlalchemy.orm import Session
+
+from app.models import Instructor, QuizAttempt, QuizStats, Student
+from app.services.stats_service import StatsService
+from app.utils.excel import create_quiz_results_excel
+from tests.factories import (
+    create_attempt, create_class, create_instructor, create_question, create_quiz, create_student
+)
+
+
+def _quiz_with_attempts(db, scores, **quiz_fields):
+    instructor = create_instructor(db)
+    class_ = create_class(db, instructor)
+    quiz = create_quiz(db, class_, [create_question(db, instructor)], **quiz_fields)
+    attempts = [
+        create_attempt(
+            db, quiz, create_student(db, class_),
+            is_completed=True, score=Decimal(score), time_spent_seconds=seconds
+        )
+        for score, seconds in scores
+    ]
+    return quiz, attempts
+
+
+def test_deltas(db):
+    quiz, attempts = _quiz_with_attempts(db, [(50, 100), (90, 300)], passing_score=60)
+    service = StatsService(db)
+    for _ in range(3):
+        service.record_started(quiz.id)
+    service.add_attempts([attempt.id for attempt in attempts])
+
+    stats = service.get_stats(quiz.id)
+    assert (stats["attempts_started"], stats["attempts_completed"], stats["in_progress"]) == (3, 2, 1)
+    assert (stats["passed_count"], stats["pass_rate"]) == (1, 50)
+    assert (stats["average_score"], stats["score_stddev"]) == (70, 20)
+    assert stats["average_time_seconds"] == 200
+    assert stats["histogram"] == [0, 0, 0, 0, 0, 1, 0, 0, 0, 1]
+
+    # Taken back out, as before a regrade
+    service.add_attempts([attempts[1].id], sign=-1)
+    stats = service.get_stats(quiz.id)
+    assert (stats["attempts_completed"], stats["passed_count"], stats["average_score"]) == (1, 0, 50)
+
+
+def test_rebuild(db):
+    quiz, attempts = _quiz_with_attempts(db, [(50, 100), (90, 300)], passing_score=60)
+    service = StatsService(db)
+    service.add_attempts([attempt.id for attempt in attempts])
+
+    quiz.passing_score = 40
+    db.flush()
+    service.rebuild(quiz.id)
+    db.expire_all()
+    assert service.get_stats(quiz.id)["passed_count"] == 2
+
+    # Creates the row of a quiz nothing was counted for yet
+    empty, _ = _quiz_with_attempts(db, [])
+    assert db.get(QuizStats, empty.id) is None
+    service.rebuild(empty.id)
+    stats = service.get_stats(empty.id)
+    assert (stats["attempts_started"], stats["average_score"]) == (0, None)
+    assert db.get(QuizStats, empty.id) is not None
+
+
+def test_rebuild_does_not_lose_a_concurrent_submit(engine):
+    with Session(engine) as setup:
+        quiz, (attempt,) = _quiz_with_attempts(setup, [(80, 60)])
+        attempt.is_completed = False
+        quiz_id, attempt_id, instructor_id = quiz.id, attempt.id, quiz.instructor_id
+        student_id = attempt.student_id
+        StatsService(setup).record_started(quiz_id)
+        setup.commit()
+
+    submitting = Session(engine)
+    try:
+        # A submit, holding the stats row until it commits
+        submitting.get(QuizAttempt, attempt_id).is_completed = True
+        submitting.flush()
+        StatsService(submitting).add_attempts([attempt_id])
+
+        def rebuild():
+            with Session(engine) as rebuilding:
+                StatsService(rebuilding).rebuild(quiz_id)
+                rebuilding.commit()
+
+        thread = threading.Thread(target=rebuild)
+        thread.start()
+        time.sleep(0.3)  # Let the rebuild block on the submit
+        submitting.commit()
+        thread.join(timeout=10)
+
+        with Session(engine) as check:
+            stats = check.get(QuizStats, quiz_id)
+            assert (stats.attempts_started, stats.attempts_completed) == (1, 1)
+    finally:
+        submitting.close()
+        with Session(engine) as cleanup:
+            cleanup.delete(cleanup.get(Instructor, instructor_id))
+            cleanup.delete(cleanup.get(Student, student_id))
+            cleanup.commit()
+
+
+def test_export_summary_comes_from_stats():
+    stats = StatsService.summarize(uuid.uuid4(), QuizStats(
+        attempts_started=5,
+        attempts_completed=4,
+        passed_count=3,
+        score_sum=Decimal(300),
+        score_sq_sum=Decimal(24000),
+        time_spent_sum=400,
+        histogram=[0] * 10
+    ))
+    results = [{"student_name": "Ann", "score": 100, "passed": True}]
+
+    workbook = load_workbook(create_quiz_results_excel("Quiz", "Class", results, stats))
+    summary = [row[0] for row in workbook["Quiz Results"].iter_rows(min_row=9, max_row=13, values_only=True)]
+
+    assert summary == [
+        "Completed Attempts: 4",
+        "Passed: 3",
+        "Failed: 1",
+        "Average Score: 75.00%",
+        "Pass Rate: 75.0%",
+    ]
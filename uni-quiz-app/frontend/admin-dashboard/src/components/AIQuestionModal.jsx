@@ -2,12 +2,15 @@ import React, { useState } from 'react'
 import { questionsApi } from '../services/api'
 import { X, Upload, FileText, Image as ImageIcon, Sparkles, Loader } from 'lucide-react'
 
+const isDocument = (file) => /\.(pdf|docx)$/i.test(file.name)
+
 const AIQuestionModal = ({ isOpen, onClose, onQuestionsGenerated, showToast }) => {
     const [activeTab, setActiveTab] = useState('text')
     const [textInput, setTextInput] = useState('')
     const [selectedImage, setSelectedImage] = useState(null)
     const [isLoading, setIsLoading] = useState(false)
     const [questionCount, setQuestionCount] = useState(5)
+    const [progress, setProgress] = useState(null)
 
     if (!isOpen) return null
 
@@ -19,8 +22,17 @@ const AIQuestionModal = ({ isOpen, onClose, onQuestionsGenerated, showToast }) =
 
         setIsLoading(true)
         try {
-            const response = await questionsApi.generateFromText(textInput, questionCount)
-            onQuestionsGenerated(response.data)
+            // Long texts are processed in chunks; questions arrive as each chunk finishes
+            const questions = []
+            let streamError = null
+            await questionsApi.streamFromText(textInput, questionCount, (event, data) => {
+                if (event === 'question') questions.push(data)
+                if (event === 'progress') setProgress(data)
+                if (event === 'error') streamError = data.detail
+            })
+            if (streamError && questions.length === 0) throw new Error(streamError)
+
+            onQuestionsGenerated(questions)
             onClose()
             showToast('Questions generated successfully!', 'success')
         } catch (error) {
@@ -28,6 +40,7 @@ const AIQuestionModal = ({ isOpen, onClose, onQuestionsGenerated, showToast }) =
             showToast('Failed to generate questions. Please try again.', 'error')
         } finally {
             setIsLoading(false)
+            setProgress(null)
         }
     }
 
@@ -39,6 +52,22 @@ const AIQuestionModal = ({ isOpen, onClose, onQuestionsGenerated, showToast }) =
 
         setIsLoading(true)
         try {
+            if (isDocument(selectedImage)) {
+                // PDF/DOCX: processed page range by page range, streamed back
+                const questions = []
+                let streamError = null
+                await questionsApi.streamFromDocument(selectedImage, questionCount, (event, data) => {
+                    if (event === 'question') questions.push(data)
+                    if (event === 'progress') setProgress(data)
+                    if (event === 'error') streamError = data.detail
+                })
+                if (streamError && questions.length === 0) throw new Error(streamError)
+                onQuestionsGenerated(questions)
+                onClose()
+                showToast('Questions generated successfully!', 'success')
+                return
+            }
+
             const response = await questionsApi.generateFromImage(selectedImage)
             onQuestionsGenerated(response.data)
             onClose()
@@ -48,6 +77,7 @@ const AIQuestionModal = ({ isOpen, onClose, onQuestionsGenerated, showToast }) =
             showToast('Failed to generate questions', 'error')
         } finally {
             setIsLoading(false)
+            setProgress(null)
         }
     }
 
@@ -91,7 +121,7 @@ const AIQuestionModal = ({ isOpen, onClose, onQuestionsGenerated, showToast }) =
                         onClick={() => setActiveTab('image')}
                     >
                         <ImageIcon className="w-5 h-5" />
-                        From Image
+                        From File
                     </button>
                 </div>
 
@@ -129,10 +159,10 @@ const AIQuestionModal = ({ isOpen, onClose, onQuestionsGenerated, showToast }) =
                             <div className="relative border-2 border-dashed border-gray-300 rounded-xl p-8 flex flex-col items-center justify-center text-center hover:border-indigo-500 transition-colors bg-gray-50">
                                 <Upload className="w-12 h-12 text-gray-400 mb-4" />
                                 <p className="text-gray-600 mb-2">Click to upload or drag and drop</p>
-                                <p className="text-xs text-gray-400">JPG, PNG, WEBP up to 5MB</p>
+                                <p className="text-xs text-gray-400">JPG, PNG, WEBP images or PDF, DOCX documents</p>
                                 <input
                                     type="file"
-                                    accept="image/*"
+                                    accept="image/*,.pdf,.docx"
                                     className="absolute inset-0 w-full h-full opacity-0 cursor-pointer"
                                     onChange={handleImageChange}
                                 />
@@ -170,7 +200,9 @@ const AIQuestionModal = ({ isOpen, onClose, onQuestionsGenerated, showToast }) =
                         {isLoading ? (
                             <>
                                 <Loader className="w-4 h-4 animate-spin" />
-                                Generating...
+                                {progress && progress.chunks_total > 1
+                                    ? `Generating... (${progress.chunks_done}/${progress.chunks_total})`
+                                    : 'Generating...'}
                             </>
                         ) : (
                             <>
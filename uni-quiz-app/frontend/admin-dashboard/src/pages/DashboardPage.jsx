@@ -1,6 +1,6 @@
 import { useQuery } from '@tanstack/react-query'
 import { Link } from 'react-router-dom'
-import { classesApi, quizzesApi, questionsApi } from '../services/api'
+import { classesApi, quizzesApi, questionsApi, dashboardApi } from '../services/api'
 import { useAuthStore } from '../store/authStore'
 import {
     Users,
@@ -9,9 +9,27 @@ import {
     TrendingUp,
     Plus,
     ArrowRight,
-    BookOpen
+    BookOpen,
+    BarChart3
 } from 'lucide-react'
 
+// Score histogram of a quiz, one bar per bucket
+function ScoreHistogram({ histogram, bucketWidth }) {
+    const max = Math.max(1, ...histogram)
+    return (
+        <div className="flex items-end gap-0.5 h-10 w-32">
+            {histogram.map((count, i) => (
+                <div
+                    key={i}
+                    title={`${i * bucketWidth}-${(i + 1) * bucketWidth}%: ${count}`}
+                    className="flex-1 bg-primary-500 rounded-sm"
+                    style={{ height: `${Math.max(4, (count / max) * 100)}%`, opacity: count ? 1 : 0.2 }}
+                />
+            ))}
+        </div>
+    )
+}
+
 export default function DashboardPage() {
     const { user } = useAuthStore()
 
@@ -31,6 +49,13 @@ export default function DashboardPage() {
         queryFn: () => questionsApi.getAll({ limit: 1 }),
     })
 
+    // Precomputed on the server: cheap regardless of the number of attempts
+    const { data: statsData } = useQuery({
+        queryKey: ['dashboard-stats'],
+        queryFn: () => dashboardApi.getStats({ limit: 5 }),
+        refetchInterval: 30000,
+    })
+
     const stats = [
         {
             label: 'Total Classes',
@@ -170,6 +195,46 @@ export default function DashboardPage() {
                     </div>
                 </div>
             </div>
+
+            {/* Quiz Performance */}
+            {statsData?.data?.quizzes?.length > 0 && (
+                <div className="bg-white rounded-xl border border-dark-100 overflow-hidden">
+                    <div className="flex items-center gap-2 p-6 border-b border-dark-100">
+                        <BarChart3 className="w-5 h-5 text-primary-600" />
+                        <h2 className="text-lg font-semibold text-dark-900">Quiz Performance</h2>
+                    </div>
+                    <div className="divide-y divide-dark-100">
+                        {statsData.data.quizzes.map((stats) => (
+                            <Link
+                                key={stats.quiz_id}
+                                to={`/quizzes/${stats.quiz_id}`}
+                                className="flex items-center justify-between gap-4 p-4 hover:bg-dark-50 transition-colors"
+                            >
+                                <div className="min-w-0 flex-1">
+                                    <p className="font-medium text-dark-900 truncate">{stats.title}</p>
+                                    <p className="text-sm text-dark-500">
+                                        {stats.attempts_completed} completed
+                                        {stats.in_progress > 0 && ` · ${stats.in_progress} in progress`}
+                                    </p>
+                                </div>
+                                <div className="text-right w-24">
+                                    <p className="font-semibold text-dark-900">
+                                        {stats.average_score != null ? `${stats.average_score.toFixed(1)}%` : '—'}
+                                    </p>
+                                    <p className="text-xs text-dark-500">average</p>
+                                </div>
+                                <div className="text-right w-24">
+                                    <p className="font-semibold text-dark-900">
+                                        {stats.pass_rate != null ? `${stats.pass_rate.toFixed(0)}%` : '—'}
+                                    </p>
+                                    <p className="text-xs text-dark-500">passed</p>
+                                </div>
+                                <ScoreHistogram histogram={stats.histogram} bucketWidth={stats.bucket_width} />
+                            </Link>
+                        ))}
+                    </div>
+                </div>
+            )}
         </div>
     )
 }
@@ -1,14 +1,16 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { useParams, Link } from 'react-router-dom'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { quizzesApi, questionsApi } from '../services/api'
-import { ArrowLeft, Plus, FileQuestion, Clock, Users, Check, Download, Trash2 } from 'lucide-react'
+import { ArrowLeft, Plus, FileQuestion, Clock, Users, Check, Download, Trash2, Radio } from 'lucide-react'
 import toast from 'react-hot-toast'
 
 export default function QuizDetailPage() {
     const { id } = useParams()
     const [showAddQuestions, setShowAddQuestions] = useState(false)
     const [selectedQuestions, setSelectedQuestions] = useState([])
+    const [live, setLive] = useState(null)
+    const [liveStatus, setLiveStatus] = useState('connected')
     const queryClient = useQueryClient()
 
     const { data: quizData, isLoading } = useQuery({
@@ -16,6 +18,19 @@ export default function QuizDetailPage() {
         queryFn: () => quizzesApi.getById(id),
     })
 
+    const isPublished = quizData?.data?.is_published
+
+    // Live counters pushed by the server while the quiz is published;
+    // the stream reconnects by itself, the panel shows when it is stale
+    useEffect(() => {
+        if (!isPublished) return
+        const controller = new AbortController()
+        quizzesApi.watchLive(id, (event, data) => {
+            if (event === 'stats') setLive(data)
+        }, controller.signal, setLiveStatus)
+        return () => controller.abort()
+    }, [id, isPublished])
+
     const { data: resultsData } = useQuery({
         queryKey: ['quiz-results', id],
         queryFn: () => quizzesApi.getResults(id),
@@ -114,6 +129,41 @@ export default function QuizDetailPage() {
                 </div>
             </div>
 
+            {/* Live */}
+            {live && (
+                <div className="bg-white rounded-xl border border-dark-100 p-6">
+                    <h2 className="text-lg font-semibold text-dark-900 flex items-center gap-2 mb-4">
+                        <Radio className={`w-5 h-5 ${liveStatus === 'connected' ? 'text-green-500' : 'text-dark-400'}`} /> Live
+                        {liveStatus === 'reconnecting' && (
+                            <span className="text-sm font-normal text-amber-700">Reconnecting…</span>
+                        )}
+                        {liveStatus === 'disconnected' && (
+                            <span className="text-sm font-normal text-red-600">Disconnected, reload to retry</span>
+                        )}
+                    </h2>
+                    <div className={`grid grid-cols-2 md:grid-cols-4 gap-4 ${liveStatus === 'connected' ? '' : 'opacity-50'}`}>
+                        <div className="bg-dark-50 rounded-lg p-4">
+                            <p className="text-sm text-dark-500">Started</p>
+                            <p className="text-2xl font-bold text-dark-900">{live.attempts_started}</p>
+                        </div>
+                        <div className="bg-dark-50 rounded-lg p-4">
+                            <p className="text-sm text-dark-500">In Progress</p>
+                            <p className="text-2xl font-bold text-dark-900">{live.in_progress}</p>
+                        </div>
+                        <div className="bg-dark-50 rounded-lg p-4">
+                            <p className="text-sm text-dark-500">Submitted</p>
+                            <p className="text-2xl font-bold text-dark-900">{live.attempts_completed}</p>
+                        </div>
+                        <div className="bg-dark-50 rounded-lg p-4">
+                            <p className="text-sm text-dark-500">Average Score</p>
+                            <p className="text-2xl font-bold text-dark-900">
+                                {live.average_score != null ? `${live.average_score.toFixed(1)}%` : '-'}
+                            </p>
+                        </div>
+                    </div>
+                </div>
+            )}
+
             {/* Results */}
             <div className="bg-white rounded-xl border border-dark-100 overflow-hidden">
                 <div className="p-6 border-b border-dark-100">
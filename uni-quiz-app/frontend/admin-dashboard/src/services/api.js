@@ -55,6 +55,108 @@ api.interceptors.response.use(
 
 export default api
 
+// Server-Sent Events over fetch (EventSource cannot POST)
+const postForEventStream = async (url, body, headers = {}) => {
+    const { accessToken } = useAuthStore.getState()
+    const response = await fetch(`/api${url}`, {
+        method: 'POST',
+        headers: { ...headers, Authorization: `Bearer ${accessToken}` },
+        body,
+    })
+    if (!response.ok) {
+        const error = await response.json().catch(() => ({}))
+        throw new Error(error.detail || `Request failed with status ${response.status}`)
+    }
+    return response
+}
+
+// Long-lived GET event stream; abort the signal to close it. Plain fetch
+// skips the axios interceptors, so an expired token is refreshed here
+const getEventStream = async (url, signal) => {
+    const open = () => fetch(`/api${url}`, {
+        headers: { Authorization: `Bearer ${useAuthStore.getState().accessToken}` },
+        signal,
+    })
+
+    let response = await open()
+    if (response.status === 401) {
+        if (!(await useAuthStore.getState().refreshAccessToken())) {
+            window.location.href = '/login'
+        }
+        response = await open()
+    }
+    if (!response.ok) {
+        const body = await response.json().catch(() => ({}))
+        const error = new Error(body.detail || `Request failed with status ${response.status}`)
+        error.status = response.status
+        throw error
+    }
+    return response
+}
+
+// Reconnect delays of watchEventStream: doubling from min to max
+const STREAM_RETRY_MIN_MS = 1000
+const STREAM_RETRY_MAX_MS = 30000
+
+const sleep = (ms, signal) => new Promise((resolve) => {
+    const timer = setTimeout(resolve, ms)
+    signal.addEventListener('abort', () => {
+        clearTimeout(timer)
+        resolve()
+    }, { once: true })
+})
+
+// Keeps an event stream open until the signal is aborted, reconnecting with
+// backoff when it drops (proxy timeout, deploy, network). onStatus gets
+// 'connected', 'reconnecting' or 'disconnected' (gave up: the request
+// itself was refused, e.g. quiz deleted or access lost)
+const watchEventStream = async (url, onEvent, signal, onStatus = () => {}) => {
+    let delay = STREAM_RETRY_MIN_MS
+    while (!signal.aborted) {
+        try {
+            const response = await getEventStream(url, signal)
+            onStatus('connected')
+            await readEventStream(response, (event, data) => {
+                delay = STREAM_RETRY_MIN_MS
+                onEvent(event, data)
+            })
+        } catch (error) {
+            if (signal.aborted) return
+            if (error.status >= 400 && error.status < 500 && error.status !== 429) {
+                onStatus('disconnected')
+                return
+            }
+        }
+        if (signal.aborted) return
+
+        onStatus('reconnecting')
+        await sleep(delay, signal)
+        delay = Math.min(delay * 2, STREAM_RETRY_MAX_MS)
+    }
+}
+
+// Calls onEvent(event, data) for each message of an SSE response
+const readEventStream = async (response, onEvent) => {
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    for (;;) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+
+        let boundary
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const message = buffer.slice(0, boundary)
+            buffer = buffer.slice(boundary + 2)
+
+            const event = message.match(/^event: (.*)$/m)?.[1]
+            const data = message.match(/^data: (.*)$/m)?.[1]
+            if (event && data) onEvent(event, JSON.parse(data))
+        }
+    }
+}
+
 // API helper functions
 export const classesApi = {
     getAll: (params) => api.get('/instructor/classes', { params }),
@@ -83,7 +185,22 @@ export const questionsApi = {
     update: (id, data) => api.put(`/instructor/questions/${id}`, data),
     delete: (id) => api.delete(`/instructor/questions/${id}`),
     bulkImport: (data) => api.post('/instructor/questions/bulk', data),
+    search: (params) => api.get('/instructor/questions/search', { params }),
+    exportBank: (params) => api.get('/instructor/questions/export', { params, responseType: 'blob' }),
     generateFromText: (text, count) => api.post('/instructor/ai/generate-text', { text, count }),
+    streamFromText: async (text, count, onEvent) => {
+        const response = await postForEventStream('/instructor/ai/generate-text/stream', JSON.stringify({ text, count }), {
+            'Content-Type': 'application/json',
+        })
+        await readEventStream(response, onEvent)
+    },
+    streamFromDocument: async (file, count, onEvent) => {
+        const formData = new FormData()
+        formData.append('file', file)
+        formData.append('count', count)
+        const response = await postForEventStream('/instructor/ai/generate-document', formData)
+        await readEventStream(response, onEvent)
+    },
     generateFromImage: (file) => {
         const formData = new FormData()
         formData.append('file', file)
@@ -103,4 +220,11 @@ export const quizzesApi = {
     addQuestions: (id, questionIds) => api.post(`/instructor/quizzes/${id}/add-questions`, { question_ids: questionIds }),
     getResults: (id) => api.get(`/instructor/quizzes/${id}/results`),
     exportResults: (id) => api.get(`/instructor/quizzes/${id}/export`, { responseType: 'blob' }),
+    getStats: (id) => api.get(`/instructor/quizzes/${id}/stats`),
+    watchLive: (id, onEvent, signal, onStatus) =>
+        watchEventStream(`/instructor/quizzes/${id}/live`, onEvent, signal, onStatus),
+}
+
+export const dashboardApi = {
+    getStats: (params) => api.get('/instructor/dashboard/stats', { params }),
 }
@@ -60,9 +60,14 @@ BACKEND_PID=$!
 # ----------------------------------------------------------------
 # 2. Telegram Bot
 # ----------------------------------------------------------------
-echo -e "\n${GREEN}[2/4] Starting Telegram Bot...${NC}"
-python run_bot.py &
-BOT_PID=$!
+# In webhook mode (BOT_MODE=webhook) the API process runs the bot itself
+if grep -qs "^BOT_MODE=webhook" .env; then
+    echo -e "\n${GREEN}[2/4] Telegram Bot runs inside the backend (webhook mode)${NC}"
+else
+    echo -e "\n${GREEN}[2/4] Starting Telegram Bot...${NC}"
+    python run_bot.py &
+    BOT_PID=$!
+fi
 
 cd ..
 